@@ -8,10 +8,10 @@ __version__ = '0.1.0'
 
 from db_engine.config import *
 from db_engine.catalog import Catalog, TableSchema, ColumnDef, IndexMetadata, TableStatistics
-from db_engine.storage import BufferPool, Tuple, Page, HeapFile
+from db_engine.storage import BufferPool, Tuple, Page, HeapFile, ColumnBatch
 from db_engine.btree import BTreeNode, BTreeIndex
 from db_engine.parser import (
-    Tokenizer, Parser, parse_sql,
+    Tokenizer, Parser, parse_sql, tokenize,
     SelectCommand, InsertCommand, UpdateCommand, DeleteCommand,
     CreateTableCommand, CreateIndexCommand, DropTableCommand,
     ExplainCommand, AnalyzeCommand, VacuumCommand,
@@ -22,9 +22,9 @@ from db_engine.repl import REPL
 
 __all__ = [
     'Catalog', 'TableSchema', 'ColumnDef', 'IndexMetadata', 'TableStatistics',
-    'BufferPool', 'Tuple', 'Page', 'HeapFile',
+    'BufferPool', 'Tuple', 'Page', 'HeapFile', 'ColumnBatch',
     'BTreeNode', 'BTreeIndex',
-    'Tokenizer', 'Parser', 'parse_sql',
+    'Tokenizer', 'Parser', 'parse_sql', 'tokenize',
     'SelectCommand', 'InsertCommand', 'UpdateCommand', 'DeleteCommand',
     'CreateTableCommand', 'CreateIndexCommand', 'DropTableCommand',
     'ExplainCommand', 'AnalyzeCommand', 'VacuumCommand',
@@ -8,13 +8,39 @@ This module provides:
 - Composite key support (multi-column indexes)
 """
 
-from typing import List, Tuple as TupleType, Optional, Any, Union
+from typing import List, Tuple as TupleType, Optional, Any, Union, Iterable
+import pickle
 import struct
+import mmap
 import os
 
 from .config import (
     BTREE_ORDER, NODE_SIZE, INDEX_TEXT_MAX_LENGTH
 )
+from .storage import O_RDWR, pwrite
+
+
+# Node header: is_leaf, num_keys, next_leaf, keys_len, values_len
+# ('=' keeps native byte order with no alignment padding, matching the
+# field-by-field packing used before)
+_NODE_HEADER = struct.Struct('=?IqII')
+
+# File header: magic, root_offset, node_count, unique, key_column_count
+# (padded to _FILE_HEADER_SIZE); root_offset and node_count are rewritten
+# together in place as _HEADER_ROOT_COUNT at offset 4
+_FILE_HEADER = struct.Struct('=4sqq?I')
+_FILE_HEADER_SIZE = 64
+_HEADER_ROOT_COUNT = struct.Struct('=qq')
+
+# Leaf ctids are pickled as one int each: page << 16 | slot (slot ids are
+# uint16, see storage.Page)
+_CTID_SLOT_BITS = 16
+_CTID_SLOT_MASK = (1 << _CTID_SLOT_BITS) - 1
+
+# Scratch page reused by every BTreeNode.serialize() call (the engine is
+# single-threaded), plus a zero page used to clear its unused tail
+_NODE_SCRATCH = bytearray(NODE_SIZE)
+_NODE_ZEROS = memoryview(bytes(NODE_SIZE))
 
 
 class BTreeNode:
@@ -23,7 +49,7 @@ class BTreeNode:
     def __init__(self, is_leaf: bool = True):
         self.is_leaf = is_leaf
         self.keys: List[Any] = []  # Key values (int, str, or tuple for composite)
-        self.values: List[Any] = []  # Leaf: ctids (page, offset); Internal: child file offsets
+        self.values: List[Any] = []  # Leaf: ctids (page, slot); Internal: child file offsets
         self.next_leaf: int = -1  # For leaf nodes, link to next leaf (for range queries)
         self.file_offset: int = -1  # Position in index file
 
@@ -79,75 +105,54 @@ class BTreeNode:
         [is_leaf: 1 byte]
         [num_keys: 4 bytes]
         [next_leaf: 8 bytes] (only for leaf nodes, -1 for internal)
+        [keys_len: 4 bytes]
+        [values_len: 4 bytes]
         [keys: variable, pickled for simplicity]
-        [values: variable, pickled]
+        [values: variable, pickled; leaf ctids packed as page << 16 | slot]
         [padding to NODE_SIZE]
 
         Note: We use pickle for key/value serialization to handle
         composite keys and variable types easily. In production, you'd
         use a more efficient binary format.
-        """
-        import pickle
-
-        # Header
-        data = struct.pack('?', self.is_leaf)  # 1 byte
-        data += struct.pack('I', len(self.keys))  # 4 bytes
-        data += struct.pack('q', self.next_leaf)  # 8 bytes
 
+        The page is assembled in a shared scratch buffer and copied out
+        once, instead of growing a new bytes object field by field.
+        """
         # Serialize keys and values using pickle
         keys_data = pickle.dumps(self.keys)
-        values_data = pickle.dumps(self.values)
-
-        # Lengths
-        data += struct.pack('I', len(keys_data))  # 4 bytes
-        data += struct.pack('I', len(values_data))  # 4 bytes
-
-        # Data
-        data += keys_data
-        data += values_data
+        if self.is_leaf:
+            values_data = pickle.dumps([(page << _CTID_SLOT_BITS) | slot for page, slot in self.values])
+        else:
+            values_data = pickle.dumps(self.values)
 
-        # Pad to NODE_SIZE
-        if len(data) > NODE_SIZE:
-            raise ValueError(f"Node data ({len(data)} bytes) exceeds NODE_SIZE ({NODE_SIZE} bytes)")
+        keys_end = _NODE_HEADER.size + len(keys_data)
+        end = keys_end + len(values_data)
+        if end > NODE_SIZE:
+            raise ValueError(f"Node data ({end} bytes) exceeds NODE_SIZE ({NODE_SIZE} bytes)")
 
-        padding = NODE_SIZE - len(data)
-        data += b'\x00' * padding
+        buf = _NODE_SCRATCH
+        _NODE_HEADER.pack_into(buf, 0, self.is_leaf, len(self.keys), self.next_leaf,
+                               len(keys_data), len(values_data))
+        buf[_NODE_HEADER.size:keys_end] = keys_data
+        buf[keys_end:end] = values_data
+        # Zero the tail so no bytes from a previously serialized node leak through
+        buf[end:] = _NODE_ZEROS[end:]
 
-        return data
+        return bytes(buf)
 
     @staticmethod
     def deserialize(data: bytes, file_offset: int = -1) -> 'BTreeNode':
-        """Deserialize node from bytes"""
-        import pickle
-
-        offset = 0
-
-        # Header
-        is_leaf = struct.unpack('?', data[offset:offset+1])[0]
-        offset += 1
-
-        num_keys = struct.unpack('I', data[offset:offset+4])[0]
-        offset += 4
-
-        next_leaf = struct.unpack('q', data[offset:offset+8])[0]
-        offset += 8
-
-        # Lengths
-        keys_len = struct.unpack('I', data[offset:offset+4])[0]
-        offset += 4
-
-        values_len = struct.unpack('I', data[offset:offset+4])[0]
-        offset += 4
+        """Deserialize node from bytes (or any buffer, e.g. a memoryview of the mapped file)"""
+        is_leaf, num_keys, next_leaf, keys_len, values_len = _NODE_HEADER.unpack_from(data, 0)
 
         # Deserialize keys and values
-        keys_data = data[offset:offset+keys_len]
-        offset += keys_len
-
-        values_data = data[offset:offset+values_len]
-        offset += values_len
-
-        keys = pickle.loads(keys_data)
-        values = pickle.loads(values_data)
+        view = memoryview(data)
+        keys_end = _NODE_HEADER.size + keys_len
+        keys = pickle.loads(view[_NODE_HEADER.size:keys_end])
+        values = pickle.loads(view[keys_end:keys_end + values_len])
+        if is_leaf and values and isinstance(values[0], int):
+            # Packed ctids (files written before packing hold (page, slot) tuples)
+            values = [(v >> _CTID_SLOT_BITS, v & _CTID_SLOT_MASK) for v in values]
 
         # Build node
         node = BTreeNode(is_leaf=is_leaf)
@@ -163,14 +168,17 @@ class BTreeIndex:
     """B-tree index manager with composite key support"""
 
     def __init__(self, index_file: str, key_columns: List[str], unique: bool = False):
-        self.index_file = index_file
+        self.index_file = os.fspath(index_file)  # str or pathlib.Path
         self.key_columns = key_columns  # List of column names for composite keys
         self.unique = unique
         self.root: Optional[BTreeNode] = None
         self.node_count = 0
+        self._fd: Optional[int] = None
+        self._mm: Optional[mmap.mmap] = None  # Read-only mapping used by _read_node
 
     def create(self):
         """Initialize new index file"""
+        self.close()
         # Create empty root node (leaf)
         self.root = BTreeNode(is_leaf=True)
         self.root.file_offset = self._allocate_offset()
@@ -178,70 +186,153 @@ class BTreeIndex:
 
         # Write file header
         with open(self.index_file, 'wb') as f:
-            # Magic: b'BTIX'
-            f.write(b'BTIX')
-            # Root offset: 8 bytes
-            f.write(struct.pack('q', self.root.file_offset))
-            # Node count: 8 bytes
-            f.write(struct.pack('q', self.node_count))
-            # Unique flag: 1 byte
-            f.write(struct.pack('?', self.unique))
-            # Key column count: 4 bytes
-            f.write(struct.pack('I', len(self.key_columns)))
-            # Reserved: pad to 64 bytes
-            f.write(b'\x00' * (64 - f.tell()))
+            self._write_header(f)
 
             # Write root node
             f.write(self.root.serialize())
 
+    def _write_header(self, f):
+        """Write the 64-byte file header at the start of an open index file"""
+        header = _FILE_HEADER.pack(b'BTIX', self.root.file_offset, self.node_count,
+                                   self.unique, len(self.key_columns))
+        f.seek(0)
+        f.write(header + b'\x00' * (_FILE_HEADER_SIZE - len(header)))
+
+    @classmethod
+    def bulk_load(cls, index_file: str, key_columns: List[str],
+                  sorted_pairs: Iterable[TupleType[Any, TupleType[int, int]]],
+                  unique: bool = False) -> 'BTreeIndex':
+        """
+        Build a new index bottom-up from (key, ctid) pairs in ascending key order
+
+        - Leaves are packed to ORDER-1 keys and written sequentially,
+          each linked to the next one through next_leaf
+        - Each internal level is built from the first keys of the level
+          below, until a single root remains
+        - Raises ValueError if the input is not sorted, or on a duplicate
+          key when unique=True
+
+        Every node is written exactly once, so this is O(n) instead of the
+        O(n log n) descent-and-split cost of calling insert() per key.
+        """
+        index = cls(index_file, key_columns, unique=unique)
+        max_keys = BTREE_ORDER - 1
+
+        with open(index.index_file, 'wb') as f:
+            f.write(b'\x00' * _FILE_HEADER_SIZE)  # Header is written once the root is known
+
+            def flush(node: BTreeNode, level: list):
+                node.file_offset = index._allocate_offset()
+                index.node_count += 1
+                f.write(node.serialize())
+                level.append((node.keys[0] if node.keys else None, node.file_offset))
+
+            # Leaf level: (first key, file offset) per leaf
+            level = []
+            leaf = BTreeNode(is_leaf=True)
+            prev_key = None
+            for key, ctid in sorted_pairs:
+                key = BTreeNode.truncate_key(key)
+                if leaf.keys:
+                    cmp = BTreeNode.compare_keys(key, prev_key)
+                    if cmp < 0:
+                        raise ValueError(f"bulk_load input is not sorted: {key} after {prev_key}")
+                    if cmp == 0 and unique:
+                        raise ValueError(f"Duplicate key violation: {key} already exists in unique index")
+                if len(leaf.keys) == max_keys:
+                    # Leaves are laid out back to back, so the next one follows directly
+                    leaf.next_leaf = index._allocate_offset() + NODE_SIZE
+                    flush(leaf, level)
+                    leaf = BTreeNode(is_leaf=True)
+                leaf.keys.append(key)
+                leaf.values.append(ctid)
+                prev_key = key
+            flush(leaf, level)
+            node = leaf
+
+            # Internal levels: up to ORDER children per node, separator = child's first key
+            while len(level) > 1:
+                groups = [level[i:i + BTREE_ORDER] for i in range(0, len(level), BTREE_ORDER)]
+                if len(groups[-1]) == 1:
+                    # Never leave a single-child node; borrow one from the previous group
+                    groups[-1].insert(0, groups[-2].pop())
+                level = []
+                for group in groups:
+                    node = BTreeNode(is_leaf=False)
+                    node.keys = [first_key for first_key, _ in group[1:]]
+                    node.values = [offset for _, offset in group]
+                    flush(node, level)
+                    level[-1] = (group[0][0], node.file_offset)
+
+            index.root = node
+            index._write_header(f)
+
+        return index
+
     def open(self):
         """Open existing index file"""
         if not os.path.exists(self.index_file):
             raise FileNotFoundError(f"Index file not found: {self.index_file}")
 
-        with open(self.index_file, 'rb') as f:
-            # Read header
-            magic = f.read(4)
-            if magic != b'BTIX':
-                raise ValueError(f"Invalid index file: {self.index_file}")
-
-            root_offset = struct.unpack('q', f.read(8))[0]
-            self.node_count = struct.unpack('q', f.read(8))[0]
-            self.unique = struct.unpack('?', f.read(1))[0]
-            key_column_count = struct.unpack('I', f.read(4))[0]
-
-            # Load root node
-            self.root = self._read_node(root_offset)
+        # Read header
+        self.close()
+        magic, root_offset, self.node_count, self.unique, key_column_count = \
+            _FILE_HEADER.unpack_from(self._map(), 0)
+        if magic != b'BTIX':
+            raise ValueError(f"Invalid index file: {self.index_file}")
+
+        # Load root node
+        self.root = self._read_node(root_offset)
+
+    def close(self):
+        """Release the read mapping and file descriptor (reopened lazily on the next read)"""
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _file(self) -> int:
+        """Descriptor for positioned reads/writes, opened on first use"""
+        if self._fd is None:
+            self._fd = os.open(self.index_file, O_RDWR)
+        return self._fd
+
+    def _map(self) -> mmap.mmap:
+        """Map the whole index file for reading, remapping after it has grown"""
+        fd = self._file()
+        if self._mm is not None:
+            self._mm.close()
+        self._mm = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+        return self._mm
 
     def _allocate_offset(self) -> int:
         """Allocate file offset for new node"""
         # Header is 64 bytes, each node is NODE_SIZE bytes
-        return 64 + (self.node_count * NODE_SIZE)
+        return _FILE_HEADER_SIZE + (self.node_count * NODE_SIZE)
 
     def _read_node(self, offset: int) -> BTreeNode:
-        """Read node from file at given offset"""
-        with open(self.index_file, 'rb') as f:
-            f.seek(offset)
-            data = f.read(NODE_SIZE)
-            return BTreeNode.deserialize(data, file_offset=offset)
+        """Read node at given offset straight from the mapped file (no intermediate copy)"""
+        mm = self._mm
+        if mm is None or offset + NODE_SIZE > len(mm):
+            mm = self._map()
+        with memoryview(mm) as view:
+            return BTreeNode.deserialize(view[offset:offset + NODE_SIZE], file_offset=offset)
 
     def _write_node(self, node: BTreeNode):
         """Write node to file at its offset"""
-        with open(self.index_file, 'r+b') as f:
-            f.seek(node.file_offset)
-            f.write(node.serialize())
+        pwrite(self._file(), node.serialize(), node.file_offset)
 
     def _update_header(self):
         """Update file header (root offset and node count)"""
-        with open(self.index_file, 'r+b') as f:
-            f.seek(4)  # Skip magic
-            f.write(struct.pack('q', self.root.file_offset))
-            f.write(struct.pack('q', self.node_count))
+        # Offset 4 skips the magic
+        pwrite(self._file(), _HEADER_ROOT_COUNT.pack(self.root.file_offset, self.node_count), 4)
 
     def search(self, key: Any) -> Optional[TupleType[int, int]]:
         """
         Search for exact key match
-        Returns: ctid (page_number, offset) or None if not found
+        Returns: ctid (page_number, slot_id) or None if not found
         """
         if self.root is None:
             return None
@@ -461,6 +552,17 @@ class BTreeIndex:
         Simplified version: removes key from leaf, no rebalancing
         (Full rebalancing with borrow/merge can be added in Phase 2)
         """
+        # Key not found is okay - deletion is idempotent
+        self.delete_returning_ctid(key)
+
+    def delete_returning_ctid(self, key: Any) -> Optional[TupleType[int, int]]:
+        """
+        Delete key from index and return the ctid it pointed to
+        Returns: ctid (page_number, slot_id) or None if key was not present
+
+        One descent both finds and removes the entry, so callers don't need
+        a separate search() first.
+        """
         key = BTreeNode.truncate_key(key)
 
         # Find leaf containing key
@@ -471,9 +573,8 @@ class BTreeIndex:
             if BTreeNode.compare_keys(leaf_key, key) == 0:
                 # Found key - remove it
                 del leaf.keys[i]
-                del leaf.values[i]
+                ctid = leaf.values.pop(i)
                 self._write_node(leaf)
-                return
+                return ctid
 
-        # Key not found - that's okay, deletion is idempotent
-        pass
+        return None
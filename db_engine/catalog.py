@@ -12,6 +12,7 @@ from dataclasses import dataclass
 import os
 import struct
 import pickle
+from sys import intern
 from .config import CATALOG_MAGIC
 
 
@@ -33,6 +34,36 @@ class ColumnDef:
         return f"{self.name} {self.datatype}{constraint_str}"
 
 
+# struct format codes for fixed-width column types (little-endian, no padding)
+FIXED_TYPE_FORMATS = {
+    'INT': 'i',
+    'BIGINT': 'q',
+    'FLOAT': 'd',
+    'BOOLEAN': '?',
+    'TIMESTAMP': 'q',
+}
+
+# Python coercion applied to each fixed-width value before packing
+FIXED_TYPE_CONVERTERS = {
+    'INT': int,
+    'BIGINT': int,
+    'FLOAT': float,
+    'BOOLEAN': bool,
+    'TIMESTAMP': int,
+}
+
+# Catalog file header after the magic: version, pickled data length
+_CATALOG_HEADER = struct.Struct('=II')
+
+# Derived per-schema attributes - rebuilt on demand, never pickled
+_CACHED_ATTRS = (
+    'name_to_index',
+    'nullable_indices', 'bitmap_size', 'has_nullable',
+    'fixed_struct', 'fixed_indices', 'fixed_converters', 'text_indices',
+    'fixed_fields', 'null_bits',
+)
+
+
 @dataclass
 class TableSchema:
     """Table metadata - schema definition"""
@@ -41,26 +72,79 @@ class TableSchema:
     primary_key: List[str]  # Column names in primary key
 
     def __post_init__(self):
-        """Generate heap file name"""
+        """Generate heap file name and tuple layout"""
         self.heap_file = f"{self.table_name}.dat"
+        self.rebuild_cache()
+
+    def __getstate__(self):
+        """Pickle only the definition; derived layout is rebuilt on load"""
+        state = self.__dict__.copy()
+        for attr in _CACHED_ATTRS:
+            state.pop(attr, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.rebuild_cache()
+
+    def rebuild_cache(self):
+        """
+        Recompute the tuple layout derived from the column list.
+        Must be called after columns are added, dropped or renamed.
+
+        Fixed-width columns are packed together with one compiled Struct;
+        TEXT columns follow as (length, bytes) pairs.
+        """
+        # Interned like parsed identifiers, so lookups by parsed names hit on identity
+        self.name_to_index = {intern(col.name): i for i, col in enumerate(self.columns)}
+
+        # Null bitmap: one bit per nullable column, in column order
+        self.nullable_indices = tuple(i for i, col in enumerate(self.columns) if col.nullable)
+        self.bitmap_size = (len(self.nullable_indices) + 7) // 8
+        self.has_nullable = bool(self.nullable_indices)
+
+        self.fixed_indices = tuple(
+            i for i, col in enumerate(self.columns) if col.datatype in FIXED_TYPE_FORMATS
+        )
+        self.fixed_converters = tuple(
+            FIXED_TYPE_CONVERTERS[self.columns[i].datatype] for i in self.fixed_indices
+        )
+        self.fixed_struct = struct.Struct(
+            '<' + ''.join(FIXED_TYPE_FORMATS[self.columns[i].datatype] for i in self.fixed_indices)
+        )
+        self.text_indices = tuple(
+            i for i, col in enumerate(self.columns) if col.datatype == 'TEXT'
+        )
+
+        # Per-column access into serialized bytes, for filtering without deserializing:
+        # fixed column -> (byte offset, single-field Struct); nullable column -> bitmap bit
+        self.fixed_fields = {}
+        offset = self.bitmap_size
+        for i in self.fixed_indices:
+            field = struct.Struct('<' + FIXED_TYPE_FORMATS[self.columns[i].datatype])
+            self.fixed_fields[i] = (offset, field)
+            offset += field.size
+        self.null_bits = {col_index: bit for bit, col_index in enumerate(self.nullable_indices)}
 
     def has_nullable_columns(self) -> bool:
         """Check if any columns are nullable (for null bitmap optimization)"""
-        return any(col.nullable for col in self.columns)
+        return self.has_nullable
+
+    def has_column(self, name: str) -> bool:
+        """Check if a column exists (dict lookup, no scan of columns)"""
+        return name in self.name_to_index
 
     def get_column(self, name: str) -> Optional[ColumnDef]:
         """Get column by name"""
-        for col in self.columns:
-            if col.name == name:
-                return col
-        return None
+        index = self.name_to_index.get(name)
+        return self.columns[index] if index is not None else None
 
     def get_column_index(self, name: str) -> int:
         """Get column position by name"""
-        for i, col in enumerate(self.columns):
-            if col.name == name:
-                return i
-        raise ValueError(f"Column '{name}' not found in table '{self.table_name}'")
+        index = self.name_to_index.get(name)
+        if index is None:
+            raise ValueError(f"Column '{name}' not found in table '{self.table_name}'")
+        return index
 
 
 @dataclass
@@ -105,8 +189,8 @@ class Catalog:
     """System catalog - manages all database metadata"""
 
     def __init__(self, data_dir: str, catalog_file: str = 'catalog.dat'):
-        self.data_dir = data_dir
-        self.catalog_file = os.path.join(data_dir, catalog_file)
+        self.data_dir = os.fspath(data_dir)  # str or pathlib.Path
+        self.catalog_file = os.path.join(self.data_dir, catalog_file)
         self.tables: Dict[str, TableSchema] = {}
         self.indexes: Dict[str, IndexMetadata] = {}
         self.statistics: Dict[str, TableStatistics] = {}
@@ -118,52 +202,46 @@ class Catalog:
             return
 
         with open(self.catalog_file, 'rb') as f:
-            # Read and verify magic number
-            magic = f.read(len(CATALOG_MAGIC))
-            if magic != CATALOG_MAGIC:
-                raise ValueError(f"Invalid catalog file: bad magic number")
+            data = f.read()
 
-            # Read version
-            version = struct.unpack('I', f.read(4))[0]
-            if version != 1:
-                raise ValueError(f"Unsupported catalog version: {version}")
+        # Read and verify magic number
+        if data[:len(CATALOG_MAGIC)] != CATALOG_MAGIC:
+            raise ValueError(f"Invalid catalog file: bad magic number")
 
-            # Read pickled data length
-            data_length = struct.unpack('I', f.read(4))[0]
+        # Read version and pickled data length
+        version, data_length = _CATALOG_HEADER.unpack_from(data, len(CATALOG_MAGIC))
+        if version != 1:
+            raise ValueError(f"Unsupported catalog version: {version}")
 
-            # Read and unpickle the catalog data
-            pickled_data = f.read(data_length)
-            catalog_data = pickle.loads(pickled_data)
+        # Unpickle the catalog data straight from the file buffer
+        start = len(CATALOG_MAGIC) + _CATALOG_HEADER.size
+        catalog_data = pickle.loads(memoryview(data)[start:start + data_length])
 
-            # Restore catalog state
-            self.tables = catalog_data.get('tables', {})
-            self.indexes = catalog_data.get('indexes', {})
-            self.statistics = catalog_data.get('statistics', {})
+        # Restore catalog state
+        self.tables = catalog_data.get('tables', {})
+        self.indexes = catalog_data.get('indexes', {})
+        self.statistics = catalog_data.get('statistics', {})
 
     def save(self):
         """Persist catalog to disk"""
         # Ensure data directory exists
         os.makedirs(self.data_dir, exist_ok=True)
 
-        with open(self.catalog_file, 'wb') as f:
-            # Write header: magic + version
-            f.write(CATALOG_MAGIC)
-            f.write(struct.pack('I', 1))  # Version 1
-
-            # Serialize the entire catalog using pickle for simplicity
-            # In production, you'd use a proper binary format, but pickle is
-            # fine for educational purposes and makes serialization trivial
-            catalog_data = {
-                'tables': self.tables,
-                'indexes': self.indexes,
-                'statistics': self.statistics
-            }
+        # Serialize the entire catalog using pickle for simplicity
+        # In production, you'd use a proper binary format, but pickle is
+        # fine for educational purposes and makes serialization trivial
+        catalog_data = {
+            'tables': self.tables,
+            'indexes': self.indexes,
+            'statistics': self.statistics
+        }
 
-            pickled_data = pickle.dumps(catalog_data)
+        # Highest protocol: compact framing and the fastest dump/load
+        pickled_data = pickle.dumps(catalog_data, protocol=pickle.HIGHEST_PROTOCOL)
 
-            # Write length of pickled data, then the data itself
-            f.write(struct.pack('I', len(pickled_data)))
-            f.write(pickled_data)
+        with open(self.catalog_file, 'wb') as f:
+            # Header: magic + version (1) + length of pickled data, then the data itself
+            f.writelines((CATALOG_MAGIC, _CATALOG_HEADER.pack(1, len(pickled_data)), pickled_data))
 
     def create_table(self, schema: TableSchema):
         """Register a new table in the catalog"""
@@ -266,11 +344,12 @@ class Catalog:
             self.statistics[table_name] = TableStatistics(table_name)
         return self.statistics[table_name]
 
-    def update_statistics(self, table_name: str, stats: TableStatistics):
-        """Update statistics for a table"""
+    def update_statistics(self, table_name: str, stats: TableStatistics, persist: bool = True):
+        """Update statistics for a table (persist=False leaves the save to the caller)"""
         self.statistics[table_name] = stats
         # Persist changes
-        self.save()
+        if persist:
+            self.save()
 
     def list_tables(self) -> List[str]:
         """List all table names"""
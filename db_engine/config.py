@@ -16,9 +16,17 @@ DATA_DIR = './data'
 # Heap file header size (metadata at start of each .dat file)
 HEAP_FILE_HEADER_SIZE = 32  # bytes
 
+# Magic number and page/tuple format version for heap files
+# (files from before the version field read as version 0)
+HEAP_MAGIC = b'HEAP'
+HEAP_FORMAT_VERSION = 1
+
 # Page header size within each page
 PAGE_HEADER_SIZE = 16  # bytes (free_space, item_count, flags)
 
+# Free space map granularity (free space is tracked in buckets of this many bytes)
+FSM_BUCKET_SIZE = 256  # bytes (PostgreSQL uses BLCKSZ / 256 categories)
+
 # ============================================================================
 # Buffer Pool Configuration
 # ============================================================================
@@ -27,7 +35,10 @@ PAGE_HEADER_SIZE = 16  # bytes (free_space, item_count, flags)
 BUFFER_POOL_SIZE = 128  # 128 pages = 1MB cache (128 * 8KB)
 
 # Buffer pool eviction policy
-BUFFER_POOL_POLICY = 'LRU'  # Least Recently Used
+BUFFER_POOL_POLICY = 'CLOCK'  # Clock sweep with usage counts (scans enter cold)
+
+# Clock sweep usage count cap (a page survives this many sweeps without a hit)
+BUFFER_POOL_MAX_USAGE = 5  # Same cap as PostgreSQL's BM_MAX_USAGE_COUNT
 
 # ============================================================================
 # B-tree Index Configuration
@@ -132,6 +143,12 @@ HEAP_FILE_EXT = '.dat'
 # Index file extension
 INDEX_FILE_EXT = '.idx'
 
+# Free space map sidecar extension (appended to the heap file name)
+FSM_FILE_EXT = '.fsm'
+
+# Magic number for free space map sidecar files
+FSM_MAGIC = b'FSM1'
+
 # Primary key index suffix
 PKEY_SUFFIX = '_pkey'
 
@@ -8,10 +8,15 @@ This module provides:
 - Expression evaluation for WHERE clauses
 """
 
-from typing import List, Dict, Tuple as TupleType, Optional, Any
+from typing import List, Dict, Tuple as TupleType, Optional, Any, Iterator, Callable
+from itertools import islice
+import functools
+import operator
 import os
+import shutil
 import re
 
+from .config import BUFFER_POOL_SIZE, FSM_FILE_EXT
 from .catalog import Catalog, TableSchema, ColumnDef, IndexMetadata, TableStatistics
 from .storage import BufferPool, Tuple, Page, HeapFile
 from .btree import BTreeIndex
@@ -25,14 +30,43 @@ from .parser import (
 )
 
 
+# Per-row comparison dispatch for WHERE evaluation
+_EQUALITY_OPS = {'=': operator.eq, '!=': operator.ne}
+_ORDERING_OPS = {'<': operator.lt, '>': operator.gt, '<=': operator.le, '>=': operator.ge}
+
+
+@functools.lru_cache(maxsize=256)
+def _like_matcher(pattern: str) -> Callable[[str], bool]:
+    """Build a matcher once per distinct LIKE pattern: % = any run, _ = one char
+
+    Patterns whose only wildcards are a leading and/or trailing % map to a
+    plain string method; anything else is compiled to a regex.
+    """
+    inner = pattern.strip('%')
+    if '%' not in inner and '_' not in inner:
+        if inner == pattern:
+            return pattern.__eq__
+        if inner and pattern == inner + '%':
+            return lambda text: text.startswith(inner)
+        if inner and pattern == '%' + inner:
+            return lambda text: text.endswith(inner)
+        if inner and pattern == '%' + inner + '%':
+            return lambda text: inner in text
+    regex = re.compile(''.join(
+        '.*' if ch == '%' else '.' if ch == '_' else re.escape(ch) for ch in pattern
+    ), re.DOTALL)
+    return lambda text: regex.fullmatch(text) is not None
+
+
 class QueryExecutor:
     """Executes SQL commands - orchestrates all database components"""
 
-    def __init__(self, data_dir: str):
-        self.data_dir = data_dir
-        self.catalog = Catalog(data_dir)
+    def __init__(self, data_dir: str, buffer_pool_size: int = BUFFER_POOL_SIZE):
+        self.data_dir = os.fspath(data_dir)  # str or pathlib.Path
+        self.catalog = Catalog(self.data_dir)
         self.catalog.load()
-        self.buffer_pool = BufferPool()
+        self.buffer_pool_size = buffer_pool_size
+        self.buffer_pool = BufferPool(size=buffer_pool_size)
         self.heap_files: Dict[str, HeapFile] = {}
         self.indexes: Dict[str, BTreeIndex] = {}
 
@@ -42,40 +76,10 @@ class QueryExecutor:
 
     def execute(self, command):
         """Main entry point - dispatch to specific executors"""
-        if isinstance(command, CreateTableCommand):
-            return self.execute_create_table(command)
-        elif isinstance(command, CreateIndexCommand):
-            return self.execute_create_index(command)
-        elif isinstance(command, DropTableCommand):
-            return self.execute_drop_table(command)
-        elif isinstance(command, InsertCommand):
-            return self.execute_insert(command)
-        elif isinstance(command, SelectCommand):
-            return self.execute_select(command)
-        elif isinstance(command, UpdateCommand):
-            return self.execute_update(command)
-        elif isinstance(command, DeleteCommand):
-            return self.execute_delete(command)
-        elif isinstance(command, ExplainCommand):
-            return self.execute_explain(command)
-        elif isinstance(command, AnalyzeCommand):
-            return self.execute_analyze(command)
-        elif isinstance(command, VacuumCommand):
-            return self.execute_vacuum(command)
-        elif isinstance(command, AlterTableAddColumnCommand):
-            return self.execute_alter_table_add_column(command)
-        elif isinstance(command, AlterTableDropColumnCommand):
-            return self.execute_alter_table_drop_column(command)
-        elif isinstance(command, AlterTableRenameColumnCommand):
-            return self.execute_alter_table_rename_column(command)
-        elif isinstance(command, BeginCommand):
-            return self.execute_begin(command)
-        elif isinstance(command, CommitCommand):
-            return self.execute_commit(command)
-        elif isinstance(command, RollbackCommand):
-            return self.execute_rollback(command)
-        else:
+        handler = self._COMMAND_EXECUTORS.get(type(command))
+        if handler is None:
             raise ValueError(f"Unknown command type: {type(command)}")
+        return handler(self, command)
 
     # ========================================================================
     # CREATE TABLE
@@ -85,11 +89,12 @@ class QueryExecutor:
         """Execute CREATE TABLE command"""
         # Build column definitions
         columns = []
-        for col_name, datatype, nullable, unique in cmd.columns:
-            columns.append(ColumnDef(col_name, datatype, nullable, unique))
+        for i, (col_name, datatype) in enumerate(zip(cmd.column_names, cmd.column_types)):
+            bit = 1 << i
+            columns.append(ColumnDef(col_name, datatype, bool(cmd.nullable_mask & bit), bool(cmd.unique_mask & bit)))
 
         # Create schema
-        schema = TableSchema(cmd.table_name, columns, cmd.primary_key)
+        schema = TableSchema(cmd.table_name, columns, list(cmd.primary_key))
 
         # Register in catalog (also creates primary key index metadata)
         self.catalog.create_table(schema)
@@ -98,12 +103,14 @@ class QueryExecutor:
         heap_path = os.path.join(self.data_dir, schema.heap_file)
         heap = HeapFile(heap_path, schema, self.buffer_pool)
         heap.create()
+        self.heap_files[cmd.table_name] = heap
 
         # Create primary key index file
         pk_index_name = f"{cmd.table_name}_pkey"
         pk_index_file = os.path.join(self.data_dir, f"{cmd.table_name}_pkey.idx")
         pk_index = BTreeIndex(pk_index_file, cmd.primary_key, unique=True)
         pk_index.create()
+        pk_index.close()
 
         return f"Table '{cmd.table_name}' created with primary key {cmd.primary_key}"
 
@@ -121,7 +128,7 @@ class QueryExecutor:
                 raise ValueError(f"Column '{col}' does not exist in table '{cmd.table_name}'")
 
         # Create index metadata
-        index_meta = IndexMetadata(cmd.index_name, cmd.table_name, cmd.columns, cmd.unique)
+        index_meta = IndexMetadata(cmd.index_name, cmd.table_name, list(cmd.columns), cmd.unique)
         self.catalog.create_index(index_meta)
 
         # Create index file
@@ -135,6 +142,9 @@ class QueryExecutor:
             key = self._extract_key_from_tuple(tuple_obj, schema, cmd.columns)
             index.insert(key, ctid)
 
+        # Keep the open index for later statements instead of reopening it
+        self.indexes[f"{cmd.table_name}_{cmd.index_name}"] = index
+
         return f"Index '{cmd.index_name}' created on {cmd.table_name}({', '.join(cmd.columns)})"
 
     # ========================================================================
@@ -145,13 +155,19 @@ class QueryExecutor:
         """Execute DROP TABLE command"""
         schema = self.catalog.get_table(cmd.table_name)
 
-        # Remove heap file
+        # Close and remove heap file
+        if cmd.table_name in self.heap_files:
+            self.heap_files[cmd.table_name].close()
         heap_path = os.path.join(self.data_dir, schema.heap_file)
-        if os.path.exists(heap_path):
-            os.remove(heap_path)
+        for path in (heap_path, heap_path + FSM_FILE_EXT):
+            if os.path.exists(path):
+                os.remove(path)
 
-        # Remove all index files
+        # Close and remove all index files
         for index_meta in self.catalog.get_indexes_for_table(cmd.table_name):
+            index = self.indexes.pop(f"{cmd.table_name}_{index_meta.index_name}", None)
+            if index is not None:
+                index.close()
             index_path = os.path.join(self.data_dir, index_meta.index_file)
             if os.path.exists(index_path):
                 os.remove(index_path)
@@ -189,10 +205,11 @@ class QueryExecutor:
                 )
 
             # Build full value list with NULLs for unspecified columns
+            positions = {name: i for i, name in enumerate(cmd.columns)}
             values = []
             for col in schema.columns:
-                if col.name in cmd.columns:
-                    idx = cmd.columns.index(col.name)
+                idx = positions.get(col.name)
+                if idx is not None:
                     values.append(cmd.values[idx])
                 else:
                     # Column not specified - use NULL if nullable
@@ -245,58 +262,142 @@ class QueryExecutor:
         stats = self.catalog.get_statistics(cmd.table_name)
         stats.row_count += 1
         stats.modification_count += 1
-        self.catalog.update_statistics(cmd.table_name, stats)
+        self._update_statistics(cmd.table_name, stats)
 
         return f"Inserted 1 row"
 
+    def insert_many(self, table_name: str, rows: List[List[Any]]) -> str:
+        """
+        Insert full rows directly, without going through the parser
+
+        Every row is checked (column count, NOT NULL, primary key, including
+        duplicates within the batch) before anything is written; the rows
+        then go to the heap in one batch and statistics are saved once.
+        If an index rejects a row, the heap tuples of that row and the ones
+        after it are deleted, as if the rows had been inserted one at a time.
+        """
+        schema = self.catalog.get_table(table_name)
+        column_count = len(schema.columns)
+        not_null = [col for col in schema.columns if not col.nullable]
+        not_null_indexes = [schema.get_column_index(col.name) for col in not_null]
+        pk_index = self._get_primary_key_index(table_name)
+
+        rows = [list(values) for values in rows]
+        batch_keys = set()
+        for values in rows:
+            if len(values) != column_count:
+                raise ValueError(
+                    f"Value count ({len(values)}) does not match column count ({column_count})"
+                )
+            for col, i in zip(not_null, not_null_indexes):
+                if values[i] is None:
+                    raise ValueError(f"Column '{col.name}' cannot be NULL")
+            pk_value = self._extract_key(values, schema, schema.primary_key)
+            if pk_value in batch_keys or pk_index.search(pk_value) is not None:
+                raise ValueError(f"Duplicate primary key: {pk_value}")
+            batch_keys.add(pk_value)
+
+        heap = self._get_heap_file(table_name)
+        ctids = heap.insert_rows(rows)
+
+        # Index row by row so a failure leaves exactly the rows before it
+        indexes = [
+            (self._get_index(index_meta), index_meta.columns)
+            for index_meta in self.catalog.get_indexes_for_table(table_name)
+        ]
+        for row_num, (values, ctid) in enumerate(zip(rows, ctids)):
+            for index, key_columns in indexes:
+                try:
+                    index.insert(self._extract_key(values, schema, key_columns), ctid)
+                except ValueError:
+                    # Same cleanup as execute_insert: drop the heap tuples
+                    for unindexed in ctids[row_num:]:
+                        heap.delete_tuple(unindexed)
+                    self._record_inserts(table_name, row_num)
+                    raise
+
+        self._record_inserts(table_name, len(rows))
+        return f"Inserted {len(rows)} rows"
+
+    def _update_statistics(self, table_name: str, stats: TableStatistics):
+        """Store table statistics; inside a transaction the catalog is saved once at COMMIT"""
+        self.catalog.update_statistics(table_name, stats, persist=not self.in_transaction)
+
+    def _record_inserts(self, table_name: str, count: int):
+        """Add count inserted rows to the table statistics"""
+        if not count:
+            return
+        stats = self.catalog.get_statistics(table_name)
+        stats.row_count += count
+        stats.modification_count += count
+        self._update_statistics(table_name, stats)
+
     # ========================================================================
     # SELECT
     # ========================================================================
 
     def execute_select(self, cmd: SelectCommand) -> List[tuple]:
         """Execute SELECT command"""
+        return list(self.iter_select(cmd))
+
+    def iter_select(self, cmd: SelectCommand) -> Iterator[tuple]:
+        """
+        Execute SELECT command, yielding result rows as they are produced
+
+        Without ORDER BY rows stream straight from the scan, so the first row
+        is available before the table has been read. Table and column names
+        are resolved before the first row is requested.
+        """
         schema = self.catalog.get_table(cmd.table_name)
 
         # Decide scan method: index scan or sequential scan
         scan_method = self._choose_scan_method(cmd.table_name, cmd.where)
+        if cmd.columns == ['*']:
+            col_indexes = None  # Return all columns
+        else:
+            col_indexes = [schema.get_column_index(col) for col in cmd.columns]
+
+        return self._select_rows(cmd, schema, scan_method, col_indexes)
 
+    def _select_rows(self, cmd: SelectCommand, schema: TableSchema, scan_method: str,
+                     col_indexes: Optional[List[int]]) -> Iterator[tuple]:
+        """Generator behind iter_select: scan, filter, order, limit, project"""
         # Get tuples
         if scan_method == 'index':
-            tuples_with_ctids = list(self._index_scan(cmd.table_name, cmd.where))
+            tuples_with_ctids = self._index_scan(cmd.table_name, cmd.where)
+            where = cmd.where
         else:
             heap = self._get_heap_file(cmd.table_name)
-            tuples_with_ctids = list(heap.scan_all())
+            predicate, where = self._compile_byte_predicate(cmd.where, schema)
+            tuples_with_ctids = heap.scan_all_filtered(predicate)
 
-        # Filter with WHERE clause
-        filtered = []
-        for tuple_obj, ctid in tuples_with_ctids:
-            if cmd.where is None or self._evaluate_expression(cmd.where, tuple_obj, schema):
-                filtered.append(tuple_obj)
+        # Filter with whatever part of the WHERE clause is left
+        if where is None:
+            filtered = (tuple_obj for tuple_obj, ctid in tuples_with_ctids)
+        else:
+            filtered = (
+                tuple_obj for tuple_obj, ctid in tuples_with_ctids
+                if self._evaluate_expression(where, tuple_obj, schema)
+            )
 
-        # Apply ORDER BY
+        # Apply ORDER BY (needs every row before the first can be returned)
         if cmd.order_by:
-            filtered = self._apply_order_by(filtered, schema, cmd.order_by)
+            filtered = self._apply_order_by(list(filtered), schema, cmd.order_by)
 
         # Apply LIMIT and OFFSET
-        if cmd.offset:
-            filtered = filtered[cmd.offset:]
-        if cmd.limit:
-            filtered = filtered[:cmd.limit]
+        start = cmd.offset or 0
+        stop = start + cmd.limit if cmd.limit else None
+        if start or stop is not None:
+            filtered = islice(filtered, start, stop)
 
         # Project columns
-        results = []
-        if cmd.columns == ['*']:
-            # Return all columns
+        if col_indexes is None:
             for tuple_obj in filtered:
-                results.append(tuple(tuple_obj.values))
+                yield tuple(tuple_obj.values)
         else:
-            # Return specific columns
-            col_indexes = [schema.get_column_index(col) for col in cmd.columns]
             for tuple_obj in filtered:
-                row = tuple(tuple_obj.values[i] for i in col_indexes)
-                results.append(row)
-
-        return results
+                values = tuple_obj.values
+                yield tuple(values[i] for i in col_indexes)
 
     def _choose_scan_method(self, table_name: str, where_expr: Optional[Expression]) -> str:
         """Cost-based decision: index scan vs sequential scan"""
@@ -422,7 +523,7 @@ class QueryExecutor:
         # Update statistics
         stats = self.catalog.get_statistics(cmd.table_name)
         stats.modification_count += len(tuples_to_update)
-        self.catalog.update_statistics(cmd.table_name, stats)
+        self._update_statistics(cmd.table_name, stats)
 
         return f"Updated {len(tuples_to_update)} rows"
 
@@ -457,7 +558,7 @@ class QueryExecutor:
         stats.row_count -= len(tuples_to_delete)
         stats.dead_tuple_count += len(tuples_to_delete)
         stats.modification_count += len(tuples_to_delete)
-        self.catalog.update_statistics(cmd.table_name, stats)
+        self._update_statistics(cmd.table_name, stats)
 
         return f"Deleted {len(tuples_to_delete)} rows"
 
@@ -548,7 +649,7 @@ class QueryExecutor:
                 distinct_values=distinct_counts,
                 modification_count=0  # Reset
             )
-            self.catalog.update_statistics(table_name, stats)
+            self._update_statistics(table_name, stats)
 
         if cmd.table_name:
             return f"Analyzed table '{cmd.table_name}'"
@@ -591,30 +692,27 @@ class QueryExecutor:
     def _evaluate_expression(self, expr: Expression, tuple_obj: Tuple, schema: TableSchema) -> Any:
         """Evaluate WHERE expression against tuple"""
         if isinstance(expr, BinaryOp):
-            left_val = self._eval_operand(expr.left, tuple_obj, schema)
-            right_val = self._eval_operand(expr.right, tuple_obj, schema)
-
-            if expr.op == '=':
-                return left_val == right_val
-            elif expr.op == '!=':
-                return left_val != right_val
-            elif expr.op == '<':
-                return left_val < right_val if (left_val is not None and right_val is not None) else False
-            elif expr.op == '>':
-                return left_val > right_val if (left_val is not None and right_val is not None) else False
-            elif expr.op == '<=':
-                return left_val <= right_val if (left_val is not None and right_val is not None) else False
-            elif expr.op == '>=':
-                return left_val >= right_val if (left_val is not None and right_val is not None) else False
-            elif expr.op == 'LIKE':
-                return self._like_match(str(left_val) if left_val is not None else '', str(right_val))
-            elif expr.op == 'AND':
+            op = expr.op
+            if op == 'AND':
                 return self._evaluate_expression(expr.left, tuple_obj, schema) and \
                        self._evaluate_expression(expr.right, tuple_obj, schema)
-            elif expr.op == 'OR':
+            if op == 'OR':
                 return self._evaluate_expression(expr.left, tuple_obj, schema) or \
                        self._evaluate_expression(expr.right, tuple_obj, schema)
 
+            left_val = self._eval_operand(expr.left, tuple_obj, schema)
+            right_val = self._eval_operand(expr.right, tuple_obj, schema)
+
+            compare = _EQUALITY_OPS.get(op)
+            if compare is not None:
+                return compare(left_val, right_val)
+            compare = _ORDERING_OPS.get(op)
+            if compare is not None:
+                # Ordering against NULL is never true
+                return compare(left_val, right_val) if (left_val is not None and right_val is not None) else False
+            if op == 'LIKE':
+                return self._like_match(str(left_val) if left_val is not None else '', str(right_val))
+
         elif isinstance(expr, UnaryOp):
             if expr.op == 'NOT':
                 return not self._evaluate_expression(expr.operand, tuple_obj, schema)
@@ -628,6 +726,87 @@ class QueryExecutor:
 
         return True
 
+    # Comparison operators a byte-level prefilter can evaluate, and their mirror image
+    _PREFILTER_OPS = {
+        '=': (operator.eq, operator.eq), '!=': (operator.ne, operator.ne),
+        '<': (operator.lt, operator.gt), '>': (operator.gt, operator.lt),
+        '<=': (operator.le, operator.ge), '>=': (operator.ge, operator.le),
+    }
+
+    def _compile_byte_predicate(self, where: Optional[Expression], schema: TableSchema):
+        """
+        Build a filter over serialized tuple bytes from the WHERE clause
+
+        Uses the top-level AND-ed comparisons between a fixed-width column
+        and a numeric/boolean literal; each reads one field with unpack_from
+        at its precomputed offset. A NULL column gives the same answer the
+        full evaluation would (only != is true against NULL), so each
+        compiled comparison is decided exactly.
+
+        Returns (predicate, residual): predicate is None if nothing in the
+        WHERE qualifies; residual is the part of the WHERE still to be
+        evaluated per row, or None when the predicate decides it alone.
+        """
+        if where is None:
+            return None, None
+
+        # Flatten top-level AND
+        conjuncts = []
+        pending = [where]
+        while pending:
+            expr = pending.pop()
+            if isinstance(expr, BinaryOp) and expr.op == 'AND':
+                pending.append(expr.right)
+                pending.append(expr.left)
+            else:
+                conjuncts.append(expr)
+
+        checks = []
+        residual = []
+        for expr in conjuncts:
+            if not isinstance(expr, BinaryOp) or expr.op not in self._PREFILTER_OPS:
+                residual.append(expr)
+                continue
+            op, mirrored = self._PREFILTER_OPS[expr.op]
+            if isinstance(expr.left, ColumnRef) and isinstance(expr.right, Literal):
+                col_ref, literal = expr.left, expr.right
+            elif isinstance(expr.right, ColumnRef) and isinstance(expr.left, Literal):
+                col_ref, literal, op = expr.right, expr.left, mirrored
+            else:
+                residual.append(expr)
+                continue
+
+            col_idx = schema.name_to_index.get(col_ref.column_name)
+            value = literal.value
+            if col_idx not in schema.fixed_fields or not isinstance(value, (int, float)):
+                # Unknown or TEXT column, NULL / string literal: keep full evaluation
+                residual.append(expr)
+                continue
+
+            offset, field = schema.fixed_fields[col_idx]
+            null_result = op is operator.ne  # NULL != x is true, every other comparison false
+            checks.append((schema.null_bits.get(col_idx), null_result, offset, field.unpack_from, op, value))
+
+        if not checks:
+            return None, where
+
+        def predicate(data: bytes) -> bool:
+            for null_bit, null_result, offset, unpack_from, op, value in checks:
+                if null_bit is not None and data[null_bit >> 3] >> (null_bit & 7) & 1:
+                    if not null_result:
+                        return False
+                    continue
+                if not op(unpack_from(data, offset)[0], value):
+                    return False
+            return True
+
+        if not residual:
+            return predicate, None
+        rest = residual[0]
+        for expr in residual[1:]:
+            rest = BinaryOp('AND', rest, expr)
+        return predicate, rest
+
     def _eval_operand(self, operand: Expression, tuple_obj: Tuple, schema: TableSchema) -> Any:
         """Evaluate single operand"""
         if isinstance(operand, ColumnRef):
@@ -649,15 +828,24 @@ class QueryExecutor:
 
     def _like_match(self, text: str, pattern: str) -> bool:
         """SQL LIKE pattern matching: % = wildcard, _ = single char"""
-        # Convert SQL LIKE pattern to regex
-        regex_pattern = pattern.replace('%', '.*').replace('_', '.')
-        regex_pattern = re.escape(pattern).replace('\\%', '.*').replace('\\_', '.')
-        return re.match(f'^{regex_pattern}$', text) is not None
+        return _like_matcher(pattern)(text)
 
     # ========================================================================
     # Helper methods - Resource management
     # ========================================================================
 
+    def _replace_heap_file(self, table_name: str, new_heap: HeapFile, heap_path: str):
+        """Move a rebuilt heap over the table's heap file, closing both open heaps"""
+        # Write the rebuilt pages out while new_heap can still take them
+        self.buffer_pool.flush_all()
+        for heap in (new_heap, self.heap_files.pop(table_name, None)):
+            if heap is None:
+                continue
+            for page_num in range(heap.page_count):
+                self.buffer_pool.invalidate(heap.file_path, page_num)
+            heap.close()
+        shutil.move(new_heap.file_path, heap_path)
+
     def _get_heap_file(self, table_name: str) -> HeapFile:
         """Get or load HeapFile for table"""
         if table_name not in self.heap_files:
@@ -732,11 +920,8 @@ class QueryExecutor:
         schema = self.catalog.get_table(cmd.table_name)
 
         # Check if column already exists
-        try:
-            schema.get_column(cmd.column_name)
+        if schema.has_column(cmd.column_name):
             raise ValueError(f"Column '{cmd.column_name}' already exists in table '{cmd.table_name}'")
-        except ValueError:
-            pass  # Column doesn't exist, which is what we want
 
         # Save old schema for tuple migration
         old_schema = TableSchema(
@@ -753,6 +938,7 @@ class QueryExecutor:
             unique=cmd.unique
         )
         schema.columns.append(new_column)
+        schema.rebuild_cache()
 
         # Update all existing tuples (add NULL for new column)
         # We need to scan raw tuple data before updating the schema
@@ -762,18 +948,14 @@ class QueryExecutor:
         # Manually scan pages to get raw tuple data
         for page_num in range(heap.page_count):
             page = heap._read_page(page_num)
-            for offset, tuple_data in page.tuples:
-                # Skip deleted tuples
-                if len(tuple_data) > 0 and tuple_data[0] == 0xFF:
-                    continue
-
+            for slot_id, tuple_data in page.iter_live():
                 # Deserialize with OLD schema
                 old_tuple = Tuple.deserialize(tuple_data, old_schema)
 
                 # Create new values list with added column
                 new_values = old_tuple.values + [None]  # New column is NULL for existing rows
 
-                ctid = (page_num, offset)
+                ctid = (page_num, slot_id)
                 tuples_to_update.append((ctid, new_values))
 
         # Update catalog first
@@ -785,7 +967,6 @@ class QueryExecutor:
         temp_heap_path = heap_path + ".tmp"
 
         # Create new heap file with updated schema
-        from .storage import HeapFile
         new_heap = HeapFile(temp_heap_path, schema, self.buffer_pool)
         new_heap.create()
 
@@ -796,27 +977,22 @@ class QueryExecutor:
             new_heap.insert_tuple(new_tuple)
 
         # Replace old heap file with new one
-        if heap_path in self.heap_files:
-            del self.heap_files[heap_path]
-
-        import shutil
-        shutil.move(temp_heap_path, heap_path)
+        self._replace_heap_file(cmd.table_name, new_heap, heap_path)
 
         # Remove all old indexes for this table since ctids changed
         # Note: For simplicity, indexes are not automatically rebuilt
         # Users should recreate indexes with CREATE INDEX after ALTER TABLE
-        indexes = self.catalog.get_indexes_for_table(cmd.table_name)
-        for idx_metadata in indexes:
+        for idx_metadata in self.catalog.get_indexes_for_table(cmd.table_name):
+            # Close and remove from cache
+            idx_key = f"{cmd.table_name}_{idx_metadata.index_name}"
+            index = self.indexes.pop(idx_key, None)
+            if index is not None:
+                index.close()
             idx_file = os.path.join(self.data_dir, idx_metadata.index_file)
             if os.path.exists(idx_file):
                 os.remove(idx_file)
-            # Remove from cache
-            idx_key = f"{cmd.table_name}:{idx_metadata.index_name}"
-            if idx_key in self.indexes:
-                del self.indexes[idx_key]
             # Remove from catalog
-            if idx_metadata.index_name in self.catalog.indexes:
-                del self.catalog.indexes[idx_metadata.index_name]
+            self.catalog.indexes.pop(idx_key, None)
 
         # Save updated catalog without the old indexes
         self.catalog.save()
@@ -863,6 +1039,7 @@ class QueryExecutor:
 
         # Remove column from schema
         del schema.columns[col_idx]
+        schema.rebuild_cache()
 
         # Remove any indexes on this column
         indexes_to_remove = []
@@ -872,6 +1049,9 @@ class QueryExecutor:
 
         for idx_name in indexes_to_remove:
             idx_metadata = self.catalog.indexes[idx_name]
+            index = self.indexes.pop(idx_name, None)
+            if index is not None:
+                index.close()
             idx_file = os.path.join(self.data_dir, idx_metadata.index_file)
             if os.path.exists(idx_file):
                 os.remove(idx_file)
@@ -884,18 +1064,14 @@ class QueryExecutor:
         # Manually scan pages to get raw tuple data
         for page_num in range(heap.page_count):
             page = heap._read_page(page_num)
-            for offset, tuple_data in page.tuples:
-                # Skip deleted tuples
-                if len(tuple_data) > 0 and tuple_data[0] == 0xFF:
-                    continue
-
+            for slot_id, tuple_data in page.iter_live():
                 # Parse with OLD schema
                 old_tuple = Tuple.deserialize(tuple_data, old_schema)
 
                 # Create new values list without the dropped column
                 new_values = old_tuple.values[:col_idx] + old_tuple.values[col_idx+1:]
 
-                ctid = (page_num, offset)
+                ctid = (page_num, slot_id)
                 tuples_to_update.append((ctid, new_values))
 
         # Update catalog first
@@ -906,7 +1082,6 @@ class QueryExecutor:
         temp_heap_path = heap_path + ".tmp"
 
         # Create new heap file with updated schema
-        from .storage import HeapFile
         new_heap = HeapFile(temp_heap_path, schema, self.buffer_pool)
         new_heap.create()
 
@@ -917,27 +1092,22 @@ class QueryExecutor:
             new_heap.insert_tuple(new_tuple)
 
         # Replace old heap file with new one
-        if heap_path in self.heap_files:
-            del self.heap_files[heap_path]
-
-        import shutil
-        shutil.move(temp_heap_path, heap_path)
+        self._replace_heap_file(cmd.table_name, new_heap, heap_path)
 
         # Remove all remaining indexes for this table since ctids changed
         # (Note: indexes on dropped column were already removed above)
         # Users should recreate indexes with CREATE INDEX after ALTER TABLE
-        indexes = self.catalog.get_indexes_for_table(cmd.table_name)
-        for idx_metadata in indexes:
+        for idx_metadata in self.catalog.get_indexes_for_table(cmd.table_name):
+            # Close and remove from cache
+            idx_key = f"{cmd.table_name}_{idx_metadata.index_name}"
+            index = self.indexes.pop(idx_key, None)
+            if index is not None:
+                index.close()
             idx_file = os.path.join(self.data_dir, idx_metadata.index_file)
             if os.path.exists(idx_file):
                 os.remove(idx_file)
-            # Remove from cache
-            idx_key = f"{cmd.table_name}:{idx_metadata.index_name}"
-            if idx_key in self.indexes:
-                del self.indexes[idx_key]
             # Remove from catalog
-            if idx_metadata.index_name in self.catalog.indexes:
-                del self.catalog.indexes[idx_metadata.index_name]
+            self.catalog.indexes.pop(idx_key, None)
 
         # Save updated catalog without the old indexes
         self.catalog.save()
@@ -955,12 +1125,12 @@ class QueryExecutor:
             raise ValueError(f"Column '{cmd.old_column_name}' does not exist in table '{cmd.table_name}'")
 
         # Check if new column name already exists
-        existing_column_names = [col.name for col in schema.columns]
-        if cmd.new_column_name in existing_column_names:
+        if schema.has_column(cmd.new_column_name):
             raise ValueError(f"Column '{cmd.new_column_name}' already exists in table '{cmd.table_name}'")
 
         # Rename the column
         schema.columns[col_idx].name = cmd.new_column_name
+        schema.rebuild_cache()
 
         # Update primary key if this column is part of it
         if cmd.old_column_name in schema.primary_key:
@@ -997,7 +1167,8 @@ class QueryExecutor:
         if not self.in_transaction:
             raise ValueError("No active transaction to commit")
 
-        # Flush all changes to disk
+        # Flush all changes to disk; statistics updated during the
+        # transaction were held in memory and are written by this one save
         self.buffer_pool.flush_all()
         self.catalog.save()
 
@@ -1017,13 +1188,17 @@ class QueryExecutor:
         # This works because we haven't flushed dirty pages yet
 
         # Clear buffer pool (discard dirty pages)
-        self.buffer_pool = BufferPool()
+        self.buffer_pool = BufferPool(size=self.buffer_pool_size)
 
         # Reload catalog from disk
         self.catalog.load()
 
         # Reopen all heap files and indexes
+        for heap in self.heap_files.values():
+            heap.close()
         self.heap_files = {}
+        for index in self.indexes.values():
+            index.close()
         self.indexes = {}
 
         # Clear transaction state
@@ -1040,3 +1215,33 @@ class QueryExecutor:
         """Flush all buffers and close files"""
         self.buffer_pool.flush_all()
         self.catalog.save()
+        for heap in self.heap_files.values():
+            heap.save_fsm()
+            heap.close()
+        self.heap_files = {}
+        for index in self.indexes.values():
+            index.close()
+        self.indexes = {}
+
+    # ========================================================================
+    # Dispatch table (command type -> executor method)
+    # ========================================================================
+
+    _COMMAND_EXECUTORS = {
+        CreateTableCommand: execute_create_table,
+        CreateIndexCommand: execute_create_index,
+        DropTableCommand: execute_drop_table,
+        InsertCommand: execute_insert,
+        SelectCommand: execute_select,
+        UpdateCommand: execute_update,
+        DeleteCommand: execute_delete,
+        ExplainCommand: execute_explain,
+        AnalyzeCommand: execute_analyze,
+        VacuumCommand: execute_vacuum,
+        AlterTableAddColumnCommand: execute_alter_table_add_column,
+        AlterTableDropColumnCommand: execute_alter_table_drop_column,
+        AlterTableRenameColumnCommand: execute_alter_table_rename_column,
+        BeginCommand: execute_begin,
+        CommitCommand: execute_commit,
+        RollbackCommand: execute_rollback,
+    }
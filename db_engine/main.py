@@ -13,6 +13,7 @@ import os
 import sys
 
 from .executor import QueryExecutor
+from .parser import parse_sql, SelectCommand
 from .repl import REPL
 
 
@@ -81,8 +82,6 @@ Examples:
 
 def execute_sql(executor: QueryExecutor, sql: str) -> int:
     """Execute single SQL command"""
-    from .parser import parse_sql, SelectCommand
-
     try:
         command = parse_sql(sql)
         result = executor.execute(command)
@@ -109,8 +108,6 @@ def execute_sql(executor: QueryExecutor, sql: str) -> int:
 
 def execute_file(executor: QueryExecutor, filename: str) -> int:
     """Execute SQL commands from file"""
-    from .parser import parse_sql, SelectCommand
-
     try:
         with open(filename, 'r') as f:
             lines = f.readlines()
@@ -9,12 +9,13 @@ This module provides:
 
 from typing import List, Optional, Any
 from dataclasses import dataclass
-from enum import Enum, auto
+from enum import IntEnum, auto
 import re
+from sys import intern
 
 
-class TokenType(Enum):
-    """Token types for SQL lexical analysis"""
+class TokenType(IntEnum):
+    """Token types for SQL lexical analysis (int-valued so they can index tables)"""
     # Keywords
     SELECT = auto()
     FROM = auto()
@@ -92,9 +93,116 @@ class TokenType(Enum):
     EOF = auto()
 
 
+# Operator strings indexed by comparison TokenType (list index instead of dict lookup)
+_OP_STR: List[Optional[str]] = [None] * (max(TokenType) + 1)
+_OP_STR[TokenType.EQ] = '='
+_OP_STR[TokenType.NEQ] = '!='
+_OP_STR[TokenType.LT] = '<'
+_OP_STR[TokenType.GT] = '>'
+_OP_STR[TokenType.LTE] = '<='
+_OP_STR[TokenType.GTE] = '>='
+_OP_STR[TokenType.LIKE] = 'LIKE'
+
+# Boolean connectives by TokenType: (precedence, operator). Higher binds tighter;
+# NOT (3) and comparisons sit above these and are handled in _parse_expression
+_BOOL_PREC = {
+    TokenType.OR: (1, 'OR'),
+    TokenType.AND: (2, 'AND'),
+}
+
+# Token types accepted as a column datatype
+_COL_TYPES = frozenset({
+    TokenType.INT, TokenType.BIGINT, TokenType.FLOAT,
+    TokenType.TEXT, TokenType.BOOLEAN, TokenType.TIMESTAMP,
+})
+
+
+# Master lexer pattern: one named alternative per token class, tried in
+# order at each position. A string is quote-delimited with \' as its only
+# escape (a lone backslash is literal). BAD catches any character no rule
+# accepts, including an opening quote whose string never closes.
+_TOKEN_RE = re.compile(r"""
+    (?P<WS>\s+)
+  | (?P<COMMENT>--[^\n]*)
+  | (?P<STRING>'(?:[^'\\]|\\'|\\(?!'))*')
+  | (?P<NUMBER>\d[\d.]*)
+  | (?P<WORD>[^\W\d]\w*)
+  | (?P<OP><=|>=|!=|[=<>(),;*])
+  | (?P<BAD>.)
+""", re.VERBOSE | re.DOTALL)
+
+# Upper-cased keyword text -> token type, built once at import. Any word
+# not found here is an IDENTIFIER (one dict probe per word)
+_KEYWORDS = {
+    'SELECT': TokenType.SELECT,
+    'FROM': TokenType.FROM,
+    'WHERE': TokenType.WHERE,
+    'INSERT': TokenType.INSERT,
+    'INTO': TokenType.INTO,
+    'VALUES': TokenType.VALUES,
+    'CREATE': TokenType.CREATE,
+    'TABLE': TokenType.TABLE,
+    'INDEX': TokenType.INDEX,
+    'DROP': TokenType.DROP,
+    'DELETE': TokenType.DELETE,
+    'UPDATE': TokenType.UPDATE,
+    'SET': TokenType.SET,
+    'PRIMARY': TokenType.PRIMARY,
+    'KEY': TokenType.KEY,
+    'UNIQUE': TokenType.UNIQUE,
+    'NOT': TokenType.NOT,
+    'NULL': TokenType.NULL,
+    'AND': TokenType.AND,
+    'OR': TokenType.OR,
+    'LIKE': TokenType.LIKE,
+    'EXPLAIN': TokenType.EXPLAIN,
+    'ANALYZE': TokenType.ANALYZE,
+    'VACUUM': TokenType.VACUUM,
+    'LIMIT': TokenType.LIMIT,
+    'OFFSET': TokenType.OFFSET,
+    'ORDER': TokenType.ORDER,
+    'BY': TokenType.BY,
+    'ASC': TokenType.ASC,
+    'DESC': TokenType.DESC,
+    'ALTER': TokenType.ALTER,
+    'ADD': TokenType.ADD,
+    'COLUMN': TokenType.COLUMN,
+    'RENAME': TokenType.RENAME,
+    'TO': TokenType.TO,
+    'BEGIN': TokenType.BEGIN,
+    'COMMIT': TokenType.COMMIT,
+    'ROLLBACK': TokenType.ROLLBACK,
+    'TRANSACTION': TokenType.TRANSACTION,
+    'INT': TokenType.INT,
+    'BIGINT': TokenType.BIGINT,
+    'FLOAT': TokenType.FLOAT,
+    'TEXT': TokenType.TEXT,
+    'BOOLEAN': TokenType.BOOLEAN,
+    'TIMESTAMP': TokenType.TIMESTAMP,
+    'TRUE': TokenType.TRUE,
+    'FALSE': TokenType.FALSE,
+}
+
+# Operator and punctuation text -> token type
+_OPERATORS = {
+    '<=': TokenType.LTE,
+    '>=': TokenType.GTE,
+    '!=': TokenType.NEQ,
+    '=': TokenType.EQ,
+    '<': TokenType.LT,
+    '>': TokenType.GT,
+    '(': TokenType.LPAREN,
+    ')': TokenType.RPAREN,
+    ',': TokenType.COMMA,
+    ';': TokenType.SEMICOLON,
+    '*': TokenType.STAR,
+}
+
+
 @dataclass
 class Token:
     """Represents a single token in SQL input"""
+    __slots__ = ('type', 'value', 'position', 'line', 'column')
     type: TokenType
     value: Any
     position: int  # Character position in input
@@ -105,59 +213,87 @@ class Token:
         return f"Token({self.type.name}, {self.value!r}, pos={self.position})"
 
 
+def tokenize(sql: str) -> List[Token]:
+    """
+    Convert SQL string to list of tokens (ending with EOF)
+
+    A single precompiled pattern (_TOKEN_RE) scans the input in C;
+    m.lastgroup names the token class that matched, and line/column
+    are derived from the last newline seen rather than tracked per char.
+    Tokenizer wraps this for callers that want the object interface.
+    """
+    tokens: List[Token] = []
+    append = tokens.append
+    keyword_type = _KEYWORDS.get
+    line = 1
+    line_start = 0  # Position of the first character on the current line
+
+    for m in _TOKEN_RE.finditer(sql):
+        kind = m.lastgroup
+        start = m.start()
+
+        if kind == 'WS':
+            # Only newlines matter; count them in place without copying the run
+            end = m.end()
+            newlines = sql.count('\n', start, end)
+            if newlines:
+                line += newlines
+                line_start = sql.rfind('\n', start, end) + 1
+        elif kind == 'WORD':
+            # Identifiers and keywords, interned so repeated names share one
+            # object and compare by identity (dict lookups, ==)
+            text = intern(m.group())
+            token_type = keyword_type(text.upper(), TokenType.IDENTIFIER)
+            append(Token(token_type, text, start, line, start - line_start + 1))
+        elif kind == 'OP':
+            # Operators and punctuation
+            text = m.group()
+            append(Token(_OPERATORS[text], text, start, line, start - line_start + 1))
+        elif kind == 'NUMBER':
+            # One greedy run of digits and dots: the match never rewinds, and
+            # the single count() below both validates it and picks the type
+            text = m.group()
+            dots = text.count('.')
+            if dots > 1:
+                raise SyntaxError(
+                    f"Invalid number format at line {line}, column {start - line_start + 1}"
+                )
+            num_value = float(text) if dots else int(text)
+            append(Token(TokenType.NUMBER, num_value, start, line, start - line_start + 1))
+        elif kind == 'STRING':
+            # Slice the body once, without the quotes; \' is the only escape
+            end = m.end()
+            value = sql[start + 1:end - 1]
+            if '\\' in value:
+                value = value.replace("\\'", "'")
+            append(Token(TokenType.STRING, value, start, line, start - line_start + 1))
+            # String literals may span lines
+            newlines = sql.count('\n', start, end)
+            if newlines:
+                line += newlines
+                line_start = sql.rfind('\n', start, end) + 1
+        elif kind == 'BAD':
+            text = m.group()
+            if text == "'":
+                raise SyntaxError(
+                    f"Unterminated string literal at line {line}, column {start - line_start + 1}"
+                )
+            raise SyntaxError(
+                f"Unexpected character '{text}' at line {line}, column {start - line_start + 1}"
+            )
+        # COMMENT produces no token (and stops before its newline)
+
+    # Add EOF token
+    end = len(sql)
+    tokens.append(Token(TokenType.EOF, None, end, line, end - line_start + 1))
+    return tokens
+
+
 class Tokenizer:
     """Lexical analyzer - converts SQL text to tokens"""
 
-    # Keywords mapping (case-insensitive)
-    KEYWORDS = {
-        'SELECT': TokenType.SELECT,
-        'FROM': TokenType.FROM,
-        'WHERE': TokenType.WHERE,
-        'INSERT': TokenType.INSERT,
-        'INTO': TokenType.INTO,
-        'VALUES': TokenType.VALUES,
-        'CREATE': TokenType.CREATE,
-        'TABLE': TokenType.TABLE,
-        'INDEX': TokenType.INDEX,
-        'DROP': TokenType.DROP,
-        'DELETE': TokenType.DELETE,
-        'UPDATE': TokenType.UPDATE,
-        'SET': TokenType.SET,
-        'PRIMARY': TokenType.PRIMARY,
-        'KEY': TokenType.KEY,
-        'UNIQUE': TokenType.UNIQUE,
-        'NOT': TokenType.NOT,
-        'NULL': TokenType.NULL,
-        'AND': TokenType.AND,
-        'OR': TokenType.OR,
-        'LIKE': TokenType.LIKE,
-        'EXPLAIN': TokenType.EXPLAIN,
-        'ANALYZE': TokenType.ANALYZE,
-        'VACUUM': TokenType.VACUUM,
-        'LIMIT': TokenType.LIMIT,
-        'OFFSET': TokenType.OFFSET,
-        'ORDER': TokenType.ORDER,
-        'BY': TokenType.BY,
-        'ASC': TokenType.ASC,
-        'DESC': TokenType.DESC,
-        'ALTER': TokenType.ALTER,
-        'ADD': TokenType.ADD,
-        'COLUMN': TokenType.COLUMN,
-        'RENAME': TokenType.RENAME,
-        'TO': TokenType.TO,
-        'BEGIN': TokenType.BEGIN,
-        'COMMIT': TokenType.COMMIT,
-        'ROLLBACK': TokenType.ROLLBACK,
-        'TRANSACTION': TokenType.TRANSACTION,
-        'INT': TokenType.INT,
-        'BIGINT': TokenType.BIGINT,
-        'FLOAT': TokenType.FLOAT,
-        'TEXT': TokenType.TEXT,
-        'BOOLEAN': TokenType.BOOLEAN,
-        'TIMESTAMP': TokenType.TIMESTAMP,
-        'TRUE': TokenType.TRUE,
-        'FALSE': TokenType.FALSE,
-    }
+    # Keywords mapping (case-insensitive), shared with the module-level table
+    KEYWORDS = _KEYWORDS
 
     def __init__(self, sql: str):
         self.sql = sql
@@ -167,196 +303,12 @@ class Tokenizer:
         self.tokens: List[Token] = []
 
     def tokenize(self) -> List[Token]:
-        """Convert SQL string to list of tokens"""
-        while self.position < len(self.sql):
-            # Skip whitespace
-            if self._current_char().isspace():
-                self._skip_whitespace()
-                continue
-
-            # Skip comments
-            if self._current_char() == '-' and self._peek() == '-':
-                self._skip_comment()
-                continue
-
-            # String literals
-            if self._current_char() == "'":
-                self._read_string()
-                continue
-
-            # Numbers
-            if self._current_char().isdigit():
-                self._read_number()
-                continue
-
-            # Identifiers and keywords
-            if self._current_char().isalpha() or self._current_char() == '_':
-                self._read_identifier_or_keyword()
-                continue
-
-            # Operators and punctuation
-            if self._try_operator():
-                continue
-
-            # Unknown character
-            raise SyntaxError(
-                f"Unexpected character '{self._current_char()}' at line {self.line}, column {self.column}"
-            )
-
-        # Add EOF token
-        self.tokens.append(Token(TokenType.EOF, None, self.position, self.line, self.column))
+        """Convert SQL string to list of tokens (see the module-level tokenize)"""
+        self.tokens = tokenize(self.sql)
+        eof = self.tokens[-1]
+        self.position, self.line, self.column = eof.position, eof.line, eof.column
         return self.tokens
 
-    def _current_char(self) -> str:
-        """Get current character"""
-        if self.position >= len(self.sql):
-            return '\0'
-        return self.sql[self.position]
-
-    def _peek(self, offset: int = 1) -> str:
-        """Look ahead at next character"""
-        pos = self.position + offset
-        if pos >= len(self.sql):
-            return '\0'
-        return self.sql[pos]
-
-    def _advance(self) -> str:
-        """Move to next character"""
-        char = self._current_char()
-        self.position += 1
-        if char == '\n':
-            self.line += 1
-            self.column = 1
-        else:
-            self.column += 1
-        return char
-
-    def _skip_whitespace(self):
-        """Skip whitespace characters"""
-        while self._current_char().isspace():
-            self._advance()
-
-    def _skip_comment(self):
-        """Skip single-line comment (-- ...)"""
-        while self._current_char() != '\n' and self._current_char() != '\0':
-            self._advance()
-
-    def _read_string(self):
-        """Read string literal enclosed in single quotes"""
-        start_pos = self.position
-        start_line = self.line
-        start_col = self.column
-
-        self._advance()  # Skip opening quote
-
-        value = ''
-        while self._current_char() != "'" and self._current_char() != '\0':
-            if self._current_char() == '\\' and self._peek() == "'":
-                # Escaped quote
-                self._advance()
-                value += self._advance()
-            else:
-                value += self._advance()
-
-        if self._current_char() != "'":
-            raise SyntaxError(
-                f"Unterminated string literal at line {start_line}, column {start_col}"
-            )
-
-        self._advance()  # Skip closing quote
-
-        self.tokens.append(Token(TokenType.STRING, value, start_pos, start_line, start_col))
-
-    def _read_number(self):
-        """Read integer or float literal"""
-        start_pos = self.position
-        start_line = self.line
-        start_col = self.column
-
-        value = ''
-        has_dot = False
-
-        while self._current_char().isdigit() or self._current_char() == '.':
-            if self._current_char() == '.':
-                if has_dot:
-                    raise SyntaxError(
-                        f"Invalid number format at line {start_line}, column {start_col}"
-                    )
-                has_dot = True
-            value += self._advance()
-
-        # Convert to appropriate type
-        if has_dot:
-            num_value = float(value)
-        else:
-            num_value = int(value)
-
-        self.tokens.append(Token(TokenType.NUMBER, num_value, start_pos, start_line, start_col))
-
-    def _read_identifier_or_keyword(self):
-        """Read identifier or keyword"""
-        start_pos = self.position
-        start_line = self.line
-        start_col = self.column
-
-        value = ''
-        while self._current_char().isalnum() or self._current_char() == '_':
-            value += self._advance()
-
-        # Check if it's a keyword
-        upper_value = value.upper()
-        if upper_value in self.KEYWORDS:
-            token_type = self.KEYWORDS[upper_value]
-        else:
-            token_type = TokenType.IDENTIFIER
-
-        self.tokens.append(Token(token_type, value, start_pos, start_line, start_col))
-
-    def _try_operator(self) -> bool:
-        """Try to read operator or punctuation"""
-        start_pos = self.position
-        start_line = self.line
-        start_col = self.column
-
-        char = self._current_char()
-        next_char = self._peek()
-
-        # Two-character operators
-        if char == '!' and next_char == '=':
-            self._advance()
-            self._advance()
-            self.tokens.append(Token(TokenType.NEQ, '!=', start_pos, start_line, start_col))
-            return True
-        elif char == '<' and next_char == '=':
-            self._advance()
-            self._advance()
-            self.tokens.append(Token(TokenType.LTE, '<=', start_pos, start_line, start_col))
-            return True
-        elif char == '>' and next_char == '=':
-            self._advance()
-            self._advance()
-            self.tokens.append(Token(TokenType.GTE, '>=', start_pos, start_line, start_col))
-            return True
-
-        # Single-character operators/punctuation
-        single_chars = {
-            '=': TokenType.EQ,
-            '<': TokenType.LT,
-            '>': TokenType.GT,
-            '(': TokenType.LPAREN,
-            ')': TokenType.RPAREN,
-            ',': TokenType.COMMA,
-            ';': TokenType.SEMICOLON,
-            '*': TokenType.STAR,
-        }
-
-        if char in single_chars:
-            self._advance()
-            self.tokens.append(Token(single_chars[char], char, start_pos, start_line, start_col))
-            return True
-
-        return False
-
 
 # ============================================================================
 # Expression Tree (for WHERE clauses)
@@ -364,12 +316,13 @@ class Tokenizer:
 
 class Expression:
     """Base class for expression nodes"""
-    pass
+    __slots__ = ()
 
 
 @dataclass
 class BinaryOp(Expression):
     """Binary operation: left op right"""
+    __slots__ = ('op', 'left', 'right')
     op: str  # '=', '!=', '<', '>', '<=', '>=', 'AND', 'OR', 'LIKE'
     left: Expression
     right: Expression
@@ -378,6 +331,7 @@ class BinaryOp(Expression):
 @dataclass
 class UnaryOp(Expression):
     """Unary operation: op operand"""
+    __slots__ = ('op', 'operand')
     op: str  # 'NOT'
     operand: Expression
 
@@ -385,6 +339,7 @@ class UnaryOp(Expression):
 @dataclass
 class Literal(Expression):
     """Literal value (number, string, boolean, NULL)"""
+    __slots__ = ('value', 'datatype')
     value: Any
     datatype: str  # 'INT', 'FLOAT', 'STRING', 'BOOLEAN', 'NULL'
 
@@ -392,24 +347,56 @@ class Literal(Expression):
 @dataclass
 class ColumnRef(Expression):
     """Reference to a column"""
+    __slots__ = ('column_name',)
     column_name: str
 
 
+# Shared immutable literals - NULL/TRUE/FALSE and small integers are built
+# once and reused instead of allocating a fresh node per occurrence
+_NULL_LITERAL = Literal(None, 'NULL')
+_TRUE_LITERAL = Literal(True, 'BOOLEAN')
+_FALSE_LITERAL = Literal(False, 'BOOLEAN')
+_SMALL_INT_POOL = {i: Literal(i, 'INT') for i in range(257)}
+_KEYWORD_LITERALS = {
+    TokenType.NULL: _NULL_LITERAL,
+    TokenType.TRUE: _TRUE_LITERAL,
+    TokenType.FALSE: _FALSE_LITERAL,
+}
+
+
 # ============================================================================
 # Command Objects (parsed SQL commands)
 # ============================================================================
 
 @dataclass
 class CreateTableCommand:
-    """CREATE TABLE table_name (columns...) PRIMARY KEY (...)"""
+    """
+    CREATE TABLE table_name (columns...) PRIMARY KEY (...)
+
+    Column definitions are stored as parallel arrays; the nullable and unique
+    flags are bitmasks where bit i describes column i.
+    """
+    __slots__ = ('table_name', 'column_names', 'column_types', 'nullable_mask', 'unique_mask', 'primary_key')
     table_name: str
-    columns: List[tuple]  # [(name, datatype, nullable, unique), ...]
+    column_names: List[str]
+    column_types: List[str]  # 'INT', 'TEXT', ...
+    nullable_mask: int
+    unique_mask: int
     primary_key: List[str]  # Column names
 
+    @property
+    def columns(self) -> List[tuple]:
+        """Column definitions as [(name, datatype, nullable, unique), ...]"""
+        return [
+            (name, datatype, bool(self.nullable_mask & (1 << i)), bool(self.unique_mask & (1 << i)))
+            for i, (name, datatype) in enumerate(zip(self.column_names, self.column_types))
+        ]
+
 
 @dataclass
 class CreateIndexCommand:
     """CREATE [UNIQUE] INDEX index_name ON table_name (columns)"""
+    __slots__ = ('index_name', 'table_name', 'columns', 'unique')
     index_name: str
     table_name: str
     columns: List[str]
@@ -419,12 +406,14 @@ class CreateIndexCommand:
 @dataclass
 class DropTableCommand:
     """DROP TABLE table_name"""
+    __slots__ = ('table_name',)
     table_name: str
 
 
 @dataclass
 class InsertCommand:
     """INSERT INTO table_name [(columns)] VALUES (values)"""
+    __slots__ = ('table_name', 'columns', 'values')
     table_name: str
     columns: Optional[List[str]]  # None means all columns
     values: List[Any]
@@ -433,6 +422,7 @@ class InsertCommand:
 @dataclass
 class SelectCommand:
     """SELECT columns FROM table_name [WHERE expr] [ORDER BY ...] [LIMIT n] [OFFSET n]"""
+    __slots__ = ('table_name', 'columns', 'where', 'order_by', 'limit', 'offset')
     table_name: str
     columns: List[str]  # ['*'] or specific columns
     where: Optional[Expression]
@@ -444,6 +434,7 @@ class SelectCommand:
 @dataclass
 class UpdateCommand:
     """UPDATE table_name SET col=val, ... [WHERE expr]"""
+    __slots__ = ('table_name', 'assignments', 'where')
     table_name: str
     assignments: List[tuple]  # [(column, value_expr), ...]
     where: Optional[Expression]
@@ -452,6 +443,7 @@ class UpdateCommand:
 @dataclass
 class DeleteCommand:
     """DELETE FROM table_name [WHERE expr]"""
+    __slots__ = ('table_name', 'where')
     table_name: str
     where: Optional[Expression]
 
@@ -459,24 +451,28 @@ class DeleteCommand:
 @dataclass
 class ExplainCommand:
     """EXPLAIN query"""
+    __slots__ = ('command',)
     command: Any  # The command to explain (SELECT, UPDATE, DELETE)
 
 
 @dataclass
 class AnalyzeCommand:
     """ANALYZE [table_name]"""
+    __slots__ = ('table_name',)
     table_name: Optional[str]  # None means all tables
 
 
 @dataclass
 class VacuumCommand:
     """VACUUM [table_name]"""
+    __slots__ = ('table_name',)
     table_name: Optional[str]  # None means all tables
 
 
 @dataclass
 class AlterTableAddColumnCommand:
     """ALTER TABLE table_name ADD COLUMN column_name datatype [constraints]"""
+    __slots__ = ('table_name', 'column_name', 'datatype', 'nullable', 'unique')
     table_name: str
     column_name: str
     datatype: str
@@ -487,6 +483,7 @@ class AlterTableAddColumnCommand:
 @dataclass
 class AlterTableDropColumnCommand:
     """ALTER TABLE table_name DROP COLUMN column_name"""
+    __slots__ = ('table_name', 'column_name')
     table_name: str
     column_name: str
 
@@ -494,6 +491,7 @@ class AlterTableDropColumnCommand:
 @dataclass
 class AlterTableRenameColumnCommand:
     """ALTER TABLE table_name RENAME COLUMN old_name TO new_name"""
+    __slots__ = ('table_name', 'old_column_name', 'new_column_name')
     table_name: str
     old_column_name: str
     new_column_name: str
@@ -502,19 +500,19 @@ class AlterTableRenameColumnCommand:
 @dataclass
 class BeginCommand:
     """BEGIN [TRANSACTION]"""
-    pass
+    __slots__ = ()
 
 
 @dataclass
 class CommitCommand:
     """COMMIT"""
-    pass
+    __slots__ = ()
 
 
 @dataclass
 class RollbackCommand:
     """ROLLBACK"""
-    pass
+    __slots__ = ()
 
 
 # ============================================================================
@@ -533,49 +531,37 @@ class Parser:
         if self._at_end():
             raise SyntaxError("Empty SQL statement")
 
+        # Utility statements that cannot appear inside EXPLAIN
+        handler = self._UTILITY_PARSERS.get(self._current().type)
+        if handler is not None:
+            return handler(self)
+
+        return self._parse_statement_body(
+            "Expected SELECT, INSERT, UPDATE, DELETE, CREATE, DROP, EXPLAIN, ANALYZE, VACUUM, ALTER, BEGIN, COMMIT, or ROLLBACK."
+        )
+
+    def _parse_statement_body(self, expected: str = "Expected SELECT, INSERT, UPDATE, DELETE, CREATE, DROP, or ALTER."):
+        """Dispatch DML/DDL statements (shared by parse() and EXPLAIN)"""
         token = self._current()
 
-        # Dispatch based on first keyword
-        if token.type == TokenType.SELECT:
-            return self._parse_select()
-        elif token.type == TokenType.INSERT:
-            return self._parse_insert()
-        elif token.type == TokenType.UPDATE:
-            return self._parse_update()
-        elif token.type == TokenType.DELETE:
-            return self._parse_delete()
-        elif token.type == TokenType.CREATE:
-            return self._parse_create()
-        elif token.type == TokenType.DROP:
-            return self._parse_drop()
-        elif token.type == TokenType.EXPLAIN:
-            return self._parse_explain()
-        elif token.type == TokenType.ANALYZE:
-            return self._parse_analyze()
-        elif token.type == TokenType.VACUUM:
-            return self._parse_vacuum()
-        elif token.type == TokenType.ALTER:
-            return self._parse_alter()
-        elif token.type == TokenType.BEGIN:
-            return self._parse_begin()
-        elif token.type == TokenType.COMMIT:
-            return self._parse_commit()
-        elif token.type == TokenType.ROLLBACK:
-            return self._parse_rollback()
-        else:
+        handler = self._STATEMENT_PARSERS.get(token.type)
+        if handler is None:
             raise SyntaxError(
                 f"Unexpected token '{token.value}' at line {token.line}, column {token.column}. "
-                f"Expected SELECT, INSERT, UPDATE, DELETE, CREATE, DROP, EXPLAIN, ANALYZE, VACUUM, ALTER, BEGIN, COMMIT, or ROLLBACK."
+                f"{expected}"
             )
+        return handler(self)
 
     # ========================================================================
     # Helper methods for token navigation
     # ========================================================================
 
+    # Token helpers. The token list always ends with EOF and _advance() never
+    # moves past it, so self.position is always a valid index and the helpers
+    # index directly instead of bounds-checking through each other.
+
     def _current(self) -> Token:
         """Get current token"""
-        if self.position >= len(self.tokens):
-            return self.tokens[-1]  # Return EOF
         return self.tokens[self.position]
 
     def _peek(self, offset: int = 1) -> Token:
@@ -587,19 +573,19 @@ class Parser:
 
     def _advance(self) -> Token:
         """Move to next token and return current"""
-        token = self._current()
-        if not self._at_end():
+        token = self.tokens[self.position]
+        if token.type is not TokenType.EOF:
             self.position += 1
         return token
 
     def _at_end(self) -> bool:
         """Check if at end of tokens"""
-        return self._current().type == TokenType.EOF
+        return self.tokens[self.position].type is TokenType.EOF
 
     def _expect(self, token_type: TokenType, message: str = None) -> Token:
         """Consume token of expected type or raise error"""
-        token = self._current()
-        if token.type != token_type:
+        token = self.tokens[self.position]
+        if token.type is not token_type:
             if message:
                 raise SyntaxError(
                     f"{message} at line {token.line}, column {token.column}. "
@@ -614,12 +600,12 @@ class Parser:
 
     def _match(self, *token_types: TokenType) -> bool:
         """Check if current token matches any of the given types"""
-        return self._current().type in token_types
+        return self.tokens[self.position].type in token_types
 
     def _consume_if(self, token_type: TokenType) -> bool:
         """Consume token if it matches, return True if consumed"""
-        if self._match(token_type):
-            self._advance()
+        if self.tokens[self.position].type is token_type:
+            self._advance()  # Never steps past EOF
             return True
         return False
 
@@ -700,105 +686,74 @@ class Parser:
     # WHERE clause expression parsing (with operator precedence)
     # ========================================================================
 
-    def _parse_expression(self) -> Expression:
-        """Parse expression (entry point for WHERE clause)"""
-        return self._parse_or()
-
-    def _parse_or(self) -> Expression:
-        """Parse OR expression (lowest precedence)"""
-        left = self._parse_and()
-
-        while self._consume_if(TokenType.OR):
-            right = self._parse_and()
-            left = BinaryOp('OR', left, right)
-
-        return left
-
-    def _parse_and(self) -> Expression:
-        """Parse AND expression"""
-        left = self._parse_not()
-
-        while self._consume_if(TokenType.AND):
-            right = self._parse_not()
-            left = BinaryOp('AND', left, right)
+    def _parse_expression(self, min_prec: int = 1) -> Expression:
+        """Parse expression by precedence climbing (entry point for WHERE clause)
 
-        return left
+        Levels, loosest first: OR (1), AND (2), NOT (3), comparison. Only
+        operators binding at least as tightly as min_prec are consumed here;
+        looser ones are left for the caller.
+        """
+        token = self.tokens[self.position]
 
-    def _parse_not(self) -> Expression:
-        """Parse NOT expression"""
-        if self._consume_if(TokenType.NOT):
-            operand = self._parse_not()  # Right-associative
-            return UnaryOp('NOT', operand)
-
-        return self._parse_comparison()
-
-    def _parse_comparison(self) -> Expression:
-        """Parse comparison expression"""
-        left = self._parse_primary()
-
-        # Comparison operators
-        if self._match(TokenType.EQ, TokenType.NEQ, TokenType.LT, TokenType.GT,
-                       TokenType.LTE, TokenType.GTE, TokenType.LIKE):
-            op_token = self._advance()
-
-            # Map token type to operator string
-            op_map = {
-                TokenType.EQ: '=',
-                TokenType.NEQ: '!=',
-                TokenType.LT: '<',
-                TokenType.GT: '>',
-                TokenType.LTE: '<=',
-                TokenType.GTE: '>=',
-                TokenType.LIKE: 'LIKE',
-            }
-            op = op_map[op_token.type]
+        if token.type is TokenType.NOT:
+            self.position += 1
+            left = UnaryOp('NOT', self._parse_expression(3))  # Right-associative
+        else:
+            left = self._parse_primary()
 
-            right = self._parse_primary()
-            return BinaryOp(op, left, right)
+            # Comparison operators (non-associative: at most one per operand pair)
+            op = _OP_STR[self.tokens[self.position].type]
+            if op is not None:
+                self.position += 1
+                left = BinaryOp(op, left, self._parse_primary())
 
-        return left
+        # Left-associative AND/OR
+        while True:
+            entry = _BOOL_PREC.get(self.tokens[self.position].type)
+            if entry is None or entry[0] < min_prec:
+                return left
+            prec, op = entry
+            self.position += 1
+            left = BinaryOp(op, left, self._parse_expression(prec + 1))
 
     def _parse_primary(self) -> Expression:
         """Parse primary expression (literals, column refs, parentheses)"""
-        token = self._current()
-
-        # Parenthesized expression
-        if self._consume_if(TokenType.LPAREN):
-            expr = self._parse_expression()
-            self._expect(TokenType.RPAREN, "Expected ')' after expression")
-            return expr
-
-        # NULL literal
-        if self._consume_if(TokenType.NULL):
-            return Literal(None, 'NULL')
-
-        # Boolean literals
-        if self._consume_if(TokenType.TRUE):
-            return Literal(True, 'BOOLEAN')
-
-        if self._consume_if(TokenType.FALSE):
-            return Literal(False, 'BOOLEAN')
-
-        # Number literal
-        if self._match(TokenType.NUMBER):
-            value = self._advance().value
-            datatype = 'FLOAT' if isinstance(value, float) else 'INT'
-            return Literal(value, datatype)
-
-        # String literal
-        if self._match(TokenType.STRING):
-            value = self._advance().value
-            return Literal(value, 'STRING')
-
-        # Column reference
-        if self._match(TokenType.IDENTIFIER):
-            col_name = self._advance().value
-            return ColumnRef(col_name)
+        token = self.tokens[self.position]
+        handler = self._PRIMARY_PARSERS.get(token.type)
+        if handler is None:
+            raise SyntaxError(
+                f"Unexpected token '{token.value}' at line {token.line}, column {token.column}. "
+                f"Expected expression (literal, column name, or parenthesized expression)"
+            )
+        self.position += 1  # Never EOF: EOF has no handler
+        return handler(self, token)
+
+    def _parse_paren_primary(self, token: Token) -> Expression:
+        """Parenthesized expression"""
+        expr = self._parse_expression()
+        self._expect(TokenType.RPAREN, "Expected ')' after expression")
+        return expr
+
+    def _parse_keyword_literal(self, token: Token) -> Expression:
+        """NULL, TRUE or FALSE"""
+        return _KEYWORD_LITERALS[token.type]
+
+    def _parse_number_literal(self, token: Token) -> Expression:
+        """Number literal"""
+        value = token.value
+        if isinstance(value, float):
+            return Literal(value, 'FLOAT')
+        pooled = _SMALL_INT_POOL.get(value)
+        return pooled if pooled is not None else Literal(value, 'INT')
+
+    def _parse_string_literal(self, token: Token) -> Expression:
+        """String literal"""
+        return Literal(token.value, 'STRING')
+
+    def _parse_column_ref(self, token: Token) -> Expression:
+        """Column reference"""
+        return ColumnRef(token.value)
 
-        raise SyntaxError(
-            f"Unexpected token '{token.value}' at line {token.line}, column {token.column}. "
-            f"Expected expression (literal, column name, or parenthesized expression)"
-        )
     # ========================================================================
     # INSERT parsing
     # ========================================================================
@@ -880,68 +835,88 @@ class Parser:
 
         self._expect(TokenType.LPAREN, "Expected '(' after table name")
 
-        # Parse column definitions
-        columns = []
+        # Parse column definitions (parallel arrays + flag bitmasks)
+        names = []
+        types = []
+        nullable_mask = 0
+        unique_mask = 0
         primary_key = []
 
-        while not self._match(TokenType.RPAREN):
+        # Bind token types used in the column loop to locals
+        IDENTIFIER = TokenType.IDENTIFIER
+        COMMA = TokenType.COMMA
+        RPAREN = TokenType.RPAREN
+        PRIMARY = TokenType.PRIMARY
+        KEY = TokenType.KEY
+        NOT = TokenType.NOT
+        NULL = TokenType.NULL
+        UNIQUE = TokenType.UNIQUE
+        current = self._current
+        advance = self._advance
+        expect = self._expect
+
+        while current().type != RPAREN:
             # Check for PRIMARY KEY constraint
-            if self._match(TokenType.PRIMARY):
-                self._advance()
-                self._expect(TokenType.KEY, "Expected KEY after PRIMARY")
-                self._expect(TokenType.LPAREN, "Expected '(' after PRIMARY KEY")
+            if current().type == PRIMARY:
+                advance()
+                expect(KEY, "Expected KEY after PRIMARY")
+                expect(TokenType.LPAREN, "Expected '(' after PRIMARY KEY")
 
                 # Parse primary key columns
-                primary_key.append(self._expect(TokenType.IDENTIFIER, "Expected column name").value)
-                while self._consume_if(TokenType.COMMA):
-                    primary_key.append(self._expect(TokenType.IDENTIFIER, "Expected column name").value)
+                primary_key.append(expect(IDENTIFIER, "Expected column name").value)
+                while self._consume_if(COMMA):
+                    primary_key.append(expect(IDENTIFIER, "Expected column name").value)
 
-                self._expect(TokenType.RPAREN, "Expected ')' after primary key columns")
+                expect(RPAREN, "Expected ')' after primary key columns")
 
                 # Optional trailing comma
-                self._consume_if(TokenType.COMMA)
+                self._consume_if(COMMA)
                 continue
 
             # Parse column definition
-            col_name = self._expect(TokenType.IDENTIFIER, "Expected column name").value
+            col_name = expect(IDENTIFIER, "Expected column name").value
 
             # Data type
-            if not self._match(TokenType.INT, TokenType.BIGINT, TokenType.FLOAT,
-                               TokenType.TEXT, TokenType.BOOLEAN, TokenType.TIMESTAMP):
-                token = self._current()
+            token = current()
+            if token.type not in _COL_TYPES:
                 raise SyntaxError(
                     f"Expected data type at line {token.line}, column {token.column}. "
                     f"Got '{token.value}'"
                 )
 
-            datatype = self._advance().type.name
+            datatype = advance().type.name
 
             # Column constraints
             nullable = True
             unique = False
-            is_primary_key = False
 
             while True:
-                if self._match(TokenType.PRIMARY):
-                    self._advance()
-                    self._expect(TokenType.KEY, "Expected KEY after PRIMARY")
-                    is_primary_key = True
+                token_type = current().type
+                if token_type == PRIMARY:
+                    advance()
+                    expect(KEY, "Expected KEY after PRIMARY")
                     nullable = False
                     primary_key.append(col_name)
-                elif self._match(TokenType.NOT):
-                    self._advance()
-                    self._expect(TokenType.NULL, "Expected NULL after NOT")
+                elif token_type == NOT:
+                    advance()
+                    expect(NULL, "Expected NULL after NOT")
                     nullable = False
-                elif self._match(TokenType.UNIQUE):
-                    self._advance()
+                elif token_type == UNIQUE:
+                    advance()
                     unique = True
                 else:
                     break
 
-            columns.append((col_name, datatype, nullable, unique))
+            bit = 1 << len(names)
+            names.append(col_name)
+            types.append(datatype)
+            if nullable:
+                nullable_mask |= bit
+            if unique:
+                unique_mask |= bit
 
             # Check for comma
-            if not self._consume_if(TokenType.COMMA):
+            if not self._consume_if(COMMA):
                 break
 
         self._expect(TokenType.RPAREN, "Expected ')' after column definitions")
@@ -950,7 +925,7 @@ class Parser:
         if not primary_key:
             raise SyntaxError("Table must have a PRIMARY KEY")
 
-        return CreateTableCommand(table_name, columns, primary_key)
+        return CreateTableCommand(table_name, names, types, nullable_mask, unique_mask, primary_key)
 
     def _parse_create_index(self, unique: bool) -> CreateIndexCommand:
         """Parse CREATE [UNIQUE] INDEX statement"""
@@ -1054,8 +1029,12 @@ class Parser:
         """Parse EXPLAIN statement"""
         self._expect(TokenType.EXPLAIN)
 
-        # Parse the query to explain
-        query = self.parse()
+        # Fast path: EXPLAIN SELECT is by far the most common shape
+        if self._current().type == TokenType.SELECT:
+            return ExplainCommand(self._parse_select())
+
+        # Parse the query to explain (EXPLAIN cannot wrap utility statements)
+        query = self._parse_statement_body()
 
         return ExplainCommand(query)
 
@@ -1119,13 +1098,12 @@ class Parser:
 
         # Datatype
         datatype_token = self._advance()
-        if datatype_token.type not in [TokenType.INT, TokenType.BIGINT, TokenType.FLOAT,
-                                       TokenType.TEXT, TokenType.BOOLEAN, TokenType.TIMESTAMP]:
+        if datatype_token.type not in _COL_TYPES:
             raise SyntaxError(
                 f"Invalid datatype '{datatype_token.value}' at line {datatype_token.line}, "
                 f"column {datatype_token.column}."
             )
-        datatype = datatype_token.value
+        datatype = datatype_token.type.name
 
         # Parse constraints (UNIQUE, NOT NULL)
         nullable = True
@@ -1198,14 +1176,79 @@ class Parser:
         self._consume_if(TokenType.SEMICOLON)
         return RollbackCommand()
 
+    # ========================================================================
+    # Dispatch tables (first keyword -> parse method)
+    # ========================================================================
+
+    _UTILITY_PARSERS = {
+        TokenType.EXPLAIN: _parse_explain,
+        TokenType.ANALYZE: _parse_analyze,
+        TokenType.VACUUM: _parse_vacuum,
+        TokenType.BEGIN: _parse_begin,
+        TokenType.COMMIT: _parse_commit,
+        TokenType.ROLLBACK: _parse_rollback,
+    }
+
+    _PRIMARY_PARSERS = {
+        TokenType.LPAREN: _parse_paren_primary,
+        TokenType.NULL: _parse_keyword_literal,
+        TokenType.TRUE: _parse_keyword_literal,
+        TokenType.FALSE: _parse_keyword_literal,
+        TokenType.NUMBER: _parse_number_literal,
+        TokenType.STRING: _parse_string_literal,
+        TokenType.IDENTIFIER: _parse_column_ref,
+    }
+
+    _STATEMENT_PARSERS = {
+        TokenType.SELECT: _parse_select,
+        TokenType.INSERT: _parse_insert,
+        TokenType.UPDATE: _parse_update,
+        TokenType.DELETE: _parse_delete,
+        TokenType.CREATE: _parse_create,
+        TokenType.DROP: _parse_drop,
+        TokenType.ALTER: _parse_alter,
+    }
+
 
 # ============================================================================
 # Convenience function
 # ============================================================================
 
+# Parsed commands keyed by normalized statement text. Commands are read-only
+# once built, so repeated statements can share one object.
+_PARSE_CACHE_SIZE = 512
+_parse_cache: dict = {}
+
+
+def _cache_key(sql: str) -> str:
+    """Normalize statement text: surrounding whitespace and one trailing ';'"""
+    key = sql.strip()
+    if key.endswith(';'):
+        key = key[:-1].rstrip()
+    return key
+
+
+# Statements without operands, matched on their normalized upper-cased text
+# so they never reach the tokenizer
+_TRIVIAL_COMMANDS = {
+    'BEGIN': BeginCommand(),
+    'BEGIN TRANSACTION': BeginCommand(),
+    'COMMIT': CommitCommand(),
+    'ROLLBACK': RollbackCommand(),
+}
+_TRIVIAL_MAX_LEN = max(map(len, _TRIVIAL_COMMANDS))
+
+
 def parse_sql(sql: str):
-    """Parse SQL string to command object"""
-    tokenizer = Tokenizer(sql)
-    tokens = tokenizer.tokenize()
-    parser = Parser(tokens)
-    return parser.parse()
+    """Parse SQL string to command object (cached; do not mutate the result)"""
+    key = _cache_key(sql)
+    command = _parse_cache.get(key)
+    if command is None:
+        command = _TRIVIAL_COMMANDS.get(key.upper()) if len(key) <= _TRIVIAL_MAX_LEN else None
+        if command is None:
+            # Parse the original text so error positions are unchanged
+            command = Parser(tokenize(sql)).parse()
+        if len(_parse_cache) >= _PARSE_CACHE_SIZE:
+            _parse_cache.pop(next(iter(_parse_cache)))  # Evict oldest entry
+        _parse_cache[key] = command
+    return command
@@ -11,10 +11,52 @@ Provides interactive command-line interface with:
 
 import sys
 import os
-from typing import List, Any
+import time
+from itertools import islice
+from typing import List, Dict, Tuple as TupleType, Any, Iterable, Callable
 
 from .executor import QueryExecutor
-from .parser import parse_sql
+from .parser import parse_sql, SelectCommand
+
+
+# prompt_toolkit is optional: it buffers type-ahead and bracketed paste.
+# Without it, importing readline gives input() line editing and history.
+try:
+    from prompt_toolkit import PromptSession
+    from prompt_toolkit.key_binding import KeyBindings
+except ImportError:
+    PromptSession = None
+    try:
+        import readline  # noqa: F401
+    except ImportError:
+        pass
+
+
+# Rows formatted per write when streaming SELECT output
+DISPLAY_CHUNK_ROWS = 64
+
+# Seconds a meta-command catalog snapshot (\dt, \di, \d) may be reused
+META_CACHE_TTL = 2.0
+
+
+def _make_prompt_session():
+    """Multi-line prompt_toolkit session that submits on a complete command"""
+    bindings = KeyBindings()
+
+    @bindings.add('enter')
+    def _(event):
+        buffer = event.current_buffer
+        text = buffer.text.strip()
+        if not text or text.startswith('\\') or text.endswith(';'):
+            buffer.validate_and_handle()
+        else:
+            buffer.insert_text('\n')
+
+    return PromptSession(
+        multiline=True,
+        key_bindings=bindings,
+        prompt_continuation=lambda width, line_number, wrap_count: "       -> ",
+    )
 
 
 class REPL:
@@ -23,11 +65,19 @@ class REPL:
     def __init__(self, executor: QueryExecutor):
         self.executor = executor
         self.running = False
+        self._prompt_session = None
+        self._meta_cache: Dict[Any, TupleType[float, Any]] = {}  # key -> (expires_at, value)
 
     def start(self):
-        """Main command loop"""
+        """Main command loop (runs piped/redirected input as one batch)"""
         self.running = True
 
+        if not sys.stdin.isatty():
+            self._run_batch(sys.stdin.read())
+            print("\nShutting down...")
+            self.executor.shutdown()
+            return
+
         # Display welcome message
         print("=" * 60)
         print("SimpleDB - Educational Database Engine")
@@ -49,12 +99,7 @@ class REPL:
                 if not command.strip():
                     continue
 
-                # Handle meta-commands
-                if command.startswith('\\'):
-                    self._handle_meta_command(command)
-                else:
-                    # Parse and execute SQL
-                    self._execute_sql(command)
+                self._run_command(command)
 
             except KeyboardInterrupt:
                 print("\nUse \\q to quit")
@@ -68,26 +113,100 @@ class REPL:
         print("\nShutting down...")
         self.executor.shutdown()
 
+    def _run_command(self, command: str):
+        """Dispatch one complete command"""
+        # Handle meta-commands
+        if command.startswith('\\'):
+            self._handle_meta_command(command)
+        else:
+            # Parse and execute SQL
+            self._execute_sql(command)
+
+    def _run_batch(self, text: str):
+        """Execute every command in a script read in one go"""
+        for command in self._split_commands(text):
+            if not self.running:
+                break
+            try:
+                self._run_command(command)
+            except Exception as e:
+                print(f"Error: {e}")
+
+    @staticmethod
+    def _split_commands(text: str) -> List[str]:
+        """
+        Split a script into commands
+
+        SQL statements end at a ';' outside string literals; a line starting
+        with a backslash is a meta-command on its own. '--' comments are dropped.
+        """
+        commands = []
+        current = []
+        in_string = False
+        for line in text.splitlines():
+            if not in_string and not ''.join(current).strip() and line.lstrip().startswith('\\'):
+                commands.append(line.strip())
+                current = []
+                continue
+
+            start = 0
+            i = 0
+            while i < len(line):
+                ch = line[i]
+                if in_string:
+                    if ch == '\\' and line.startswith("'", i + 1):
+                        i += 1  # \' is an escaped quote, as in the lexer
+                    elif ch == "'":
+                        in_string = False
+                elif ch == "'":
+                    in_string = True
+                elif ch == '-' and line.startswith('--', i):
+                    break  # Comment runs to end of line
+                elif ch == ';':
+                    current.append(line[start:i + 1])
+                    command = ' '.join(current).strip()
+                    if command != ';':
+                        commands.append(command)
+                    current = []
+                    start = i + 1
+                i += 1
+            current.append(line[start:i])
+
+        # Trailing statement without a semicolon
+        command = ' '.join(current).strip()
+        if command:
+            commands.append(command)
+        return commands
+
     def _read_command(self) -> str:
         """Read command (possibly multi-line)"""
+        if self._session is not None:
+            # Multi-line buffer; Enter submits once the command is complete
+            return self._session.prompt("SimpleDB> ").strip()
+
         lines = []
         prompt = "SimpleDB> "
 
         while True:
-            try:
-                if lines:
-                    prompt = "       -> "  # Continuation prompt
-
-                line = input(prompt)
-                lines.append(line)
-
-                # Check if command is complete (ends with semicolon or is meta-command)
-                combined = ' '.join(lines).strip()
-                if combined.startswith('\\') or combined.endswith(';'):
-                    return combined
-
-            except EOFError:
-                raise
+            if lines:
+                prompt = "       -> "  # Continuation prompt
+
+            line = input(prompt)
+            lines.append(line)
+
+            # Check if command is complete (ends with semicolon or is meta-command)
+            combined = ' '.join(lines).strip()
+            if combined.startswith('\\') or combined.endswith(';'):
+                return combined
+
+    @property
+    def _session(self):
+        """Lazily built prompt_toolkit session (None when not installed)"""
+        if PromptSession is None:
+            return None
+        if self._prompt_session is None:
+            self._prompt_session = _make_prompt_session()
+        return self._prompt_session
 
     def _execute_sql(self, sql: str):
         """Parse and execute SQL command"""
@@ -95,8 +214,13 @@ class REPL:
             # Parse SQL
             command = parse_sql(sql)
 
-            # Execute
-            result = self.executor.execute(command)
+            # Execute (SELECT rows are streamed to the display)
+            if isinstance(command, SelectCommand):
+                result = self.executor.iter_select(command)
+            else:
+                result = self.executor.execute(command)
+                # DDL changes schemas/indexes, DML changes row counts
+                self._meta_cache.clear()
 
             # Display results
             self._display_result(command, result)
@@ -108,24 +232,36 @@ class REPL:
         except Exception as e:
             print(f"Unexpected error: {e}")
 
+    def _cached(self, key: Any, loader: Callable[[], Any]) -> Any:
+        """Return loader() result, reusing it for META_CACHE_TTL seconds"""
+        now = time.monotonic()
+        entry = self._meta_cache.get(key)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+        value = loader()
+        self._meta_cache[key] = (now + META_CACHE_TTL, value)
+        return value
+
     def _display_result(self, command, result):
         """Display execution result"""
-        # Import command types
-        from .parser import SelectCommand
-
         if isinstance(command, SelectCommand):
-            # SELECT returns list of tuples - display as table
-            if not result:
-                print("(0 rows)")
-            else:
-                self._display_table(result, command.columns, command.table_name)
+            # SELECT returns rows - display as table
+            self._display_table(result, command.columns, command.table_name)
         else:
             # Other commands return status message
             print(result)
 
-    def _display_table(self, rows: List[tuple], columns: List[str], table_name: str):
-        """Display results in formatted table"""
-        if not rows:
+    def _display_table(self, rows: Iterable[tuple], columns: List[str], table_name: str):
+        """
+        Display results in formatted table
+
+        Rows are consumed in chunks: widths come from the first chunk, later
+        chunks are written as they arrive and only widen the format when a
+        value does not fit.
+        """
+        rows = iter(rows)
+        chunk = list(islice(rows, DISPLAY_CHUNK_ROWS))
+        if not chunk:
             print("(0 rows)")
             return
 
@@ -136,33 +272,36 @@ class REPL:
                 schema = self.executor.catalog.get_table(table_name)
                 col_names = [col.name for col in schema.columns]
             except:
-                col_names = [f"col{i}" for i in range(len(rows[0]))]
+                col_names = [f"col{i}" for i in range(len(chunk[0]))]
         else:
             col_names = columns
 
-        # Calculate column widths
         widths = [len(str(name)) for name in col_names]
-        for row in rows:
-            for i, value in enumerate(row):
-                widths[i] = max(widths[i], len(str(value) if value is not None else 'NULL'))
-
-        # Print header
-        header = " | ".join(str(name).ljust(widths[i]) for i, name in enumerate(col_names))
-        separator = "-+-".join("-" * w for w in widths)
-
-        print(header)
-        print(separator)
-
-        # Print rows
-        for row in rows:
-            formatted_row = " | ".join(
-                str(value if value is not None else 'NULL').ljust(widths[i])
-                for i, value in enumerate(row)
-            )
-            print(formatted_row)
+        row_count = 0
+        header_written = False
+
+        while chunk:
+            # Stringify every cell once; widen columns that don't fit
+            str_rows = [tuple('NULL' if value is None else str(value) for value in row) for row in chunk]
+            for i, column in enumerate(zip(*str_rows)):
+                widths[i] = max(widths[i], max(map(len, column)))
+
+            # One formatter per chunk, one write per chunk
+            fmt = " | ".join("{:<%d}" % w for w in widths)
+            lines = []
+            if not header_written:
+                lines.append(fmt.format(*(str(name) for name in col_names)))
+                lines.append("-+-".join("-" * w for w in widths))
+                header_written = True
+            lines.extend(fmt.format(*row) for row in str_rows)
+            lines.append('')
+            sys.stdout.write('\n'.join(lines))
+
+            row_count += len(chunk)
+            chunk = list(islice(rows, DISPLAY_CHUNK_ROWS))
 
         # Print row count
-        print(f"({len(rows)} row{'s' if len(rows) != 1 else ''})")
+        print(f"({row_count} row{'s' if row_count != 1 else ''})")
 
     def _handle_meta_command(self, command: str):
         """Process backslash commands"""
@@ -198,7 +337,13 @@ class REPL:
 
     def _list_tables(self):
         """List all tables"""
-        tables = self.executor.catalog.list_tables()
+        catalog = self.executor.catalog
+
+        def load():
+            return [(name, catalog.get_statistics(name).row_count)
+                    for name in sorted(catalog.list_tables())]
+
+        tables = self._cached('tables', load)
 
         if not tables:
             print("No tables found")
@@ -206,15 +351,18 @@ class REPL:
 
         print("\nList of tables:")
         print("-" * 40)
-        for table_name in sorted(tables):
-            schema = self.executor.catalog.get_table(table_name)
-            stats = self.executor.catalog.get_statistics(table_name)
-            print(f"  {table_name:20} ({stats.row_count} rows)")
+        for table_name, row_count in tables:
+            print(f"  {table_name:20} ({row_count} rows)")
         print()
 
     def _list_indexes(self):
         """List all indexes"""
-        indexes = self.executor.catalog.list_indexes()
+        catalog = self.executor.catalog
+
+        def load():
+            return [catalog.indexes[index_key] for index_key in sorted(catalog.list_indexes())]
+
+        indexes = self._cached('indexes', load)
 
         if not indexes:
             print("No indexes found")
@@ -225,8 +373,7 @@ class REPL:
         print(f"{'Index Name':30} {'Table':15} {'Columns':15}")
         print("-" * 60)
 
-        for index_key in sorted(indexes):
-            index_meta = self.executor.catalog.indexes[index_key]
+        for index_meta in indexes:
             unique_flag = "UNIQUE" if index_meta.unique else ""
             cols = ", ".join(index_meta.columns)
             print(f"  {index_meta.index_name:28} {index_meta.table_name:15} {cols:15} {unique_flag}")
@@ -234,9 +381,13 @@ class REPL:
 
     def _describe_table(self, table_name: str):
         """Describe table schema"""
+        catalog = self.executor.catalog
         try:
-            schema = self.executor.catalog.get_table(table_name)
-            stats = self.executor.catalog.get_statistics(table_name)
+            schema, stats, indexes = self._cached(('describe', table_name), lambda: (
+                catalog.get_table(table_name),
+                catalog.get_statistics(table_name),
+                catalog.get_indexes_for_table(table_name),
+            ))
 
             print(f"\nTable: {table_name}")
             print("-" * 60)
@@ -256,7 +407,6 @@ class REPL:
             print(f"Rows: {stats.row_count}, Pages: {stats.page_count}")
 
             # List indexes on this table
-            indexes = self.executor.catalog.get_indexes_for_table(table_name)
             if indexes:
                 print(f"\nIndexes:")
                 for idx in indexes:
@@ -2,58 +2,194 @@
 Storage Layer - Heap files, pages, tuples, buffer pool, and free space map
 
 This module provides:
-- BufferPool: LRU page cache to minimize disk I/O
+- BufferPool: Clock (second-chance) page cache to minimize disk I/O
 - Tuple: Row serialization with null bitmap optimization
 - Page: 8KB blocks with header
 - HeapFile: Table data management with FSM for efficient insertion
 """
 
-from typing import List, Dict, Tuple as TupleType, Optional, Any
+from typing import List, Dict, Tuple as TupleType, Optional, Any, Iterator
 from dataclasses import dataclass
-from collections import OrderedDict
+from collections import defaultdict
+from bisect import bisect_left, insort
+from array import array
 import struct
+import mmap
+import sys
 import os
 
 from .config import (
-    PAGE_SIZE, PAGE_HEADER_SIZE, HEAP_FILE_HEADER_SIZE,
-    BUFFER_POOL_SIZE, MAX_TUPLE_SIZE,
-    INT_SIZE, BIGINT_SIZE, FLOAT_SIZE, BOOL_SIZE, TIMESTAMP_SIZE, MAX_TEXT_SIZE
+    PAGE_SIZE, PAGE_HEADER_SIZE, HEAP_FILE_HEADER_SIZE, HEAP_MAGIC, HEAP_FORMAT_VERSION, FSM_BUCKET_SIZE,
+    FSM_FILE_EXT, FSM_MAGIC,
+    BUFFER_POOL_SIZE, BUFFER_POOL_MAX_USAGE, MAX_TUPLE_SIZE, MAX_TEXT_SIZE
 )
-from .catalog import TableSchema
+from .catalog import TableSchema, FIXED_TYPE_FORMATS
+
+
+# Length prefix for TEXT values inside a tuple
+_TEXT_LEN = struct.Struct('<H')
+
+# Byte translation table subtracting one from every nonzero usage count
+_DECREMENT = bytes([0] + list(range(255)))
+
+# Usage count holding a slot out of eviction while a prefetch fills the pool
+# (the clock sweep decrements it at most twice per prefetch)
+_PINNED = 255
+
+# Null-column set for rows whose bitmap is all zeros (shared, never mutated)
+_NO_NULLS = frozenset()
+
+# array typecode holding each fixed-width struct format ('?' is stored as 0/1)
+_ARRAY_TYPECODES = {'i': 'i', 'q': 'q', 'd': 'd', '?': 'B'}
+
+# Page header: free space, tuple count, dead tuple count (rest of header reserved)
+_PAGE_HEADER = struct.Struct('<HHH')
+
+# Slot directory entry inside a page: tuple offset, tuple length
+_SLOT = struct.Struct('<HH')
+
+# High bit of a slot's length marks the tuple as deleted
+_SLOT_DEAD = 0x8000
+
+_BIG_ENDIAN = sys.byteorder == 'big'
+
+
+# Descriptor flags: binary mode matters where os.open defaults to text (Windows)
+O_RDWR = os.O_RDWR | getattr(os, 'O_BINARY', 0)
+O_RDONLY = os.O_RDONLY | getattr(os, 'O_BINARY', 0)
+
+# Positioned I/O; platforms without pread/pwrite (Windows) seek first
+if hasattr(os, 'pread'):
+    pread = os.pread
+    pwrite = os.pwrite
+else:
+    def pread(fd: int, size: int, offset: int) -> bytes:
+        os.lseek(fd, offset, os.SEEK_SET)
+        return os.read(fd, size)
+
+    def pwrite(fd: int, data: bytes, offset: int) -> int:
+        os.lseek(fd, offset, os.SEEK_SET)
+        return os.write(fd, data)
+
+
+def _le_bytes(values: array) -> bytes:
+    """uint16 array as little-endian bytes"""
+    if _BIG_ENDIAN:
+        values = array('H', values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _le_array(data: bytes) -> array:
+    """Little-endian bytes as a uint16 array"""
+    values = array('H')
+    values.frombytes(data)
+    if _BIG_ENDIAN:
+        values.byteswap()
+    return values
+
+# Heap file header: magic, page count, format version (rest of header reserved)
+_HEAP_HEADER = struct.Struct('=4sQI')
+
+# FSM sidecar header: magic, page count
+_FSM_HEADER = struct.Struct('<4sQ')
 
 
 class BufferPool:
-    """LRU page cache - minimizes disk I/O"""
+    """
+    Clock (second-chance) page cache - minimizes disk I/O
+
+    Each cached page has a usage count. A hit only bumps the count (up to
+    BUFFER_POOL_MAX_USAGE); eviction sweeps a hand over the ring of slots,
+    decrementing counts and evicting the first page found at zero. Pages
+    loaded by sequential scans enter at zero so a large scan recycles its own
+    buffers instead of flushing out the working set (like PostgreSQL's
+    clock sweep with a BufferAccessStrategy).
+
+    Usage counts live in a bytearray indexed by slot, so the sweep finds
+    the next zero with bytearray.find and decrements everything it passed
+    over in one translate() call instead of visiting slots one at a time.
+    """
 
     def __init__(self, size: int = BUFFER_POOL_SIZE):
         self.size = size
-        self.cache: OrderedDict = OrderedDict()  # (file_path, page_num) -> Page
+        self.cache: Dict[TupleType[str, int], list] = {}  # key -> [page, slot]
         self.dirty_pages: set = set()  # Track modified pages
         self.hit_count = 0
         self.miss_count = 0
-
-    def get_page(self, file_path: str, page_num: int, page_loader):
-        """Get page from cache or load from disk"""
+        self.writers: Dict[str, Any] = {}  # file_path -> write(page_num, data)
+        self._ring: List[Optional[TupleType[str, int]]] = [None] * size  # slot -> key
+        self._usage = bytearray(size)  # slot -> usage count
+        self._free_slots: List[int] = list(range(size - 1, -1, -1))
+        self._hand = 0
+
+    def register_writer(self, file_path: str, writer):
+        """Route flushes for file_path through writer(page_num, data) instead of reopening the file"""
+        self.writers[file_path] = writer
+
+    def unregister_writer(self, file_path: str):
+        """Stop routing flushes for file_path (file closed)"""
+        self.writers.pop(file_path, None)
+
+    def get_page(self, file_path: str, page_num: int, page_loader, scan: bool = False):
+        """Get page from cache or load from disk (scan=True: don't mark as recently used)"""
         key = (file_path, page_num)
 
-        if key in self.cache:
-            # Cache hit - move to end (most recently used)
-            self.cache.move_to_end(key)
+        entry = self.cache.get(key)
+        if entry is not None:
+            # Cache hit - just bump the usage count
+            if not scan:
+                slot = entry[1]
+                if self._usage[slot] < BUFFER_POOL_MAX_USAGE:
+                    self._usage[slot] += 1
             self.hit_count += 1
-            return self.cache[key]
+            return entry[0]
 
         # Cache miss - load from disk
         self.miss_count += 1
         page = page_loader(file_path, page_num)
+        self._insert(key, page, 0 if scan else 1)
 
-        # Add to cache (may evict if full)
-        if len(self.cache) >= self.size:
-            self._evict()
+        return page
 
-        self.cache[key] = page
-        self.cache.move_to_end(key)
+    def prefetch(self, file_path: str, page_nums, page_loader) -> int:
+        """
+        Load pages into the cache ahead of use, so later get_page calls hit
+        Returns: number of pages loaded (already-cached pages are skipped)
 
-        return page
+        Prefetched pages enter cold (usage 0), like scan pages. Only as many
+        are loaded as there are free or zero-usage slots, so warm pages are
+        not displaced, and loaded pages are pinned until the loop ends so a
+        prefetch never evicts itself.
+        """
+        cache = self.cache
+        usage = self._usage
+        budget = len(self._free_slots) + sum(
+            1 for slot, key in enumerate(self._ring) if key is not None and not usage[slot]
+        )
+        pinned = []
+        for page_num in page_nums:
+            if len(pinned) >= budget:
+                break
+            key = (file_path, page_num)
+            if key in cache:
+                continue
+            self._insert(key, page_loader(file_path, page_num), _PINNED)
+            pinned.append(cache[key][1])
+
+        # Unpin: the pages are resident but cold
+        for slot in pinned:
+            usage[slot] = 0
+        return len(pinned)
+
+    def _insert(self, key: TupleType[str, int], page, usage: int):
+        """Place page in a free slot (evicting if full)"""
+        if not self._free_slots:
+            self._evict()
+        slot = self._free_slots.pop()
+        self._ring[slot] = key
+        self._usage[slot] = usage
+        self.cache[key] = [page, slot]
 
     def mark_dirty(self, file_path: str, page_num: int):
         """Mark page as modified (needs to be written to disk)"""
@@ -62,36 +198,77 @@ class BufferPool:
             self.dirty_pages.add(key)
 
     def _evict(self):
-        """Evict least recently used page (first item in OrderedDict)"""
+        """Advance the clock hand to the first page with zero usage and evict it"""
         if not self.cache:
             return
 
-        # Get LRU page (first item)
-        key, page = self.cache.popitem(last=False)
+        # Only called with every slot occupied, so each slot holds a page
+        usage = self._usage
+        hand = self._hand
+        while True:
+            slot = usage.find(0, hand)
+            if slot < 0:
+                # Nothing free before the end: every page passed gets another chance
+                usage[hand:] = usage[hand:].translate(_DECREMENT)
+                hand = 0
+                continue
+            usage[hand:slot] = usage[hand:slot].translate(_DECREMENT)
+            break
+        self._hand = (slot + 1) % self.size
+
+        key = self._ring[slot]
+        entry = self.cache.pop(key)
+        self._ring[slot] = None
+        self._free_slots.append(slot)
 
         # If dirty, write to disk before evicting
         if key in self.dirty_pages:
-            self._flush_page(key, page)
+            self._flush_page(key, entry[0])
             self.dirty_pages.discard(key)
 
     def _flush_page(self, key: TupleType[str, int], page):
         """Write dirty page to disk"""
         file_path, page_num = key
-        # Page will have a write_to_disk method
-        page.write_to_disk(file_path)
+        writer = self.writers.get(file_path)
+        if writer is not None:
+            writer(page_num, page.serialize())
+        else:
+            page.write_to_disk(file_path)
 
     def flush_all(self):
-        """Write all dirty pages to disk"""
-        for key in list(self.dirty_pages):
-            if key in self.cache:
-                self._flush_page(key, self.cache[key])
+        """Write all dirty pages to disk, grouped by file in page-number order"""
+        by_file: Dict[str, List[int]] = defaultdict(list)
+        for file_path, page_num in self.dirty_pages:
+            if (file_path, page_num) in self.cache:
+                by_file[file_path].append(page_num)
+
+        cache = self.cache
+        for file_path, page_nums in by_file.items():
+            page_nums.sort()  # Sequential rather than random writes
+            writer = self.writers.get(file_path)
+            if writer is not None:
+                for page_num in page_nums:
+                    writer(page_num, cache[(file_path, page_num)][0].serialize())
+                continue
+
+            # No open heap for this file: one descriptor for the whole group
+            fd = os.open(file_path, O_RDWR)
+            try:
+                for page_num in page_nums:
+                    data = cache[(file_path, page_num)][0].serialize()
+                    pwrite(fd, data, HEAP_FILE_HEADER_SIZE + (page_num * PAGE_SIZE))
+            finally:
+                os.close(fd)
+
         self.dirty_pages.clear()
 
     def invalidate(self, file_path: str, page_num: int):
         """Remove page from cache"""
         key = (file_path, page_num)
-        if key in self.cache:
-            del self.cache[key]
+        entry = self.cache.pop(key, None)
+        if entry is not None:
+            self._ring[entry[1]] = None
+            self._free_slots.append(entry[1])
         self.dirty_pages.discard(key)
 
     def stats(self) -> dict:
@@ -115,40 +292,8 @@ class Tuple:
         self.values = values  # List of column values (None = NULL)
         self.schema = schema
 
-        # Validate tuple size won't exceed limit
-        estimated_size = self._estimate_size()
-        if estimated_size > MAX_TUPLE_SIZE:
-            raise ValueError(
-                f"Tuple size ({estimated_size} bytes) exceeds maximum ({MAX_TUPLE_SIZE} bytes)"
-            )
-
-    def _estimate_size(self) -> int:
-        """Estimate serialized tuple size"""
-        size = 0
-
-        # Null bitmap (only if table has nullable columns)
-        if self.schema.has_nullable_columns():
-            nullable_count = sum(1 for col in self.schema.columns if col.nullable)
-            size += (nullable_count + 7) // 8  # Ceiling division
-
-        # Values
-        for i, col in enumerate(self.schema.columns):
-            if i < len(self.values) and self.values[i] is not None:
-                if col.datatype == 'INT':
-                    size += INT_SIZE
-                elif col.datatype == 'BIGINT':
-                    size += BIGINT_SIZE
-                elif col.datatype == 'FLOAT':
-                    size += FLOAT_SIZE
-                elif col.datatype == 'BOOLEAN':
-                    size += BOOL_SIZE
-                elif col.datatype == 'TIMESTAMP':
-                    size += TIMESTAMP_SIZE
-                elif col.datatype == 'TEXT':
-                    text_val = str(self.values[i])
-                    size += 2 + len(text_val.encode('utf-8'))  # length + data
-
-        return size
+        # Serialize once: enforces MAX_TUPLE_SIZE and is reused by insert
+        self._serialized = Tuple._pack(values, schema)
 
     def serialize(self) -> bytes:
         """
@@ -156,169 +301,228 @@ class Tuple:
 
         Format:
         [null_bitmap (if table has nullable columns): variable bytes]
-        [value1: variable bytes]
-        [value2: variable bytes]
-        ...
+        [fixed-width columns: one packed little-endian block, NULL = zeros]
+        [TEXT columns: 2-byte length + utf-8 data, NULLs omitted]
         """
-        data = b''
-
-        # Build null bitmap only if table has nullable columns
-        if self.schema.has_nullable_columns():
-            nullable_cols = [col for col in self.schema.columns if col.nullable]
-            bitmap_bytes = []
-            current_byte = 0
-            bit_position = 0
-
-            for col in self.schema.columns:
-                if col.nullable:
-                    col_index = self.schema.get_column_index(col.name)
-                    is_null = (col_index >= len(self.values) or self.values[col_index] is None)
-
-                    if is_null:
-                        current_byte |= (1 << bit_position)
-
-                    bit_position += 1
-                    if bit_position == 8:
-                        bitmap_bytes.append(current_byte)
-                        current_byte = 0
-                        bit_position = 0
-
-            # Add remaining bits if any
-            if bit_position > 0:
-                bitmap_bytes.append(current_byte)
-
-            data += bytes(bitmap_bytes)
-
-        # Serialize non-NULL values
-        for i, col in enumerate(self.schema.columns):
-            if i >= len(self.values) or self.values[i] is None:
-                continue  # Skip NULL values (marked in bitmap)
+        return self._serialized
 
-            value = self.values[i]
-
-            if col.datatype == 'INT':
-                data += struct.pack('i', int(value))
-            elif col.datatype == 'BIGINT':
-                data += struct.pack('q', int(value))
-            elif col.datatype == 'FLOAT':
-                data += struct.pack('d', float(value))
-            elif col.datatype == 'BOOLEAN':
-                data += struct.pack('?', bool(value))
-            elif col.datatype == 'TIMESTAMP':
-                data += struct.pack('q', int(value))
-            elif col.datatype == 'TEXT':
-                text_bytes = str(value).encode('utf-8')
-                if len(text_bytes) > MAX_TEXT_SIZE:
-                    text_bytes = text_bytes[:MAX_TEXT_SIZE]
-                data += struct.pack('H', len(text_bytes))  # 2-byte length
-                data += text_bytes
-
-        return data
+    @staticmethod
+    def serialize_many(values_list: List[List[Any]], schema: TableSchema) -> List[bytes]:
+        """Serialize many rows of one table, reusing the schema's compiled layout"""
+        pack = Tuple._pack
+        return [pack(values, schema) for values in values_list]
+
+    @staticmethod
+    def _pack(values: List[Any], schema: TableSchema) -> bytes:
+        """Serialize one row of values (see serialize for the format), enforcing MAX_TUPLE_SIZE"""
+        value_count = len(values)
+
+        # Null bitmap is zero bytes if table has no nullable columns
+        bitmap_size = schema.bitmap_size
+        fixed_struct = schema.fixed_struct
+        buf = bytearray(bitmap_size + fixed_struct.size)
+
+        # One bit per NULL nullable column, built as an int and written little-endian
+        if bitmap_size:
+            mask = 0
+            for bit, col_index in enumerate(schema.nullable_indices):
+                if col_index >= value_count or values[col_index] is None:
+                    mask |= 1 << bit
+            buf[:bitmap_size] = mask.to_bytes(bitmap_size, 'little')
+
+        # Pack all fixed-width columns in a single call
+        fixed_values = []
+        for col_index, convert in zip(schema.fixed_indices, schema.fixed_converters):
+            value = values[col_index] if col_index < value_count else None
+            fixed_values.append(0 if value is None else convert(value))
+        fixed_struct.pack_into(buf, bitmap_size, *fixed_values)
+
+        # Append variable-length TEXT columns
+        for col_index in schema.text_indices:
+            if col_index >= value_count or values[col_index] is None:
+                continue  # Skip NULL values (marked in bitmap)
+            text_bytes = str(values[col_index]).encode('utf-8')
+            if len(text_bytes) > MAX_TEXT_SIZE:
+                text_bytes = text_bytes[:MAX_TEXT_SIZE]
+            buf += _TEXT_LEN.pack(len(text_bytes))  # 2-byte length
+            buf += text_bytes
+            if len(buf) > MAX_TUPLE_SIZE:
+                raise ValueError(
+                    f"Tuple size ({len(buf)}+ bytes) exceeds maximum ({MAX_TUPLE_SIZE} bytes)"
+                )
+
+        return bytes(buf)
 
     @staticmethod
     def deserialize(data: bytes, schema: TableSchema) -> 'Tuple':
         """Deserialize bytes back to Tuple"""
-        offset = 0
-        values = []
-
-        # Read null bitmap if table has nullable columns
-        null_bitmap = []
-        if schema.has_nullable_columns():
-            nullable_count = sum(1 for col in schema.columns if col.nullable)
-            bitmap_size = (nullable_count + 7) // 8
-
-            for i in range(bitmap_size):
-                null_bitmap.append(data[offset])
-                offset += 1
-
-        # Deserialize values
-        nullable_index = 0
-        for col in schema.columns:
-            # Check if this column is NULL
-            is_null = False
-            if col.nullable and null_bitmap:
-                byte_index = nullable_index // 8
-                bit_index = nullable_index % 8
-                is_null = (null_bitmap[byte_index] & (1 << bit_index)) != 0
-                nullable_index += 1
-
-            if is_null:
-                values.append(None)
+        values = [None] * len(schema.columns)
+
+        # Read null bitmap (empty if table has no nullable columns)
+        offset = schema.bitmap_size
+        null_columns = _NO_NULLS
+        if offset:
+            mask = int.from_bytes(data[:offset], 'little')
+            if mask:
+                null_columns = {
+                    col_index for bit, col_index in enumerate(schema.nullable_indices)
+                    if (mask >> bit) & 1
+                }
+
+        # Unpack all fixed-width columns in a single call
+        fixed_values = schema.fixed_struct.unpack_from(data, offset)
+        if null_columns:
+            for col_index, value in zip(schema.fixed_indices, fixed_values):
+                if col_index not in null_columns:
+                    values[col_index] = value
+        else:
+            for col_index, value in zip(schema.fixed_indices, fixed_values):
+                values[col_index] = value
+        offset += schema.fixed_struct.size
+
+        # Read TEXT columns in order, decoding straight from the buffer
+        unpack_len = _TEXT_LEN.unpack_from
+        for col_index in schema.text_indices:
+            if col_index in null_columns:
                 continue
-
-            # Deserialize non-NULL value
-            if col.datatype == 'INT':
-                value = struct.unpack('i', data[offset:offset+INT_SIZE])[0]
-                offset += INT_SIZE
-            elif col.datatype == 'BIGINT':
-                value = struct.unpack('q', data[offset:offset+BIGINT_SIZE])[0]
-                offset += BIGINT_SIZE
-            elif col.datatype == 'FLOAT':
-                value = struct.unpack('d', data[offset:offset+FLOAT_SIZE])[0]
-                offset += FLOAT_SIZE
-            elif col.datatype == 'BOOLEAN':
-                value = struct.unpack('?', data[offset:offset+BOOL_SIZE])[0]
-                offset += BOOL_SIZE
-            elif col.datatype == 'TIMESTAMP':
-                value = struct.unpack('q', data[offset:offset+TIMESTAMP_SIZE])[0]
-                offset += TIMESTAMP_SIZE
-            elif col.datatype == 'TEXT':
-                text_len = struct.unpack('H', data[offset:offset+2])[0]
-                offset += 2
-                text_bytes = data[offset:offset+text_len]
-                value = text_bytes.decode('utf-8')
-                offset += text_len
-
-            values.append(value)
-
-        return Tuple(values, schema)
+            text_len = unpack_len(data, offset)[0]
+            offset += 2
+            values[col_index] = str(data[offset:offset+text_len], 'utf-8')
+            offset += text_len
+
+        # Bypass __init__: the bytes we were given are already the serialized form
+        tuple_obj = Tuple.__new__(Tuple)
+        tuple_obj.values = values
+        tuple_obj.schema = schema
+        tuple_obj._serialized = data if isinstance(data, bytes) else bytes(data)
+        return tuple_obj
+
+
+@dataclass
+class ColumnBatch:
+    """
+    Live rows of one page, column by column (structure of arrays)
+
+    columns[k] holds the k-th requested column for every row: an array.array
+    for fixed-width columns (NULL rows read as 0) or a list of str for TEXT
+    (NULL rows are None). nulls[k] has one byte per row, 1 where the value is
+    NULL, or is None when the column is not nullable.
+    """
+    page_num: int
+    slot_ids: array
+    columns: List[Any]
+    nulls: List[Optional[bytearray]]
+
+    def ctids(self) -> List[TupleType[int, int]]:
+        """(page, slot) of every row in the batch"""
+        page_num = self.page_num
+        return [(page_num, slot_id) for slot_id in self.slot_ids]
 
 
 class Page:
-    """8KB page with header and tuple storage"""
+    """
+    8KB slotted page
+
+    Tuple bytes grow forward from the header; a directory of (offset, length)
+    slots grows backward from the end of the page. A tuple is addressed by its
+    slot number, which stays stable when vacuum compacts the tuple bytes.
+
+    In memory the tuple bytes live in one contiguous bytearray and the slot
+    directory in two uint16 arrays, mirroring the on-disk layout.
+    """
 
     def __init__(self, page_number: int):
         self.page_number = page_number
-        self.tuples: List[TupleType[int, bytes]] = []  # (offset, tuple_data)
+        self._buf = bytearray()  # Tuple bytes (page offset PAGE_HEADER_SIZE onward)
+        self._offsets = array('H')  # slot -> page offset of tuple
+        self._lengths = array('H')  # slot -> tuple length, _SLOT_DEAD bit = tombstone
+        self._live_mask = 0  # Bit per slot, set while the tuple is live
         self.free_space = PAGE_SIZE - PAGE_HEADER_SIZE
         self.dead_tuple_count = 0
 
+    @property
+    def tuples(self) -> List[TupleType[int, bytes]]:
+        """(slot_id, tuple_data) for every slot, including tombstones"""
+        buf = self._buf
+        return [
+            (slot_id, bytes(buf[offset - PAGE_HEADER_SIZE:offset - PAGE_HEADER_SIZE + (length & ~_SLOT_DEAD)]))
+            for slot_id, (offset, length) in enumerate(zip(self._offsets, self._lengths))
+        ]
+
     def can_fit(self, tuple_size: int) -> bool:
-        """Check if tuple can fit in remaining space"""
-        return self.free_space >= tuple_size
+        """Check if tuple (plus its slot entry) can fit in remaining space"""
+        return self.free_space >= tuple_size + _SLOT.size
 
     def add_tuple(self, tuple_data: bytes) -> int:
-        """Add tuple to page, return offset within page"""
+        """Add tuple to page, return its slot id"""
         if not self.can_fit(len(tuple_data)):
             raise ValueError(f"Tuple ({len(tuple_data)} bytes) doesn't fit in page ({self.free_space} bytes free)")
 
-        # Calculate offset from start of page (after header)
-        offset = PAGE_HEADER_SIZE + (PAGE_SIZE - PAGE_HEADER_SIZE - self.free_space)
-
-        self.tuples.append((offset, tuple_data))
-        self.free_space -= len(tuple_data)
-
-        return offset
-
-    def get_tuple(self, offset: int) -> Optional[bytes]:
-        """Get tuple at specific offset"""
-        for tup_offset, tup_data in self.tuples:
-            if tup_offset == offset:
-                # Check if deleted (first byte is 0xFF for tombstone)
-                if len(tup_data) > 0 and tup_data[0] == 0xFF:
-                    return None  # Tuple is deleted
-                return tup_data
-        return None
+        slot_id = len(self._offsets)
+        self._offsets.append(PAGE_HEADER_SIZE + len(self._buf))
+        self._lengths.append(len(tuple_data))
+        self._live_mask |= 1 << slot_id
+        self._buf += tuple_data
+        self.free_space -= _SLOT.size + len(tuple_data)
+
+        return slot_id
+
+    def get_tuple(self, slot_id: int) -> Optional[bytes]:
+        """Get tuple in slot (None if deleted or no such slot)"""
+        if slot_id >= len(self._lengths):
+            return None
+        length = self._lengths[slot_id]
+        if length & _SLOT_DEAD:
+            return None
+        start = self._offsets[slot_id] - PAGE_HEADER_SIZE
+        return bytes(self._buf[start:start + length])
+
+    def iter_live(self) -> Iterator[TupleType[int, memoryview]]:
+        """
+        Yield (slot_id, tuple bytes) for live tuples in slot order
 
-    def mark_deleted(self, offset: int):
+        Walks the set bits of the live mask, so tombstones cost nothing.
+        Views are slices of a snapshot of the page, so the page may be
+        modified while iterating.
+        """
+        mask = self._live_mask
+        if not mask:
+            return
+        view = memoryview(bytes(self._buf))
+        offsets = self._offsets
+        lengths = self._lengths
+        while mask:
+            low = mask & -mask
+            slot_id = low.bit_length() - 1
+            mask ^= low
+            start = offsets[slot_id] - PAGE_HEADER_SIZE
+            yield slot_id, view[start:start + lengths[slot_id]]
+
+    def mark_deleted(self, slot_id: int):
         """Mark tuple as deleted (tombstone)"""
-        for i, (tup_offset, tup_data) in enumerate(self.tuples):
-            if tup_offset == offset:
-                # Mark as deleted by setting first byte to 0xFF
-                self.tuples[i] = (tup_offset, b'\xFF' + tup_data[1:])
-                self.dead_tuple_count += 1
-                return
-        raise ValueError(f"No tuple found at offset {offset}")
+        if slot_id >= len(self._lengths) or self._lengths[slot_id] & _SLOT_DEAD:
+            raise ValueError(f"No tuple found in slot {slot_id}")
+        self._lengths[slot_id] |= _SLOT_DEAD
+        self._live_mask &= ~(1 << slot_id)
+        self.dead_tuple_count += 1
+
+    def compact(self):
+        """Drop the bytes of deleted tuples; their slots stay reserved as tombstones"""
+        old = self._buf
+        buf = bytearray()
+        offsets = self._offsets
+        lengths = self._lengths
+        for slot_id in range(len(offsets)):
+            length = lengths[slot_id]
+            start = offsets[slot_id] - PAGE_HEADER_SIZE
+            offsets[slot_id] = PAGE_HEADER_SIZE + len(buf)
+            if length & _SLOT_DEAD:
+                lengths[slot_id] = _SLOT_DEAD  # Tombstone keeps no bytes
+            else:
+                buf += old[start:start + length]
+        self.free_space += len(old) - len(buf)
+        self._buf = buf
+        self.dead_tuple_count = 0
 
     def serialize(self) -> bytes:
         """
@@ -327,88 +531,84 @@ class Page:
         Format:
         [Page Header: 16 bytes]
         - Free space: 2 bytes
-        - Tuple count: 2 bytes
+        - Slot count: 2 bytes
         - Dead tuple count: 2 bytes
         - Reserved: 10 bytes
 
-        [For each tuple: offset(4) + length(4) + data(variable)]
+        [Tuple data, packed forward from the header]
+        [Free space]
+        [Slot directory: offset(2) per slot, then length(2) per slot, ending at the page end]
+        The length's high bit marks a deleted tuple.
         """
-        # Header
-        header = struct.pack('HHH', self.free_space, len(self.tuples), self.dead_tuple_count)
-        header += b'\x00' * 10  # Reserved space
-
-        # Tuple data with lengths
-        data = header
-        for offset, tuple_data in self.tuples:
-            data += struct.pack('I', offset)  # 4 bytes for offset
-            data += struct.pack('I', len(tuple_data))  # 4 bytes for length
-            data += tuple_data
+        slot_count = len(self._offsets)
+        buf = bytearray(PAGE_SIZE)
+        _PAGE_HEADER.pack_into(buf, 0, self.free_space, slot_count, self.dead_tuple_count)
+        buf[PAGE_HEADER_SIZE:PAGE_HEADER_SIZE + len(self._buf)] = self._buf
+        if slot_count:
+            directory = PAGE_SIZE - _SLOT.size * slot_count
+            buf[directory:directory + 2 * slot_count] = _le_bytes(self._offsets)
+            buf[directory + 2 * slot_count:] = _le_bytes(self._lengths)
 
-        # Pad to PAGE_SIZE
-        padding = PAGE_SIZE - len(data)
-        data += b'\x00' * padding
-
-        return data
+        return bytes(buf)
 
     @staticmethod
     def deserialize(data: bytes, page_number: int) -> 'Page':
-        """Deserialize page from bytes"""
+        """Deserialize page from bytes or a memoryview (nothing in data is retained)"""
         page = Page(page_number)
 
         # Read header
-        free_space, tuple_count, dead_tuple_count = struct.unpack('HHH', data[0:6])
+        free_space, slot_count, dead_tuple_count = _PAGE_HEADER.unpack_from(data)
         page.free_space = free_space
         page.dead_tuple_count = dead_tuple_count
 
-        # Read tuples
-        pos = PAGE_HEADER_SIZE
-        for _ in range(tuple_count):
-            # Read offset
-            tuple_offset = struct.unpack('I', data[pos:pos+4])[0]
-            pos += 4
-
-            # Read length
-            tuple_length = struct.unpack('I', data[pos:pos+4])[0]
-            pos += 4
-
-            # Read tuple data
-            tuple_data = data[pos:pos+tuple_length]
-            pos += tuple_length
-
-            # Add to page
-            page.tuples.append((tuple_offset, tuple_data))
+        # Tuple bytes and slot directory are each one contiguous copy
+        if slot_count:
+            directory = PAGE_SIZE - _SLOT.size * slot_count
+            page._buf = bytearray(data[PAGE_HEADER_SIZE:directory - free_space])
+            page._offsets = _le_array(data[directory:directory + 2 * slot_count])
+            page._lengths = _le_array(data[directory + 2 * slot_count:PAGE_SIZE])
+            page._live_mask = sum(
+                1 << slot_id for slot_id, length in enumerate(page._lengths) if not length & _SLOT_DEAD
+            )
 
         return page
 
     def write_to_disk(self, file_path: str):
         """Write page to disk at correct offset"""
-        with open(file_path, 'r+b') as f:
-            offset = HEAP_FILE_HEADER_SIZE + (self.page_number * PAGE_SIZE)
-            f.seek(offset)
-            f.write(self.serialize())
+        offset = HEAP_FILE_HEADER_SIZE + (self.page_number * PAGE_SIZE)
+        fd = os.open(file_path, O_RDWR)
+        try:
+            pwrite(fd, self.serialize(), offset)
+        finally:
+            os.close(fd)
 
 
 class HeapFile:
     """Manages table data file with Free Space Map"""
 
     def __init__(self, file_path: str, schema: TableSchema, buffer_pool: BufferPool):
-        self.file_path = file_path
+        self.file_path = os.fspath(file_path)  # str or pathlib.Path; used as buffer pool key
+        self.fsm_path = self.file_path + FSM_FILE_EXT
         self.schema = schema
         self.buffer_pool = buffer_pool
         self.page_count = 0
         self.free_space_map: Dict[int, int] = {}  # page_num -> free_space_bytes
+        self._fsm_by_space: List[TupleType[int, int]] = []  # sorted (bucket, page_num)
+        self._fd: Optional[int] = None  # Kept open for the life of the heap
+        self._mm: Optional[mmap.mmap] = None  # Whole-file mapping over _fd
 
     def create(self):
         """Initialize new heap file"""
         with open(self.file_path, 'wb') as f:
             # Write file header
-            header = b'HEAP'  # Magic
-            header += struct.pack('Q', 0)  # Page count
+            header = _HEAP_HEADER.pack(HEAP_MAGIC, 0, HEAP_FORMAT_VERSION)
             header += b'\x00' * (HEAP_FILE_HEADER_SIZE - len(header))
             f.write(header)
 
         self.page_count = 0
         self.free_space_map = {}
+        self._fsm_by_space = []
+        self._open_fd()
 
     def open(self):
         """Open existing heap file"""
@@ -417,32 +617,114 @@ class HeapFile:
 
         with open(self.file_path, 'rb') as f:
             # Read header
-            magic = f.read(4)
-            if magic != b'HEAP':
-                raise ValueError(f"Invalid heap file: {self.file_path}")
-
-            self.page_count = struct.unpack('Q', f.read(8))[0]
+            header = f.read(_HEAP_HEADER.size)
+        if len(header) < _HEAP_HEADER.size or header[:4] != HEAP_MAGIC:
+            raise ValueError(f"Invalid heap file: {self.file_path}")
 
-        # Rebuild FSM by scanning pages (in real DB, FSM would be persisted)
-        self._rebuild_fsm()
+        _, page_count, version = _HEAP_HEADER.unpack(header)
+        if version != HEAP_FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported heap format version {version} in {self.file_path} "
+                f"(expected {HEAP_FORMAT_VERSION}); recreate the table and reload its data"
+            )
+        self.page_count = page_count
+
+        self._open_fd()
+
+        # Load persisted FSM; fall back to scanning every page
+        if not self._load_fsm():
+            self._rebuild_fsm()
+
+    def close(self):
+        """Release the mapping and descriptor (dirty pages must be flushed first)"""
+        if self._fd is not None:
+            self.buffer_pool.unregister_writer(self.file_path)
+            self._mm.close()
+            self._mm = None
+            os.close(self._fd)
+            self._fd = None
+
+    def _open_fd(self):
+        """Open and map the file, and route buffer pool flushes through the mapping"""
+        self.close()
+        self._fd = os.open(self.file_path, O_RDWR)
+        self._mm = mmap.mmap(self._fd, 0)
+        self.buffer_pool.register_writer(self.file_path, self.write_page)
+
+    def write_page(self, page_num: int, data: bytes):
+        """Write serialized page at its position in the mapped file"""
+        offset = HEAP_FILE_HEADER_SIZE + (page_num * PAGE_SIZE)
+        self._mm[offset:offset + PAGE_SIZE] = data
 
     def _rebuild_fsm(self):
         """Rebuild free space map by scanning all pages"""
         self.free_space_map = {}
+        self._fsm_by_space = []
         for page_num in range(self.page_count):
             page = self._read_page_direct(self.file_path, page_num)
-            self.free_space_map[page_num] = page.free_space
+            self._set_free_space(page_num, page.free_space)
+
+    def save_fsm(self):
+        """
+        Persist free space map to the sidecar file (call after flushing pages)
+
+        Format: [magic(4) + page_count(8)] + one uint16 free-space entry per page
+        """
+        fsm = self.free_space_map
+        entries = struct.pack(f'<{self.page_count}H', *(fsm.get(i, 0) for i in range(self.page_count)))
+        with open(self.fsm_path, 'wb') as f:
+            f.write(_FSM_HEADER.pack(FSM_MAGIC, self.page_count) + entries)
+
+    def _load_fsm(self) -> bool:
+        """
+        Load free space map from the sidecar, returns False if missing or stale
+
+        The sidecar is removed once read: it is only trusted after a clean
+        shutdown, so a crash before the next save_fsm() forces a rescan.
+        """
+        try:
+            with open(self.fsm_path, 'rb') as f:
+                data = f.read()
+            os.remove(self.fsm_path)
+        except FileNotFoundError:
+            return False
+
+        if len(data) != _FSM_HEADER.size + 2 * self.page_count:
+            return False
+        magic, page_count = _FSM_HEADER.unpack_from(data)
+        if magic != FSM_MAGIC or page_count != self.page_count:
+            return False
+
+        self.free_space_map = {}
+        self._fsm_by_space = []
+        for page_num, (free_space,) in enumerate(struct.iter_unpack('<H', data[_FSM_HEADER.size:])):
+            self._set_free_space(page_num, free_space)
+        return True
+
+    def _set_free_space(self, page_num: int, free_space: int):
+        """Record free space for a page, keeping the sorted bucket index in step"""
+        old = self.free_space_map.get(page_num)
+        self.free_space_map[page_num] = free_space
+
+        bucket = free_space // FSM_BUCKET_SIZE
+        if old is not None:
+            old_bucket = old // FSM_BUCKET_SIZE
+            if old_bucket == bucket:
+                return  # Same bucket - no index churn
+            index = self._fsm_by_space
+            del index[bisect_left(index, (old_bucket, page_num))]
+        insort(self._fsm_by_space, (bucket, page_num))
 
     def insert_tuple(self, tuple: Tuple) -> TupleType[int, int]:
         """
         Insert tuple into heap file using FSM
-        Returns: ctid (page_number, offset)
+        Returns: ctid (page_number, slot_id)
         """
         tuple_data = tuple.serialize()
         tuple_size = len(tuple_data)
 
-        # Find page with enough space using FSM (O(1) lookup)
-        page_num = self._find_page_with_space(tuple_size)
+        # Find page with enough space using FSM (O(log n) lookup)
+        page_num = self._find_page_with_space(tuple_size + _SLOT.size)
 
         if page_num is None:
             # No page with space - create new page
@@ -450,18 +732,71 @@ class HeapFile:
 
         # Load page (through buffer pool)
         page = self._read_page(page_num)
+        if not page.can_fit(tuple_size):
+            # FSM entry was stale - correct it and fall back to a fresh page
+            self._set_free_space(page_num, page.free_space)
+            page_num = self._create_new_page()
+            page = self._read_page(page_num)
 
         # Add tuple to page
         offset = page.add_tuple(tuple_data)
 
         # Update FSM
-        self.free_space_map[page_num] = page.free_space
+        self._set_free_space(page_num, page.free_space)
 
         # Mark page as dirty
         self.buffer_pool.mark_dirty(self.file_path, page_num)
 
         return (page_num, offset)
 
+    def insert_tuples(self, tuples: List[Tuple]) -> List[TupleType[int, int]]:
+        """
+        Insert many tuples, filling each page before moving to the next
+        Returns: ctids in input order
+
+        FSM update and mark_dirty happen once per page touched, not per tuple.
+        """
+        return self._insert_serialized(map(Tuple.serialize, tuples))
+
+    def insert_rows(self, rows: List[List[Any]]) -> List[TupleType[int, int]]:
+        """
+        Insert many rows given as plain value lists
+        Returns: ctids in input order
+
+        Rows are packed straight to bytes with this heap's schema, so no
+        Tuple object is built per row.
+        """
+        return self._insert_serialized(Tuple.serialize_many(rows, self.schema))
+
+    def _insert_serialized(self, tuple_datas) -> List[TupleType[int, int]]:
+        """Place already-serialized tuples, filling each page before moving to the next"""
+        ctids = []
+        page = None
+        page_num = None
+        for tuple_data in tuple_datas:
+            tuple_size = len(tuple_data)
+            if page is None or not page.can_fit(tuple_size):
+                if page is not None:
+                    self._set_free_space(page_num, page.free_space)
+                    self.buffer_pool.mark_dirty(self.file_path, page_num)
+                page_num = self._find_page_with_space(tuple_size + _SLOT.size)
+                if page_num is None:
+                    page_num = self._create_new_page()
+                page = self._read_page(page_num)
+                if not page.can_fit(tuple_size):
+                    # FSM entry was stale - correct it and fall back to a fresh page
+                    self._set_free_space(page_num, page.free_space)
+                    page_num = self._create_new_page()
+                    page = self._read_page(page_num)
+
+            ctids.append((page_num, page.add_tuple(tuple_data)))
+
+        if page is not None:
+            self._set_free_space(page_num, page.free_space)
+            self.buffer_pool.mark_dirty(self.file_path, page_num)
+
+        return ctids
+
     def read_tuple(self, ctid: TupleType[int, int]) -> Optional[Tuple]:
         """Read tuple by ctid (page_number, offset)"""
         page_num, offset = ctid
@@ -490,61 +825,174 @@ class HeapFile:
         # Mark page as dirty
         self.buffer_pool.mark_dirty(self.file_path, page_num)
 
+    def delete_by_pk(self, pk_index, key: Any) -> Optional[TupleType[int, int]]:
+        """
+        Delete the row with primary key `key`, removing its index entry too
+        Returns: the deleted row's ctid, or None if the key was not in pk_index
+        """
+        ctid = pk_index.delete_returning_ctid(key)
+        if ctid is not None:
+            self.delete_tuple(ctid)
+        return ctid
+
     def _find_page_with_space(self, required_space: int) -> Optional[int]:
-        """Find page with enough free space using FSM"""
-        for page_num, free_space in self.free_space_map.items():
-            if free_space >= required_space:
-                return page_num
-        return None
+        """
+        Find page with enough free space using FSM
+
+        Pages are indexed by free_space // FSM_BUCKET_SIZE, so rounding the
+        request up to a whole bucket guarantees any page found can fit it.
+        Best fit: the fullest qualifying page, lowest page number first.
+        """
+        index = self._fsm_by_space
+        needed_bucket = -(-required_space // FSM_BUCKET_SIZE)
+        i = bisect_left(index, (needed_bucket, -1))
+        if i == len(index):
+            return None
+        return index[i][1]
 
     def _create_new_page(self) -> int:
         """Create and append new page to file"""
         page_num = self.page_count
         page = Page(page_num)
 
-        # Write empty page to file
-        with open(self.file_path, 'r+b') as f:
-            offset = HEAP_FILE_HEADER_SIZE + (page_num * PAGE_SIZE)
-            f.seek(offset)
-            f.write(page.serialize())
+        # Grow file by one page and remap it, then write empty page
+        # (mmap.resize needs mremap, which not every platform has)
+        self._mm.close()
+        os.ftruncate(self._fd, HEAP_FILE_HEADER_SIZE + (page_num + 1) * PAGE_SIZE)
+        self._mm = mmap.mmap(self._fd, 0)
+        self.write_page(page_num, page.serialize())
 
-        # Update page count in header
+        # Update page count in header (after magic)
         self.page_count += 1
-        with open(self.file_path, 'r+b') as f:
-            f.seek(4)  # After magic
-            f.write(struct.pack('Q', self.page_count))
+        self._mm[4:12] = struct.pack('Q', self.page_count)
 
         # Update FSM
-        self.free_space_map[page_num] = page.free_space
+        self._set_free_space(page_num, page.free_space)
 
         return page_num
 
-    def _read_page(self, page_num: int) -> Page:
+    def prefetch(self, page_nums) -> int:
+        """
+        Warm the buffer pool with the given pages before they are read
+        Returns: number of pages loaded into the pool
+
+        The mapped range is first advised WILLNEED so the kernel can start
+        reading it in one go rather than faulting page by page.
+        """
+        page_nums = sorted(n for n in page_nums if 0 <= n < self.page_count)
+        if not page_nums:
+            return 0
+
+        if self._mm is not None and hasattr(mmap, 'MADV_WILLNEED'):
+            start = HEAP_FILE_HEADER_SIZE + page_nums[0] * PAGE_SIZE
+            end = HEAP_FILE_HEADER_SIZE + (page_nums[-1] + 1) * PAGE_SIZE
+            start -= start % mmap.PAGESIZE  # madvise needs an aligned start
+            self._mm.madvise(mmap.MADV_WILLNEED, start, end - start)
+
+        return self.buffer_pool.prefetch(self.file_path, page_nums, self._read_page_direct)
+
+    def _read_page(self, page_num: int, scan: bool = False) -> Page:
         """Read page through buffer pool"""
-        return self.buffer_pool.get_page(self.file_path, page_num, self._read_page_direct)
+        return self.buffer_pool.get_page(self.file_path, page_num, self._read_page_direct, scan)
 
     def _read_page_direct(self, file_path: str, page_num: int) -> Page:
-        """Read page directly from disk (used by buffer pool)"""
-        with open(file_path, 'rb') as f:
-            offset = HEAP_FILE_HEADER_SIZE + (page_num * PAGE_SIZE)
-            f.seek(offset)
-            data = f.read(PAGE_SIZE)
-
-        return Page.deserialize(data, page_num)
+        """Read page from the mapped file (used by buffer pool)"""
+        offset = HEAP_FILE_HEADER_SIZE + (page_num * PAGE_SIZE)
+        if self._mm is None or file_path != self.file_path:
+            fd = os.open(file_path, O_RDONLY)
+            try:
+                return Page.deserialize(pread(fd, PAGE_SIZE, offset), page_num)
+            finally:
+                os.close(fd)
+
+        # Deserialize straight from the mapping; Page copies what it keeps,
+        # so no view outlives the call (the map must stay resizable)
+        with memoryview(self._mm) as view:
+            return Page.deserialize(view[offset:offset + PAGE_SIZE], page_num)
 
     def scan_all(self):
         """Sequential scan - iterate all non-deleted tuples"""
+        return self.scan_all_filtered(None)
+
+    def scan_all_filtered(self, predicate_bytes):
+        """
+        Sequential scan that tests raw tuple bytes before deserializing
+
+        predicate_bytes(tuple_data) -> bool may reject rows early (it must
+        never reject a row the full WHERE would accept); None keeps all rows.
+        """
+        deserialize = Tuple.deserialize
+        schema = self.schema
+        read_page = self._read_page
         for page_num in range(self.page_count):
-            page = self._read_page(page_num)
+            page = read_page(page_num, scan=True)
 
-            for offset, tuple_data in page.tuples:
-                # Skip deleted tuples
-                if len(tuple_data) > 0 and tuple_data[0] == 0xFF:
+            for slot_id, tuple_data in page.iter_live():
+                if predicate_bytes is not None and not predicate_bytes(tuple_data):
                     continue
 
-                tuple_obj = Tuple.deserialize(tuple_data, self.schema)
-                ctid = (page_num, offset)
-                yield (tuple_obj, ctid)
+                yield (deserialize(tuple_data, schema), (page_num, slot_id))
+
+    def scan_columns(self, col_indexes: List[int]) -> Iterator[ColumnBatch]:
+        """
+        Sequential scan yielding one ColumnBatch per page for the given columns
+
+        Fixed-width values come from one unpack_from of the row's fixed block
+        and are appended to typed arrays; only the requested TEXT columns are
+        decoded. No Tuple objects are built.
+        """
+        schema = self.schema
+        bitmap_size = schema.bitmap_size
+        unpack_fixed = schema.fixed_struct.unpack_from
+        fixed_end = bitmap_size + schema.fixed_struct.size
+        fixed_pos = {col: k for k, col in enumerate(schema.fixed_indices)}
+        text_pos = {col: k for k, col in enumerate(schema.text_indices)}
+        null_bits = schema.null_bits
+        unpack_len = _TEXT_LEN.unpack_from
+
+        # Per requested column: (fixed position or None, text position or None, null bit or None)
+        plan = [(fixed_pos.get(col), text_pos.get(col), null_bits.get(col)) for col in col_indexes]
+        typecodes = [
+            _ARRAY_TYPECODES[FIXED_TYPE_FORMATS[schema.columns[col].datatype]]
+            if fixed is not None else None
+            for col, (fixed, _, _) in zip(col_indexes, plan)
+        ]
+        # How many TEXT columns must be walked to reach the last requested one
+        texts_needed = max((text for _, text, _ in plan if text is not None), default=-1) + 1
+
+        for page_num in range(self.page_count):
+            page = self._read_page(page_num, scan=True)
+            slot_ids = array('H')
+            columns = [array(code) if code else [] for code in typecodes]
+            nulls = [bytearray() if bit is not None else None for _, _, bit in plan]
+
+            for slot_id, data in page.iter_live():
+                slot_ids.append(slot_id)
+                mask = int.from_bytes(data[:bitmap_size], 'little') if bitmap_size else 0
+                fixed_values = unpack_fixed(data, bitmap_size)
+
+                texts = []
+                offset = fixed_end
+                for text_col in schema.text_indices[:texts_needed]:
+                    bit = null_bits.get(text_col)
+                    if bit is not None and mask >> bit & 1:
+                        texts.append(None)
+                        continue
+                    length = unpack_len(data, offset)[0]
+                    offset += 2
+                    texts.append(data[offset:offset + length])
+                    offset += length
+
+                for column, null_flags, (fixed, text, bit) in zip(columns, nulls, plan):
+                    if null_flags is not None:
+                        null_flags.append(mask >> bit & 1)
+                    if fixed is not None:
+                        column.append(fixed_values[fixed])
+                    else:
+                        raw = texts[text]
+                        column.append(None if raw is None else str(raw, 'utf-8'))
+
+            yield ColumnBatch(page_num, slot_ids, columns, nulls)
 
     def vacuum(self):
         """Reclaim space from deleted tuples"""
@@ -554,24 +1002,12 @@ class HeapFile:
             if page.dead_tuple_count == 0:
                 continue  # No dead tuples, skip
 
-            # Rebuild page without dead tuples
-            new_page = Page(page_num)
-
-            for offset, tuple_data in page.tuples:
-                # Skip deleted tuples
-                if len(tuple_data) > 0 and tuple_data[0] == 0xFF:
-                    continue
-
-                # Add live tuple to new page
-                new_page.add_tuple(tuple_data)
-
-            # Replace old page with compacted page
-            # Update cache and mark dirty
-            self.buffer_pool.cache[(self.file_path, page_num)] = new_page
+            # Compact in place: live tuples keep their slot ids (and ctids)
+            page.compact()
             self.buffer_pool.mark_dirty(self.file_path, page_num)
 
             # Update FSM
-            self.free_space_map[page_num] = new_page.free_space
+            self._set_free_space(page_num, page.free_space)
 
         # Flush dirty pages to disk
         self.buffer_pool.flush_all()
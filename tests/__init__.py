@@ -1 +1,12 @@
 """Tests for DB Engine"""
+
+import os
+import tempfile
+
+# Scratch databases go on tmpfs when available
+TMP_ROOT = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+
+def scratch_dir() -> tempfile.TemporaryDirectory:
+    """Temporary directory for a standalone test run (pytest supplies tmp_path instead)"""
+    return tempfile.TemporaryDirectory(dir=TMP_ROOT)
@@ -4,23 +4,23 @@ Tests B-tree node serialization, insert with splitting, search, range queries, d
 """
 
 import os
-import shutil
+from pathlib import Path
 import sys
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from db_engine.btree import BTreeNode, BTreeIndex
+from tests import scratch_dir
 
-def test_btree():
+# Per-key debug output is opt-in (set DB_TEST_VERBOSE=1)
+VERBOSE = os.environ.get('DB_TEST_VERBOSE')
+
+def test_btree(tmp_path):
     """Test B-tree index"""
     print("Testing btree.py...")
 
-    # Clean up
-    test_dir = './test_data_btree'
-    if os.path.exists(test_dir):
-        shutil.rmtree(test_dir)
-    os.makedirs(test_dir)
+    test_dir = Path(tmp_path)
 
     # Test 1: BTreeNode creation and basic properties
     print("\n1. Testing BTreeNode creation...")
@@ -74,10 +74,10 @@ def test_btree():
 
     # Test 6: BTreeIndex creation
     print("\n6. Testing BTreeIndex creation...")
-    index_file = os.path.join(test_dir, 'test_index.idx')
+    index_file = test_dir / 'test_index.idx'
     index = BTreeIndex(index_file, key_columns=['id'], unique=True)
     index.create()
-    print(f"   Index file created: {os.path.exists(index_file)}")
+    print(f"   Index file created: {index_file.exists()}")
     print(f"   Root is leaf: {index.root.is_leaf}")
     print(f"   Node count: {index.node_count}")
     print("✓ BTreeIndex created")
@@ -136,29 +136,33 @@ def test_btree():
 
     # Test 10: Insert many keys to trigger splits
     print("\n10. Testing insert with splitting...")
-    index3_file = os.path.join(test_dir, 'test_index3.idx')
-    index3 = BTreeIndex(index3_file, key_columns=['id'], unique=False)
-    index3.create()
+    index3_file = test_dir / 'test_index3.idx'
 
-    # Insert enough keys to cause splits (ORDER=4, so 3 keys max per node)
+    # Bulk load enough keys to need several levels (ORDER=4, so 3 keys max per node)
     keys = [50, 10, 90, 30, 70, 20, 40, 60, 80, 100, 5, 15, 25, 35]
-    for key in keys:
+    index3 = BTreeIndex.bulk_load(
+        index3_file, ['id'], ((key, (0, key * 10)) for key in sorted(keys)))
+    print(f"   Bulk loaded {len(keys)} keys")
+    print(f"   Node count: {index3.node_count}")
+
+    # Inserting into the packed leaves must still split correctly
+    for key in [12, 55, 95]:
         index3.insert(key, (0, key * 10))
-    print(f"   Inserted {len(keys)} keys")
+        keys.append(key)
     print(f"   Node count after splits: {index3.node_count}")
 
-    # Verify all keys can be found
-    for key in keys:
-        result = index3.search(key)
-        assert result == (0, key * 10), f"Key {key} not found correctly"
+    # Verify all keys in one leaf-chain walk instead of a descent per key
+    results = index3.range_query(min(keys), max(keys))
+    assert results == [(0, key * 10) for key in sorted(keys)], "Keys not found correctly"
     print("✓ Insert with splitting works")
 
     # Test 11: Range query
     print("\n11. Testing range query...")
     results = index3.range_query(20, 50)
-    result_keys = [r[1] // 10 for r in results]  # Extract keys from ctids
+    result_keys = {r[1] // 10 for r in results}  # Extract keys from ctids
     print(f"   Range query [20, 50]: found {len(results)} keys")
-    print(f"   Keys: {sorted(result_keys)}")
+    if VERBOSE:
+        print(f"   Keys: {sorted(result_keys)}")
     assert 20 in result_keys
     assert 50 in result_keys
     assert 10 not in result_keys  # Outside range
@@ -179,7 +183,7 @@ def test_btree():
 
     # Test 13: Composite keys
     print("\n13. Testing composite keys...")
-    index4_file = os.path.join(test_dir, 'test_composite.idx')
+    index4_file = test_dir / 'test_composite.idx'
     index4 = BTreeIndex(index4_file, key_columns=['category', 'id'], unique=False)
     index4.create()
 
@@ -200,7 +204,7 @@ def test_btree():
 
     # Test 14: TEXT key truncation in index
     print("\n14. Testing TEXT key truncation in index...")
-    index5_file = os.path.join(test_dir, 'test_text.idx')
+    index5_file = test_dir / 'test_text.idx'
     index5 = BTreeIndex(index5_file, key_columns=['name'], unique=False)
     index5.create()
 
@@ -220,8 +224,7 @@ def test_btree():
     print("✅ All B-tree tests passed!")
     print("="*50)
 
-    # Clean up
-    shutil.rmtree(test_dir)
 
 if __name__ == '__main__':
-    test_btree()
+    with scratch_dir() as tmp:
+        test_btree(tmp)
@@ -4,23 +4,20 @@ Tests basic catalog functionality: create/load/save tables, indexes, statistics
 """
 
 import os
-import shutil
+from pathlib import Path
 import sys
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from db_engine.catalog import Catalog, TableSchema, ColumnDef, IndexMetadata, TableStatistics
+from tests import scratch_dir
 
-def test_catalog():
+def test_catalog(tmp_path):
     """Test catalog basic operations"""
     print("Testing catalog.py...")
 
-    # Clean up any existing test data
-    test_dir = './test_data'
-    if os.path.exists(test_dir):
-        shutil.rmtree(test_dir)
-    os.makedirs(test_dir)
+    test_dir = Path(tmp_path)
 
     # Test 1: Create catalog
     print("\n1. Creating catalog...")
@@ -81,9 +78,9 @@ def test_catalog():
     # Test 6: Save catalog
     print("\n6. Saving catalog to disk...")
     catalog.save()
-    catalog_file = os.path.join(test_dir, 'catalog.dat')
-    print(f"   Catalog file exists: {os.path.exists(catalog_file)}")
-    print(f"   Catalog file size: {os.path.getsize(catalog_file)} bytes")
+    catalog_file = test_dir / 'catalog.dat'
+    print(f"   Catalog file exists: {catalog_file.exists()}")
+    print(f"   Catalog file size: {catalog_file.stat().st_size} bytes")
     print("✓ Catalog saved")
 
     # Test 7: Load catalog from disk
@@ -133,8 +130,7 @@ def test_catalog():
     print("✅ All catalog tests passed!")
     print("="*50)
 
-    # Clean up
-    shutil.rmtree(test_dir)
 
 if __name__ == '__main__':
-    test_catalog()
+    with scratch_dir() as tmp:
+        test_catalog(tmp)
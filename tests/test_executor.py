@@ -5,38 +5,83 @@ Tests complete end-to-end SQL execution
 
 import sys
 import os
-import shutil
+from contextlib import contextmanager
+
+import pytest
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from db_engine.executor import QueryExecutor
 from db_engine.parser import parse_sql
+from tests import scratch_dir
+
+# Per-row output inside loops is opt-in (set DB_TEST_VERBOSE=1)
+VERBOSE = os.environ.get('DB_TEST_VERBOSE')
+
+# SQL used by the tests, bound once so repeated statements are the same
+# string object and hit the parse_sql cache directly
+SQL_CREATE_USERS = """
+    CREATE TABLE users (
+        id INT PRIMARY KEY,
+        name TEXT NOT NULL,
+        age INT,
+        email TEXT
+    )
+"""
+SQL_INSERT_ALICE = "INSERT INTO users VALUES (1, 'Alice', 25, 'alice@test.com')"
+SQL_INSERT_MORE = (
+    "INSERT INTO users VALUES (2, 'Bob', 30, 'bob@test.com')",
+    "INSERT INTO users VALUES (3, 'Charlie', 22, NULL)",
+    "INSERT INTO users VALUES (4, 'Diana', 28, 'diana@test.com')",
+    "INSERT INTO users VALUES (5, 'Eve', 35, 'eve@test.com')",
+)
+SQL_SELECT_ALL = "SELECT * FROM users"
+SQL_SELECT_NAME_AGE = "SELECT name, age FROM users"
+SQL_SELECT_AGE_OVER_25 = "SELECT * FROM users WHERE age > 25"
+SQL_SELECT_COMPLEX_WHERE = "SELECT * FROM users WHERE (age > 20 AND age < 30) OR name = 'Eve'"
+SQL_SELECT_LIKE = "SELECT name FROM users WHERE name LIKE 'A%' OR name LIKE '_ve'"
+SQL_SELECT_LIKE_AFFIX = "SELECT name FROM users WHERE name LIKE '%ob' OR name LIKE '%arl%' OR name LIKE 'Diana'"
+SQL_SELECT_AGE_RANGE = "SELECT name FROM users WHERE age >= 25 AND 30 > age"
+SQL_ORDER_BY_AGE = "SELECT name, age FROM users ORDER BY age DESC"
+SQL_LIMIT = "SELECT * FROM users LIMIT 2"
+SQL_LIMIT_OFFSET = "SELECT * FROM users LIMIT 2 OFFSET 1"
+SQL_UPDATE_ALICE = "UPDATE users SET age = 26 WHERE name = 'Alice'"
+SQL_SELECT_ALICE_AGE = "SELECT age FROM users WHERE name = 'Alice'"
+SQL_DELETE_UNDER_25 = "DELETE FROM users WHERE age < 25"
+SQL_CREATE_INDEX_AGE = "CREATE INDEX idx_age ON users (age)"
+SQL_INSERT_DUPLICATE_PK = "INSERT INTO users VALUES (1, 'Duplicate', 99, 'dup@test.com')"
+SQL_SELECT_ID_20 = "SELECT * FROM users WHERE id = 20"
+SQL_INSERT_NULL_NAME = "INSERT INTO users VALUES (10, NULL, 25, 'test@test.com')"
+SQL_EXPLAIN = "EXPLAIN SELECT * FROM users WHERE age > 25"
+SQL_ANALYZE = "ANALYZE users"
+SQL_VACUUM = "VACUUM users"
+SQL_DROP_USERS = "DROP TABLE users"
+
+@contextmanager
+def executor_session(test_dir):
+    """
+    One executor for the whole module, so its catalog, heap files and
+    buffer pool stay warm across every statement instead of being rebuilt
+    """
+    executor = QueryExecutor(str(test_dir), buffer_pool_size=64)
+    try:
+        yield executor
+    finally:
+        executor.shutdown()
+
+@pytest.fixture(scope="module")
+def executor(tmp_path_factory):
+    with executor_session(tmp_path_factory.mktemp('executor')) as executor:
+        yield executor
 
-def test_executor():
+def test_executor(executor):
     """Test query executor end-to-end"""
     print("Testing executor.py...")
 
-    # Clean up
-    test_dir = './test_data_executor'
-    if os.path.exists(test_dir):
-        shutil.rmtree(test_dir)
-    os.makedirs(test_dir)
-
-    # Create executor
-    executor = QueryExecutor(test_dir)
-
     # Test 1: CREATE TABLE
     print("\n1. Testing CREATE TABLE...")
-    sql = """
-        CREATE TABLE users (
-            id INT PRIMARY KEY,
-            name TEXT NOT NULL,
-            age INT,
-            email TEXT
-        )
-    """
-    cmd = parse_sql(sql)
+    cmd = parse_sql(SQL_CREATE_USERS)
     result = executor.execute(cmd)
     print(f"   {result}")
     assert "created" in result.lower()
@@ -44,8 +89,7 @@ def test_executor():
 
     # Test 2: INSERT
     print("\n2. Testing INSERT...")
-    sql = "INSERT INTO users VALUES (1, 'Alice', 25, 'alice@test.com')"
-    cmd = parse_sql(sql)
+    cmd = parse_sql(SQL_INSERT_ALICE)
     result = executor.execute(cmd)
     print(f"   {result}")
     assert "1 row" in result.lower()
@@ -53,13 +97,7 @@ def test_executor():
 
     # Test 3: INSERT multiple rows
     print("\n3. Inserting more rows...")
-    sqls = [
-        "INSERT INTO users VALUES (2, 'Bob', 30, 'bob@test.com')",
-        "INSERT INTO users VALUES (3, 'Charlie', 22, NULL)",
-        "INSERT INTO users VALUES (4, 'Diana', 28, 'diana@test.com')",
-        "INSERT INTO users VALUES (5, 'Eve', 35, 'eve@test.com')",
-    ]
-    for sql in sqls:
+    for sql in SQL_INSERT_MORE:
         cmd = parse_sql(sql)
         executor.execute(cmd)
     print("   Inserted 4 more rows")
@@ -67,8 +105,7 @@ def test_executor():
 
     # Test 4: SELECT *
     print("\n4. Testing SELECT *...")
-    sql = "SELECT * FROM users"
-    cmd = parse_sql(sql)
+    cmd = parse_sql(SQL_SELECT_ALL)
     results = executor.execute(cmd)
     print(f"   Found {len(results)} rows")
     assert len(results) == 5
@@ -76,8 +113,7 @@ def test_executor():
 
     # Test 5: SELECT with columns
     print("\n5. Testing SELECT with columns...")
-    sql = "SELECT name, age FROM users"
-    cmd = parse_sql(sql)
+    cmd = parse_sql(SQL_SELECT_NAME_AGE)
     results = executor.execute(cmd)
     print(f"   First row: {results[0]}")
     assert len(results[0]) == 2
@@ -85,39 +121,52 @@ def test_executor():
 
     # Test 6: SELECT with WHERE
     print("\n6. Testing SELECT with WHERE...")
-    sql = "SELECT * FROM users WHERE age > 25"
-    cmd = parse_sql(sql)
+    cmd = parse_sql(SQL_SELECT_AGE_OVER_25)
     results = executor.execute(cmd)
     print(f"   Found {len(results)} rows with age > 25")
-    for row in results:
-        print(f"      {row}")
+    if VERBOSE:
+        for row in results:
+            print(f"      {row}")
     assert len(results) == 3  # Bob(30), Diana(28), Eve(35)
     print("✓ SELECT with WHERE works")
 
     # Test 7: SELECT with complex WHERE
     print("\n7. Testing SELECT with complex WHERE...")
-    sql = "SELECT * FROM users WHERE (age > 20 AND age < 30) OR name = 'Eve'"
-    cmd = parse_sql(sql)
+    cmd = parse_sql(SQL_SELECT_COMPLEX_WHERE)
     results = executor.execute(cmd)
     print(f"   Found {len(results)} rows")
     assert len(results) == 4  # Alice(25), Charlie(22), Diana(28), Eve(35)
     print("✓ Complex WHERE works")
 
+    cmd = parse_sql(SQL_SELECT_LIKE)
+    assert sorted(executor.execute(cmd)) == [('Alice',), ('Eve',)]
+    print("✓ LIKE with % and _ works")
+
+    cmd = parse_sql(SQL_SELECT_LIKE_AFFIX)
+    assert sorted(executor.execute(cmd)) == [('Bob',), ('Charlie',), ('Diana',)]
+    print("✓ LIKE suffix, substring and exact patterns work")
+
+    # AND of fixed-width comparisons is prefiltered on raw bytes
+    cmd = parse_sql(SQL_SELECT_AGE_RANGE)
+    predicate, residual = executor._compile_byte_predicate(cmd.where, executor.catalog.get_table('users'))
+    assert predicate is not None and residual is None  # Decided on bytes alone
+    assert sorted(executor.execute(cmd)) == [('Alice',), ('Diana',)]
+    print("✓ Byte-level WHERE prefilter matches full evaluation")
+
     # Test 8: SELECT with ORDER BY
     print("\n8. Testing SELECT with ORDER BY...")
-    sql = "SELECT name, age FROM users ORDER BY age DESC"
-    cmd = parse_sql(sql)
+    cmd = parse_sql(SQL_ORDER_BY_AGE)
     results = executor.execute(cmd)
     print(f"   Ordered by age DESC:")
-    for row in results:
-        print(f"      {row}")
+    if VERBOSE:
+        for row in results:
+            print(f"      {row}")
     assert results[0][1] == 35  # Eve first (highest age)
     print("✓ ORDER BY works")
 
     # Test 9: SELECT with LIMIT
     print("\n9. Testing SELECT with LIMIT...")
-    sql = "SELECT * FROM users LIMIT 2"
-    cmd = parse_sql(sql)
+    cmd = parse_sql(SQL_LIMIT)
     results = executor.execute(cmd)
     assert len(results) == 2
     print(f"   Limited to {len(results)} rows")
@@ -125,37 +174,38 @@ def test_executor():
 
     # Test 10: SELECT with OFFSET
     print("\n10. Testing SELECT with OFFSET...")
-    sql = "SELECT * FROM users LIMIT 2 OFFSET 1"
-    cmd = parse_sql(sql)
+    cmd = parse_sql(SQL_LIMIT_OFFSET)
     results = executor.execute(cmd)
     assert len(results) == 2
     print(f"   Got rows {results[0][0]} and {results[1][0]} (skipped first)")
     print("✓ OFFSET works")
 
+    # Streaming SELECT yields the same rows lazily
+    rows = executor.iter_select(cmd)
+    assert next(rows) == results[0]
+    assert list(rows) == results[1:]
+    print("✓ Streaming SELECT matches materialized result")
+
     # Test 11: UPDATE
     print("\n11. Testing UPDATE...")
-    sql = "UPDATE users SET age = 26 WHERE name = 'Alice'"
-    cmd = parse_sql(sql)
+    cmd = parse_sql(SQL_UPDATE_ALICE)
     result = executor.execute(cmd)
     print(f"   {result}")
 
     # Verify update
-    sql = "SELECT age FROM users WHERE name = 'Alice'"
-    cmd = parse_sql(sql)
+    cmd = parse_sql(SQL_SELECT_ALICE_AGE)
     results = executor.execute(cmd)
     assert results[0][0] == 26
     print("✓ UPDATE works")
 
     # Test 12: DELETE
     print("\n12. Testing DELETE...")
-    sql = "DELETE FROM users WHERE age < 25"
-    cmd = parse_sql(sql)
+    cmd = parse_sql(SQL_DELETE_UNDER_25)
     result = executor.execute(cmd)
     print(f"   {result}")
 
     # Verify deletion
-    sql = "SELECT * FROM users"
-    cmd = parse_sql(sql)
+    cmd = parse_sql(SQL_SELECT_ALL)
     results = executor.execute(cmd)
     print(f"   Rows remaining: {len(results)}")
     assert len(results) == 4  # Deleted Charlie(22)
@@ -163,8 +213,7 @@ def test_executor():
 
     # Test 13: CREATE INDEX
     print("\n13. Testing CREATE INDEX...")
-    sql = "CREATE INDEX idx_age ON users (age)"
-    cmd = parse_sql(sql)
+    cmd = parse_sql(SQL_CREATE_INDEX_AGE)
     result = executor.execute(cmd)
     print(f"   {result}")
     print("✓ CREATE INDEX works")
@@ -172,19 +221,25 @@ def test_executor():
     # Test 14: Primary key constraint
     print("\n14. Testing primary key constraint...")
     try:
-        sql = "INSERT INTO users VALUES (1, 'Duplicate', 99, 'dup@test.com')"
-        cmd = parse_sql(sql)
+        cmd = parse_sql(SQL_INSERT_DUPLICATE_PK)
         executor.execute(cmd)
         print("✗ Should have raised error for duplicate primary key")
         assert False
     except ValueError as e:
         print(f"   ✓ Correctly raised error: {str(e)[:60]}...")
 
+    # Duplicate keys in a bulk insert are rejected before anything is written
+    try:
+        executor.insert_many('users', [(20, 'New', 40, None), (20, 'Again', 41, None)])
+        assert False, "insert_many accepted a duplicate primary key"
+    except ValueError as e:
+        print(f"   ✓ Correctly raised error: {str(e)[:60]}...")
+    assert executor.execute(parse_sql(SQL_SELECT_ID_20)) == []
+
     # Test 15: NOT NULL constraint
     print("\n15. Testing NOT NULL constraint...")
     try:
-        sql = "INSERT INTO users VALUES (10, NULL, 25, 'test@test.com')"
-        cmd = parse_sql(sql)
+        cmd = parse_sql(SQL_INSERT_NULL_NAME)
         executor.execute(cmd)
         print("✗ Should have raised error for NULL in NOT NULL column")
         assert False
@@ -193,42 +248,38 @@ def test_executor():
 
     # Test 16: EXPLAIN
     print("\n16. Testing EXPLAIN...")
-    sql = "EXPLAIN SELECT * FROM users WHERE age > 25"
-    cmd = parse_sql(sql)
+    cmd = parse_sql(SQL_EXPLAIN)
     result = executor.execute(cmd)
     print("   Plan:")
-    for line in result.split('\n')[:5]:
-        print(f"      {line}")
+    if VERBOSE:
+        for line in result.split('\n')[:5]:
+            print(f"      {line}")
     assert "Query Plan" in result
     print("✓ EXPLAIN works")
 
     # Test 17: ANALYZE
     print("\n17. Testing ANALYZE...")
-    sql = "ANALYZE users"
-    cmd = parse_sql(sql)
+    cmd = parse_sql(SQL_ANALYZE)
     result = executor.execute(cmd)
     print(f"   {result}")
     print("✓ ANALYZE works")
 
     # Test 18: VACUUM
     print("\n18. Testing VACUUM...")
-    sql = "VACUUM users"
-    cmd = parse_sql(sql)
+    cmd = parse_sql(SQL_VACUUM)
     result = executor.execute(cmd)
     print(f"   {result}")
     print("✓ VACUUM works")
 
     # Test 19: DROP TABLE
     print("\n19. Testing DROP TABLE...")
-    sql = "DROP TABLE users"
-    cmd = parse_sql(sql)
+    cmd = parse_sql(SQL_DROP_USERS)
     result = executor.execute(cmd)
     print(f"   {result}")
 
     # Verify table is gone
     try:
-        sql = "SELECT * FROM users"
-        cmd = parse_sql(sql)
+        cmd = parse_sql(SQL_SELECT_ALL)
         executor.execute(cmd)
         print("✗ Should have raised error for non-existent table")
         assert False
@@ -239,11 +290,7 @@ def test_executor():
     print("✅ All executor tests passed!")
     print("="*50)
 
-    # Shutdown
-    executor.shutdown()
-
-    # Clean up
-    shutil.rmtree(test_dir)
-
 if __name__ == '__main__':
-    test_executor()
+    with scratch_dir() as tmp:
+        with executor_session(tmp) as executor:
+            test_executor(executor)
@@ -4,25 +4,49 @@ Simulates basic database operations without SQL parser
 """
 
 import os
-import shutil
+from pathlib import Path
 import sys
+from itertools import compress
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from db_engine.catalog import Catalog, TableSchema, ColumnDef, IndexMetadata
-from db_engine.storage import BufferPool, Tuple, HeapFile
+from db_engine.storage import BufferPool, HeapFile
 from db_engine.btree import BTreeIndex
-
-def test_integration():
+from tests import scratch_dir
+
+# Per-row output inside loops is opt-in (set DB_TEST_VERBOSE=1)
+VERBOSE = os.environ.get('DB_TEST_VERBOSE')
+
+# Stand-in for NULL in integer columns: below every INT/BIGINT value, so a
+# plain `> x` comparison also rejects NULLs
+NULL_INT = -(1 << 63)
+
+def scan_columns(heap, col_idxs, null=None):
+    """
+    Materialize columns of a heap in one sequential scan
+
+    Returns one list per requested column plus a parallel list of ctids,
+    so filters can run as a single pass over a column instead of
+    unpacking each row inside the scan loop. NULLs are returned as `null`.
+    """
+    columns = [[] for _ in col_idxs]
+    ctids = []
+    for batch in heap.scan_columns(col_idxs):
+        for column, values, nulls in zip(columns, batch.columns, batch.nulls):
+            if nulls is None or not any(nulls):
+                column.extend(values)
+            else:
+                column.extend(null if is_null else value for value, is_null in zip(values, nulls))
+        ctids.extend(batch.ctids())
+    return (*columns, ctids)
+
+def test_integration(tmp_path):
     """Test complete flow: catalog → storage → indexing"""
     print("Testing integration of catalog + storage + btree...")
 
-    # Clean up
-    test_dir = './test_data_integration'
-    if os.path.exists(test_dir):
-        shutil.rmtree(test_dir)
-    os.makedirs(test_dir)
+    test_dir = Path(tmp_path)
 
     # Test 1: Initialize system components
     print("\n1. Initializing system components...")
@@ -51,7 +75,7 @@ def test_integration():
 
     # Test 3: Initialize heap file
     print("\n3. Initializing heap file...")
-    heap_file = os.path.join(test_dir, 'users.dat')
+    heap_file = test_dir / 'users.dat'
     heap = HeapFile(heap_file, schema, buffer_pool)
     heap.create()
     print(f"   Heap file: {heap_file}")
@@ -59,7 +83,7 @@ def test_integration():
 
     # Test 4: Initialize primary key index
     print("\n4. Creating primary key index...")
-    pk_index_file = os.path.join(test_dir, 'users_pkey.idx')
+    pk_index_file = test_dir / 'users_pkey.idx'
     pk_index = BTreeIndex(pk_index_file, key_columns=['id'], unique=True)
     pk_index.create()
     print(f"   Index file: {pk_index_file}")
@@ -76,22 +100,18 @@ def test_integration():
         [5, 'Eve', 35, 'eve@example.com']
     ]
 
-    for row_data in rows:
-        # Create tuple
-        tuple_obj = Tuple(row_data, schema)
-
-        # Check primary key uniqueness
-        pk_value = row_data[0]  # id column
-        if pk_index.search(pk_value) is not None:
-            raise ValueError(f"Duplicate primary key: {pk_value}")
-
-        # Insert into heap
-        ctid = heap.insert_tuple(tuple_obj)
+    # Insert into heap in one batch, straight from the value lists
+    rows.sort(key=lambda r: r[0])
+    ctids = heap.insert_rows(rows)
+    pk_pairs = [(row_data[0], ctid) for row_data, ctid in zip(rows, ctids)]  # id column
 
-        # Insert into primary key index
-        pk_index.insert(pk_value, ctid)
+    if VERBOSE:
+        for pk, ctid in pk_pairs:
+            print(f"   Inserted: id={pk}, ctid={ctid}")
+    assert [heap.read_tuple(ctid).values for ctid in ctids] == rows
 
-        print(f"   Inserted: id={row_data[0]}, ctid={ctid}")
+    # Build the primary key index in one pass (rejects duplicate keys)
+    pk_index = BTreeIndex.bulk_load(pk_index_file, ['id'], pk_pairs, unique=True)
 
     print(f"✓ Inserted {len(rows)} rows")
 
@@ -108,6 +128,10 @@ def test_integration():
         assert tuple_obj.values[0] == search_id
     print("✓ Primary key lookup works")
 
+    # Warm the buffer pool so the reads in Tests 7/8 are served from cache
+    heap.prefetch(range(heap.page_count))
+    misses_before = buffer_pool.miss_count
+
     # Test 7: Range scan using index
     print("\n7. Testing range scan (id between 2 and 4)...")
     ctids = pk_index.range_query(2, 4)
@@ -115,7 +139,8 @@ def test_integration():
 
     for ctid in ctids:
         tuple_obj = heap.read_tuple(ctid)
-        print(f"   id={tuple_obj.values[0]}, name={tuple_obj.values[1]}")
+        if VERBOSE:
+            print(f"   id={tuple_obj.values[0]}, name={tuple_obj.values[1]}")
         assert 2 <= tuple_obj.values[0] <= 4
 
     assert len(ctids) == 3  # ids 2, 3, 4
@@ -123,52 +148,46 @@ def test_integration():
 
     # Test 8: Sequential scan (find all users with age > 25)
     print("\n8. Testing sequential scan (age > 25)...")
-    matching_rows = []
-
-    for tuple_obj, ctid in heap.scan_all():
-        age = tuple_obj.values[2]  # age column
-        if age is not None and age > 25:
-            matching_rows.append((tuple_obj.values[0], tuple_obj.values[1], age))
+    ids, names, ages, ctids = scan_columns(heap, [0, 1, 2], null=NULL_INT)
+    mask = [age > 25 for age in ages]  # age column; NULL_INT never matches
+    matching_rows = list(compress(zip(ids, names, ages), mask))
+    matching_ctids = list(compress(ctids, mask))
+    assert all(heap.read_tuple(ctid).values[2] > 25 for ctid in matching_ctids)
 
     print(f"   Found {len(matching_rows)} matching rows:")
-    for id, name, age in matching_rows:
-        print(f"      id={id}, name={name}, age={age}")
+    if VERBOSE:
+        for id, name, age in matching_rows:
+            print(f"      id={id}, name={name}, age={age}")
 
     assert len(matching_rows) == 3  # Bob(30), Diana(28), Eve(35)
+    assert buffer_pool.miss_count == misses_before  # Heap reads all hit the warmed pool
     print("✓ Sequential scan with filtering works")
 
     # Test 9: Delete row
     print("\n9. Testing delete...")
     delete_id = 3
-    ctid = pk_index.search(delete_id)
-
-    if ctid:
-        # Delete from heap (tombstone)
-        heap.delete_tuple(ctid)
-
-        # Delete from index
-        pk_index.delete(delete_id)
-
-        print(f"   Deleted row with id={delete_id}")
+    # Remove the index entry and tombstone the heap row in one call
+    ctid = heap.delete_by_pk(pk_index, delete_id)
+    assert ctid is not None
+    print(f"   Deleted row with id={delete_id}")
 
-        # Verify deletion
-        ctid_after = pk_index.search(delete_id)
-        print(f"   Search after delete: {ctid_after}")
-        assert ctid_after is None
+    # Verify deletion
+    assert heap.read_tuple(ctid) is None
+    ctid_after = pk_index.search(delete_id)
+    print(f"   Search after delete: {ctid_after}")
+    assert ctid_after is None
 
     print("✓ Delete works")
 
     # Test 10: Create secondary index
     print("\n10. Creating secondary index on age...")
-    age_index_file = os.path.join(test_dir, 'users_age_idx.idx')
-    age_index = BTreeIndex(age_index_file, key_columns=['age'], unique=False)
-    age_index.create()
+    age_index_file = test_dir / 'users_age_idx.idx'
 
-    # Populate secondary index from existing data
-    for tuple_obj, ctid in heap.scan_all():
-        age = tuple_obj.values[2]  # age column
-        if age is not None:  # Skip NULL ages
-            age_index.insert(age, ctid)
+    # Populate secondary index from existing data, sorted for a bulk build
+    ages, ctids = scan_columns(heap, [2], null=NULL_INT)  # age column
+    pairs = [(age, ctid) for age, ctid in zip(ages, ctids) if age > NULL_INT]  # Skip NULL ages
+    pairs.sort(key=lambda p: p[0])
+    age_index = BTreeIndex.bulk_load(age_index_file, ['age'], pairs)
 
     print(f"   Secondary index created and populated")
 
@@ -176,10 +195,12 @@ def test_integration():
     search_age = 30
     ctids = age_index.range_query(search_age, search_age)
     print(f"   Found {len(ctids)} users with age={search_age}")
+    assert len(ctids) == 1  # Bob
 
-    for ctid in ctids:
-        tuple_obj = heap.read_tuple(ctid)
-        print(f"      id={tuple_obj.values[0]}, name={tuple_obj.values[1]}")
+    if VERBOSE:
+        for ctid in ctids:
+            tuple_obj = heap.read_tuple(ctid)
+            print(f"      id={tuple_obj.values[0]}, name={tuple_obj.values[1]}")
 
     print("✓ Secondary index works")
 
@@ -210,6 +231,10 @@ def test_integration():
     pk_index2 = BTreeIndex(pk_index_file, key_columns=['id'], unique=True)
     pk_index2.open()
 
+    # A fresh pool starts cold; prefetch loads the heap's pages up front
+    assert heap2.prefetch(range(heap2.page_count)) == heap2.page_count
+    assert buffer_pool2.stats()['size'] == heap2.page_count
+
     # Verify data persisted
     ctid = pk_index2.search(1)
     print(f"   Search for id=1 returned ctid: {ctid}")
@@ -244,8 +269,7 @@ def test_integration():
     print("  ✓ B-tree (indexing with splitting, search, range queries)")
     print("  ✓ All components work together correctly")
 
-    # Clean up
-    shutil.rmtree(test_dir)
 
 if __name__ == '__main__':
-    test_integration()
+    with scratch_dir() as tmp:
+        test_integration(tmp)
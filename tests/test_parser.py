@@ -12,10 +12,13 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from db_engine.parser import (
     Tokenizer, Parser, parse_sql, TokenType,
     SelectCommand, InsertCommand, CreateTableCommand, CreateIndexCommand,
-    UpdateCommand, DeleteCommand, DropTableCommand,
+    UpdateCommand, DeleteCommand, DropTableCommand, ExplainCommand,
     BinaryOp, UnaryOp, Literal, ColumnRef
 )
 
+# Value and stats details are opt-in (set DB_TEST_VERBOSE=1)
+VERBOSE = os.environ.get('DB_TEST_VERBOSE')
+
 def test_parser():
     """Test SQL parser"""
     print("Testing parser.py...")
@@ -24,8 +27,9 @@ def test_parser():
     print("\n1. Testing tokenizer...")
     tokenizer = Tokenizer("SELECT * FROM users WHERE age > 18;")
     tokens = tokenizer.tokenize()
-    print(f"   Token count: {len(tokens)}")
-    print(f"   First few tokens: {[t.type.name for t in tokens[:5]]}")
+    if VERBOSE:
+        print(f"   Token count: {len(tokens)}")
+        print(f"   First few tokens: {[t.type.name for t in tokens[:5]]}")
     assert tokens[0].type == TokenType.SELECT
     assert tokens[1].type == TokenType.STAR
     assert tokens[2].type == TokenType.FROM
@@ -34,9 +38,10 @@ def test_parser():
     # Test 2: SELECT with WHERE
     print("\n2. Testing SELECT with WHERE...")
     cmd = parse_sql("SELECT id, name FROM users WHERE age > 25")
-    print(f"   Command type: {type(cmd).__name__}")
-    print(f"   Table: {cmd.table_name}")
-    print(f"   Columns: {cmd.columns}")
+    if VERBOSE:
+        print(f"   Command type: {type(cmd).__name__}")
+        print(f"   Table: {cmd.table_name}")
+        print(f"   Columns: {cmd.columns}")
     assert isinstance(cmd, SelectCommand)
     assert cmd.table_name == "users"
     assert cmd.columns == ["id", "name"]
@@ -47,8 +52,9 @@ def test_parser():
     # Test 3: SELECT with complex WHERE
     print("\n3. Testing SELECT with complex WHERE...")
     cmd = parse_sql("SELECT * FROM products WHERE price < 100 AND in_stock = TRUE")
-    print(f"   WHERE clause type: {type(cmd.where).__name__}")
-    print(f"   WHERE operator: {cmd.where.op}")
+    if VERBOSE:
+        print(f"   WHERE clause type: {type(cmd.where).__name__}")
+        print(f"   WHERE operator: {cmd.where.op}")
     assert isinstance(cmd.where, BinaryOp)
     assert cmd.where.op == 'AND'
     print("✓ Complex WHERE with AND works")
@@ -69,7 +75,8 @@ def test_parser():
     # Test 6: SELECT with ORDER BY
     print("\n6. Testing SELECT with ORDER BY...")
     cmd = parse_sql("SELECT * FROM users ORDER BY age DESC, name ASC")
-    print(f"   ORDER BY: {cmd.order_by}")
+    if VERBOSE:
+        print(f"   ORDER BY: {cmd.order_by}")
     assert cmd.order_by == [('age', 'DESC'), ('name', 'ASC')]
     print("✓ ORDER BY works")
 
@@ -83,9 +90,10 @@ def test_parser():
     # Test 8: INSERT with all columns
     print("\n8. Testing INSERT...")
     cmd = parse_sql("INSERT INTO users VALUES (1, 'Alice', 25, 'alice@test.com')")
-    print(f"   Command type: {type(cmd).__name__}")
-    print(f"   Table: {cmd.table_name}")
-    print(f"   Values: {cmd.values}")
+    if VERBOSE:
+        print(f"   Command type: {type(cmd).__name__}")
+        print(f"   Table: {cmd.table_name}")
+        print(f"   Values: {cmd.values}")
     assert isinstance(cmd, InsertCommand)
     assert cmd.table_name == "users"
     assert cmd.columns is None  # No column list
@@ -110,14 +118,18 @@ def test_parser():
         )
     """
     cmd = parse_sql(sql)
-    print(f"   Command type: {type(cmd).__name__}")
-    print(f"   Table: {cmd.table_name}")
-    print(f"   Columns: {len(cmd.columns)}")
-    print(f"   Primary key: {cmd.primary_key}")
+    if VERBOSE:
+        print(f"   Command type: {type(cmd).__name__}")
+        print(f"   Table: {cmd.table_name}")
+        print(f"   Columns: {len(cmd.columns)}")
+        print(f"   Primary key: {cmd.primary_key}")
     assert isinstance(cmd, CreateTableCommand)
     assert cmd.table_name == "users"
     assert len(cmd.columns) == 4
     assert cmd.primary_key == ['id']
+    assert cmd.column_names == ['id', 'name', 'age', 'email']
+    assert cmd.nullable_mask == 0b1100  # age, email
+    assert cmd.unique_mask == 0b1000    # email
     print("✓ CREATE TABLE works")
 
     # Test 11: CREATE TABLE with composite primary key
@@ -137,11 +149,12 @@ def test_parser():
     # Test 12: CREATE INDEX
     print("\n12. Testing CREATE INDEX...")
     cmd = parse_sql("CREATE INDEX idx_age ON users (age)")
-    print(f"   Command type: {type(cmd).__name__}")
-    print(f"   Index name: {cmd.index_name}")
-    print(f"   Table: {cmd.table_name}")
-    print(f"   Columns: {cmd.columns}")
-    print(f"   Unique: {cmd.unique}")
+    if VERBOSE:
+        print(f"   Command type: {type(cmd).__name__}")
+        print(f"   Index name: {cmd.index_name}")
+        print(f"   Table: {cmd.table_name}")
+        print(f"   Columns: {cmd.columns}")
+        print(f"   Unique: {cmd.unique}")
     assert isinstance(cmd, CreateIndexCommand)
     assert cmd.index_name == "idx_age"
     assert cmd.unique == False
@@ -156,9 +169,10 @@ def test_parser():
     # Test 14: UPDATE
     print("\n14. Testing UPDATE...")
     cmd = parse_sql("UPDATE users SET age = 30, name = 'Alice Smith' WHERE id = 1")
-    print(f"   Command type: {type(cmd).__name__}")
-    print(f"   Table: {cmd.table_name}")
-    print(f"   Assignments: {len(cmd.assignments)}")
+    if VERBOSE:
+        print(f"   Command type: {type(cmd).__name__}")
+        print(f"   Table: {cmd.table_name}")
+        print(f"   Assignments: {len(cmd.assignments)}")
     assert isinstance(cmd, UpdateCommand)
     assert len(cmd.assignments) == 2
     assert cmd.assignments[0][0] == 'age'
@@ -167,8 +181,9 @@ def test_parser():
     # Test 15: DELETE
     print("\n15. Testing DELETE...")
     cmd = parse_sql("DELETE FROM users WHERE age < 18")
-    print(f"   Command type: {type(cmd).__name__}")
-    print(f"   Table: {cmd.table_name}")
+    if VERBOSE:
+        print(f"   Command type: {type(cmd).__name__}")
+        print(f"   Table: {cmd.table_name}")
     assert isinstance(cmd, DeleteCommand)
     assert cmd.table_name == "users"
     assert cmd.where is not None
@@ -216,6 +231,19 @@ def test_parser():
     assert cmd.values[3] is None
     print("✓ NULL values work")
 
+    # Test 21: EXPLAIN wraps a statement body only
+    print("\n21. Testing EXPLAIN...")
+    cmd = parse_sql("EXPLAIN SELECT * FROM users WHERE age > 18")
+    assert isinstance(cmd, ExplainCommand)
+    assert isinstance(cmd.command, SelectCommand)
+    try:
+        parse_sql("EXPLAIN EXPLAIN SELECT * FROM users")
+        print("✗ Should have raised SyntaxError")
+        assert False
+    except SyntaxError as e:
+        print(f"   ✓ Correctly raised error: {str(e)[:60]}...")
+    print("✓ EXPLAIN works")
+
     print("\n" + "="*50)
     print("✅ All parser tests passed!")
     print("="*50)
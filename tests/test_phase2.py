@@ -9,18 +9,33 @@ import unittest
 from db_engine.catalog import Catalog, TableSchema, ColumnDef, IndexMetadata
 from db_engine.parser import parse_sql
 from db_engine.executor import QueryExecutor
+from tests import scratch_dir
+
+
+def build_template(create_sql, table_name, rows):
+    """Create and fill a table once in a fresh database; return its (shut down) directory"""
+    template = scratch_dir()
+    executor = QueryExecutor(template.name)
+    executor.execute(parse_sql(create_sql))
+    executor.insert_many(table_name, rows)
+    executor.shutdown()
+    return template
+
+
+def copy_template(test, template):
+    """Give a test its own copy of a template database and an executor on it"""
+    test.tmp = scratch_dir()
+    test.test_dir = os.path.join(test.tmp.name, 'db')
+    shutil.copytree(template.name, test.test_dir)
+    test.executor = QueryExecutor(test.test_dir)
 
 
 class TestAlterTable(unittest.TestCase):
     """Test ALTER TABLE operations"""
 
-    def setUp(self):
-        """Create test environment"""
-        self.test_dir = "test_data_phase2"
-        os.makedirs(self.test_dir, exist_ok=True)
-        self.executor = QueryExecutor(self.test_dir)
-
-        # Create a test table
+    @classmethod
+    def setUpClass(cls):
+        """Create and seed the test table once; each test gets a copy"""
         create_sql = """
         CREATE TABLE users (
             id INT PRIMARY KEY,
@@ -28,19 +43,19 @@ class TestAlterTable(unittest.TestCase):
             age INT
         );
         """
-        cmd = parse_sql(create_sql)
-        self.executor.execute(cmd)
+        cls.template = build_template(create_sql, 'users', [(i, f'User{i}', 20 + i) for i in range(1, 4)])
 
-        # Insert some test data
-        for i in range(1, 4):
-            insert_sql = f"INSERT INTO users VALUES ({i}, 'User{i}', {20 + i});"
-            cmd = parse_sql(insert_sql)
-            self.executor.execute(cmd)
+    @classmethod
+    def tearDownClass(cls):
+        cls.template.cleanup()
+
+    def setUp(self):
+        """Create test environment"""
+        copy_template(self, self.template)
 
     def tearDown(self):
         """Clean up test data"""
-        if os.path.exists(self.test_dir):
-            shutil.rmtree(self.test_dir)
+        self.tmp.cleanup()
 
     def test_add_column(self):
         """Test ALTER TABLE ADD COLUMN"""
@@ -86,6 +101,30 @@ class TestAlterTable(unittest.TestCase):
         self.assertEqual(len(username_indexes), 1)
         self.assertTrue(username_indexes[0].unique)
 
+    def test_add_existing_column_fails(self):
+        """Test that adding a column with an existing name fails"""
+        alter_sql = "ALTER TABLE users ADD COLUMN age INT;"
+        cmd = parse_sql(alter_sql)
+
+        with self.assertRaises(ValueError) as ctx:
+            self.executor.execute(cmd)
+        self.assertIn("already exists", str(ctx.exception))
+
+    def test_insert_after_add_column(self):
+        """Test that ALTER closes the indexes it removes, so INSERT cannot use them"""
+        self.executor.execute(parse_sql("INSERT INTO users VALUES (4, 'User4', 24);"))
+        self.executor.execute(parse_sql("ALTER TABLE users ADD COLUMN email TEXT;"))
+
+        # The primary key index file was removed, and nothing still holds it open
+        for index in self.executor.indexes.values():
+            self.assertTrue(os.path.exists(index.index_file))
+        self.assertEqual(self.executor.catalog.get_indexes_for_table('users'), [])
+
+        insert_sql = "INSERT INTO users VALUES (5, 'User5', 25, NULL);"
+        with self.assertRaises(ValueError) as ctx:
+            self.executor.execute(parse_sql(insert_sql))
+        self.assertIn("does not exist", str(ctx.exception))
+
     def test_drop_column(self):
         """Test ALTER TABLE DROP COLUMN"""
         # Drop a column
@@ -179,32 +218,28 @@ class TestAlterTable(unittest.TestCase):
 class TestTransactions(unittest.TestCase):
     """Test transaction support"""
 
-    def setUp(self):
-        """Create test environment"""
-        self.test_dir = "test_data_transactions"
-        os.makedirs(self.test_dir, exist_ok=True)
-        self.executor = QueryExecutor(self.test_dir)
-
-        # Create a test table
+    @classmethod
+    def setUpClass(cls):
+        """Create and seed the test table once; each test gets a copy"""
         create_sql = """
         CREATE TABLE accounts (
             id INT PRIMARY KEY,
             balance INT NOT NULL
         );
         """
-        cmd = parse_sql(create_sql)
-        self.executor.execute(cmd)
+        cls.template = build_template(create_sql, 'accounts', [(i, 1000 * i) for i in range(1, 4)])
 
-        # Insert initial data
-        for i in range(1, 4):
-            insert_sql = f"INSERT INTO accounts VALUES ({i}, {1000 * i});"
-            cmd = parse_sql(insert_sql)
-            self.executor.execute(cmd)
+    @classmethod
+    def tearDownClass(cls):
+        cls.template.cleanup()
+
+    def setUp(self):
+        """Create test environment"""
+        copy_template(self, self.template)
 
     def tearDown(self):
         """Clean up test data"""
-        if os.path.exists(self.test_dir):
-            shutil.rmtree(self.test_dir)
+        self.tmp.cleanup()
 
     def test_begin_commit(self):
         """Test BEGIN and COMMIT"""
@@ -333,6 +368,11 @@ class TestTransactions(unittest.TestCase):
         results = self.executor.execute(cmd)
         self.assertEqual(results[0][0], 9999)
 
+        # Statistics deferred during the transaction were saved at COMMIT
+        saved = Catalog(self.test_dir)
+        saved.load()
+        self.assertEqual(saved.get_statistics('accounts').row_count, 4)
+
     def test_rollback_insert(self):
         """Test rolling back an INSERT"""
         # Start transaction
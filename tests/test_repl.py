@@ -0,0 +1,55 @@
+"""
+Test script for repl.py
+Tests splitting piped scripts into commands
+"""
+
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db_engine.repl import REPL
+
+def test_repl():
+    """Test REPL script splitting"""
+    print("Testing repl.py...")
+
+    split = REPL._split_commands
+
+    # Test 1: One command per semicolon, across lines
+    print("\n1. Testing statement splitting...")
+    commands = split("SELECT * FROM t;\nSELECT id\nFROM t;\nSELECT 1")
+    assert commands == ["SELECT * FROM t;", "SELECT id FROM t;", "SELECT 1"]
+    print("✓ Statement splitting works")
+
+    # Test 2: Semicolons inside string literals do not end a statement
+    print("\n2. Testing ';' inside strings...")
+    commands = split("INSERT INTO t VALUES (1, 'a; b');\nSELECT * FROM t;")
+    assert commands == ["INSERT INTO t VALUES (1, 'a; b');", "SELECT * FROM t;"]
+    print("✓ ';' inside strings works")
+
+    # Test 3: Escaped quotes keep the string open, as in the lexer
+    print("\n3. Testing escaped quotes...")
+    commands = split("INSERT INTO t VALUES (3, 'it\\'s; ok');\nSELECT * FROM t;")
+    assert commands == ["INSERT INTO t VALUES (3, 'it\\'s; ok');", "SELECT * FROM t;"]
+    print("✓ Escaped quotes work")
+
+    # Test 4: '--' comments are dropped, but not inside strings
+    print("\n4. Testing comments...")
+    commands = split("-- setup\nSELECT * FROM t; -- trailing; comment\nSELECT '--' FROM t;")
+    assert commands == ["SELECT * FROM t;", "SELECT '--' FROM t;"]
+    print("✓ Comments work")
+
+    # Test 5: Meta-commands stand on their own line
+    print("\n5. Testing meta-commands...")
+    commands = split("\\dt\nSELECT * FROM t;\n\\q")
+    assert commands == ["\\dt", "SELECT * FROM t;", "\\q"]
+    print("✓ Meta-commands work")
+
+    print("\n" + "="*50)
+    print("✅ All REPL tests passed!")
+    print("="*50)
+
+if __name__ == '__main__':
+    test_repl()
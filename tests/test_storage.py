@@ -4,7 +4,7 @@ Tests Buffer Pool, Tuple serialization, Page management, HeapFile with FSM
 """
 
 import os
-import shutil
+from pathlib import Path
 import sys
 
 # Add parent directory to path for imports
@@ -12,22 +12,24 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from db_engine.storage import BufferPool, Tuple, Page, HeapFile
 from db_engine.catalog import TableSchema, ColumnDef
+from db_engine.config import PAGE_SIZE
+from tests import scratch_dir
 
-def test_storage():
+# Value and stats details are opt-in (set DB_TEST_VERBOSE=1)
+VERBOSE = os.environ.get('DB_TEST_VERBOSE')
+
+def test_storage(tmp_path):
     """Test storage layer"""
     print("Testing storage.py...")
 
-    # Clean up
-    test_dir = './test_data_storage'
-    if os.path.exists(test_dir):
-        shutil.rmtree(test_dir)
-    os.makedirs(test_dir)
+    test_dir = Path(tmp_path)
 
     # Test 1: Buffer Pool
     print("\n1. Testing Buffer Pool...")
     buffer_pool = BufferPool(size=3)  # Small cache for testing
-    print(f"   Buffer pool size: {buffer_pool.size}")
-    print(f"   Initial stats: {buffer_pool.stats()}")
+    if VERBOSE:
+        print(f"   Buffer pool size: {buffer_pool.size}")
+        print(f"   Initial stats: {buffer_pool.stats()}")
     print("✓ Buffer pool created")
 
     # Test 2: Tuple serialization (with nullable columns)
@@ -46,21 +48,24 @@ def test_storage():
     tuple1 = Tuple([1, 'Alice', 25, 'alice@example.com'], schema)
     tuple2 = Tuple([2, 'Bob', None, None], schema)  # NULL values
 
-    print(f"   Tuple 1 values: {tuple1.values}")
-    print(f"   Tuple 2 values (with NULLs): {tuple2.values}")
-    print(f"   Schema has nullable columns: {schema.has_nullable_columns()}")
+    if VERBOSE:
+        print(f"   Tuple 1 values: {tuple1.values}")
+        print(f"   Tuple 2 values (with NULLs): {tuple2.values}")
+        print(f"   Schema has nullable columns: {schema.has_nullable_columns()}")
 
     # Serialize
     data1 = tuple1.serialize()
     data2 = tuple2.serialize()
-    print(f"   Tuple 1 serialized size: {len(data1)} bytes")
-    print(f"   Tuple 2 serialized size: {len(data2)} bytes")
+    if VERBOSE:
+        print(f"   Tuple 1 serialized size: {len(data1)} bytes")
+        print(f"   Tuple 2 serialized size: {len(data2)} bytes")
 
     # Deserialize
     tuple1_restored = Tuple.deserialize(data1, schema)
     tuple2_restored = Tuple.deserialize(data2, schema)
-    print(f"   Tuple 1 restored: {tuple1_restored.values}")
-    print(f"   Tuple 2 restored: {tuple2_restored.values}")
+    if VERBOSE:
+        print(f"   Tuple 1 restored: {tuple1_restored.values}")
+        print(f"   Tuple 2 restored: {tuple2_restored.values}")
     assert tuple1.values == tuple1_restored.values
     assert tuple2.values == tuple2_restored.values
     print("✓ Tuple serialization works (including NULL bitmap)")
@@ -68,15 +73,17 @@ def test_storage():
     # Test 3: Page management
     print("\n3. Testing Page management...")
     page = Page(0)
-    print(f"   Page number: {page.page_number}")
-    print(f"   Initial free space: {page.free_space} bytes")
+    if VERBOSE:
+        print(f"   Page number: {page.page_number}")
+        print(f"   Initial free space: {page.free_space} bytes")
 
     # Add tuples
     offset1 = page.add_tuple(data1)
     offset2 = page.add_tuple(data2)
-    print(f"   Added tuple 1 at offset: {offset1}")
-    print(f"   Added tuple 2 at offset: {offset2}")
-    print(f"   Free space after insertions: {page.free_space} bytes")
+    if VERBOSE:
+        print(f"   Added tuple 1 at offset: {offset1}")
+        print(f"   Added tuple 2 at offset: {offset2}")
+        print(f"   Free space after insertions: {page.free_space} bytes")
 
     # Retrieve tuples
     retrieved1 = page.get_tuple(offset1)
@@ -85,50 +92,68 @@ def test_storage():
     assert retrieved2 == data2
     print("✓ Page can store and retrieve tuples")
 
+    # Tombstones live in the slot directory, not the tuple bytes
+    raw = b'\xFF\xFF\xFF\xFF'  # e.g. an INT -1 at the start of a tuple
+    raw_slot = page.add_tuple(raw)
+    assert page.get_tuple(raw_slot) == raw
+    page.mark_deleted(raw_slot)
+    assert page.get_tuple(raw_slot) is None
+    print("✓ Tuple bytes starting with 0xFF are not mistaken for tombstones")
+
     # Test 4: Page serialization
     print("\n4. Testing Page serialization...")
     page_data = page.serialize()
-    print(f"   Serialized page size: {len(page_data)} bytes (should be 8192)")
+    if VERBOSE:
+        print(f"   Serialized page size: {len(page_data)} bytes (should be 8192)")
     assert len(page_data) == 8192  # PAGE_SIZE
+    restored = Page.deserialize(page_data, page.page_number)
+    assert restored.tuples == page.tuples
+    assert restored.free_space == page.free_space
+    assert restored.get_tuple(offset2) == data2
     print("✓ Page serialization works")
 
     # Test 5: HeapFile creation
     print("\n5. Testing HeapFile...")
-    heap_path = os.path.join(test_dir, 'users.dat')
+    heap_path = test_dir / 'users.dat'
     heap = HeapFile(heap_path, schema, buffer_pool)
     heap.create()
-    print(f"   Heap file created: {os.path.exists(heap_path)}")
-    print(f"   Initial page count: {heap.page_count}")
-    print(f"   FSM: {heap.free_space_map}")
+    if VERBOSE:
+        print(f"   Heap file created: {heap_path.exists()}")
+        print(f"   Initial page count: {heap.page_count}")
+        print(f"   FSM: {heap.free_space_map}")
     print("✓ HeapFile created")
 
     # Test 6: Insert tuples into HeapFile
     print("\n6. Inserting tuples into HeapFile...")
     ctid1 = heap.insert_tuple(tuple1)
     ctid2 = heap.insert_tuple(tuple2)
-    print(f"   Tuple 1 inserted at ctid: {ctid1}")
-    print(f"   Tuple 2 inserted at ctid: {ctid2}")
-    print(f"   FSM after inserts: {heap.free_space_map}")
-    print(f"   Buffer pool stats: {buffer_pool.stats()}")
+    if VERBOSE:
+        print(f"   Tuple 1 inserted at ctid: {ctid1}")
+        print(f"   Tuple 2 inserted at ctid: {ctid2}")
+        print(f"   FSM after inserts: {heap.free_space_map}")
+        print(f"   Buffer pool stats: {buffer_pool.stats()}")
     print("✓ Tuples inserted")
 
     # Test 7: Read tuples by ctid
     print("\n7. Reading tuples by ctid...")
     read_tuple1 = heap.read_tuple(ctid1)
     read_tuple2 = heap.read_tuple(ctid2)
-    print(f"   Read tuple 1: {read_tuple1.values}")
-    print(f"   Read tuple 2: {read_tuple2.values}")
+    if VERBOSE:
+        print(f"   Read tuple 1: {read_tuple1.values}")
+        print(f"   Read tuple 2: {read_tuple2.values}")
     assert read_tuple1.values == tuple1.values
     assert read_tuple2.values == tuple2.values
-    print(f"   Buffer pool stats after reads: {buffer_pool.stats()}")
+    if VERBOSE:
+        print(f"   Buffer pool stats after reads: {buffer_pool.stats()}")
     print("✓ Tuples read correctly (with buffer pool caching)")
 
     # Test 8: Sequential scan
     print("\n8. Testing sequential scan...")
     all_tuples = list(heap.scan_all())
-    print(f"   Scanned {len(all_tuples)} tuples")
-    for tup, ctid in all_tuples:
-        print(f"      ctid={ctid}, values={tup.values}")
+    if VERBOSE:
+        print(f"   Scanned {len(all_tuples)} tuples")
+        for tup, ctid in all_tuples:
+            print(f"      ctid={ctid}, values={tup.values}")
     assert len(all_tuples) == 2
     print("✓ Sequential scan works")
 
@@ -136,22 +161,30 @@ def test_storage():
     print("\n9. Testing delete (tombstone)...")
     heap.delete_tuple(ctid1)
     deleted_tuple = heap.read_tuple(ctid1)
-    print(f"   Deleted tuple result: {deleted_tuple}")
+    if VERBOSE:
+        print(f"   Deleted tuple result: {deleted_tuple}")
     assert deleted_tuple is None
     print("✓ Tuple marked as deleted")
 
     # Test 10: Scan after delete
     print("\n10. Scanning after delete...")
     all_tuples_after_delete = list(heap.scan_all())
-    print(f"   Scanned {len(all_tuples_after_delete)} tuples (should be 1)")
+    if VERBOSE:
+        print(f"   Scanned {len(all_tuples_after_delete)} tuples (should be 1)")
     assert len(all_tuples_after_delete) == 1
     print("✓ Deleted tuples skipped in scan")
 
     # Test 11: Vacuum
     print("\n11. Testing vacuum (garbage collection)...")
-    print(f"   FSM before vacuum: {heap.free_space_map}")
+    if VERBOSE:
+        print(f"   FSM before vacuum: {heap.free_space_map}")
+    fsm_before = dict(heap.free_space_map)
     heap.vacuum()
-    print(f"   FSM after vacuum: {heap.free_space_map}")
+    if VERBOSE:
+        print(f"   FSM after vacuum: {heap.free_space_map}")
+    assert heap.free_space_map[ctid1[0]] > fsm_before[ctid1[0]]
+    assert heap.read_tuple(ctid2).values == tuple2.values  # Slot ids survive compaction
+    assert heap.read_tuple(ctid1) is None
     print("✓ Vacuum reclaimed space")
 
     # Test 12: Insert many tuples to test FSM
@@ -161,9 +194,12 @@ def test_storage():
         tup = Tuple([i+10, f'User{i}', 20+i, f'user{i}@test.com'], schema)
         ctid = heap.insert_tuple(tup)
         ctids.append(ctid)
-    print(f"   Inserted 10 more tuples")
-    print(f"   Page count: {heap.page_count}")
-    print(f"   FSM: {heap.free_space_map}")
+    if VERBOSE:
+        print(f"   Inserted 10 more tuples")
+        print(f"   Page count: {heap.page_count}")
+        print(f"   FSM: {heap.free_space_map}")
+    assert len(heap._fsm_by_space) == heap.page_count
+    assert heap._find_page_with_space(PAGE_SIZE) is None
     print("✓ FSM efficiently finds pages with space")
 
     # Test 13: Buffer pool caching
@@ -172,17 +208,104 @@ def test_storage():
     for _ in range(5):
         heap.read_tuple(ctids[0])
     stats = buffer_pool.stats()
-    print(f"   Buffer pool stats: {stats}")
-    print(f"   Cache hit rate: {stats['hit_rate']:.2%}")
+    if VERBOSE:
+        print(f"   Buffer pool stats: {stats}")
+        print(f"   Cache hit rate: {stats['hit_rate']:.2%}")
     assert stats['hit_rate'] > 0  # Should have cache hits
     print("✓ Buffer pool caching works")
 
+    # Test 14: Batch insert
+    print("\n14. Testing batch insert...")
+    batch = [Tuple([i+100, f'Bulk{i}', i, None], schema) for i in range(2000)]
+    batch_ctids = heap.insert_tuples(batch)
+    assert len(batch_ctids) == 2000
+    assert len(set(batch_ctids)) == 2000
+    assert heap.read_tuple(batch_ctids[-1]).values == batch[-1].values
+    if VERBOSE:
+        print(f"   Inserted {len(batch_ctids)} tuples across {heap.page_count} pages")
+    print("✓ Batch insert packs pages and returns ctids in order")
+
+    # Test 15: Clock eviction keeps referenced pages across a scan
+    print("\n15. Testing clock eviction under sequential scan...")
+    hot_key = (heap.file_path, ctids[0][0])
+    for _ in range(3):
+        heap.read_tuple(ctids[0])  # Reference the hot page
+    assert heap.page_count > buffer_pool.size
+    list(heap.scan_all())
+    if VERBOSE:
+        print(f"   Buffer pool stats after scan: {buffer_pool.stats()}")
+    assert hot_key in buffer_pool.cache
+    assert len(buffer_pool.cache) <= buffer_pool.size
+    print("✓ Scan pages recycled without evicting the hot page")
+
+    # Prefetch into a full pool only fills zero-usage slots, and keeps what it loads
+    load = lambda path, num: Page(num)
+    pool = BufferPool(size=4)
+    for page_num, refs in enumerate((1, 3, 3, 3)):
+        for _ in range(refs):
+            pool.get_page('hot', page_num, load)
+    assert pool.prefetch('pf', range(4), load) == 0
+    assert all(('hot', n) in pool.cache for n in range(4))
+    pool.invalidate('hot', 0)  # One free slot
+    pool.invalidate('hot', 1)
+    pool.get_page('cold', 0, load, scan=True)  # One zero-usage slot
+    assert pool.prefetch('pf', range(4), load) == 2
+    assert sum(('pf', n) in pool.cache for n in range(4)) == 2
+    assert ('hot', 2) in pool.cache and ('hot', 3) in pool.cache
+    print("✓ Prefetch into a full pool keeps warm pages and what it loads")
+
+    # Test 16: Columnar scan matches the row scan
+    print("\n16. Testing columnar scan...")
+    rows = {ctid: tup.values for tup, ctid in heap.scan_all()}
+    scanned = 0
+    for batch in heap.scan_columns([2, 0, 3]):
+        ages, ids, emails = batch.columns
+        age_nulls, id_nulls, email_nulls = batch.nulls
+        assert id_nulls is None  # id is NOT NULL
+        for row, ctid in enumerate(batch.ctids()):
+            row_id, _, age, email = rows[ctid]
+            assert ids[row] == row_id
+            assert (age_nulls[row] == 1) == (age is None)
+            assert age is None or ages[row] == age
+            assert emails[row] == email
+        scanned += len(batch.slot_ids)
+    assert scanned == len(rows)
+    if VERBOSE:
+        print(f"   Scanned {scanned} rows as column arrays")
+    print("✓ Columnar scan returns the same values and NULLs")
+
+    # Test 17: FSM persisted across reopen
+    print("\n17. Testing FSM sidecar on reopen...")
+    buffer_pool.flush_all()
+    heap.save_fsm()
+    heap.close()
+    assert os.path.exists(heap.fsm_path)
+    reopened = HeapFile(heap_path, schema, BufferPool())
+    reopened.open()
+    if VERBOSE:
+        print(f"   FSM from sidecar: {reopened.free_space_map}")
+    assert reopened.free_space_map == heap.free_space_map
+    assert not os.path.exists(heap.fsm_path)  # Consumed; rewritten on next clean shutdown
+    reopened.close()
+    print("✓ FSM loaded without page scan")
+
+    # Test 18: Heap files from an older page format are rejected clearly
+    print("\n18. Testing heap format version check...")
+    with open(heap_path, 'r+b') as f:
+        f.seek(12)
+        f.write(b'\x00\x00\x00\x00')  # Version 0: written before the field existed
+    try:
+        HeapFile(heap_path, schema, BufferPool()).open()
+        assert False, "Should have raised ValueError"
+    except ValueError as e:
+        assert "Unsupported heap format version 0" in str(e)
+    print("✓ Old heap format rejected")
+
     print("\n" + "="*50)
     print("✅ All storage tests passed!")
     print("="*50)
 
-    # Clean up
-    shutil.rmtree(test_dir)
 
 if __name__ == '__main__':
-    test_storage()
+    with scratch_dir() as tmp:
+        test_storage(tmp)